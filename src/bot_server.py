@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+
+from game_implementation.game_server import ANY_SEAT, GameServer, run_bot, serve_local
+from game_implementation.strategy import standard_strategies
+
+STRATEGIES = standard_strategies()
+
+
+async def serve(args) -> None:
+    server = GameServer(args.players, decision_timeout=args.timeout)
+    await server.start(host=args.host, port=args.port, path=args.path)
+    print(f"Listening on {server.address}, waiting for {args.players} bots")
+    await server.wait_for_players()
+    try:
+        result = await server.play_games(args.games, seed=args.seed, concurrency=args.concurrency)
+    finally:
+        await server.close()
+    print("Winner counts", [*result.winner_counts])
+    print(server.report())
+
+
+async def load_test(args) -> None:
+    bots = [STRATEGIES[name] for name in args.bots]
+    result, server = await serve_local(
+        bots, args.games, seed=args.seed, concurrency=args.concurrency, decision_timeout=args.timeout, path=args.path
+    )
+    print("Winner counts", [*result.winner_counts])
+    print(server.report())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Peruke games between bots connected over a local socket")
+    parser.add_argument("mode", choices=["serve", "bot", "load-test"], help="run the server, a bot, or both")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host to listen on or connect to")
+    parser.add_argument("--port", type=int, default=7337, help="TCP port to listen on or connect to")
+    parser.add_argument("--path", help="Unix socket to use instead of TCP")
+    parser.add_argument("--games", type=int, default=10000, help="number of games to play")
+    parser.add_argument("--players", type=int, choices=[2, 3, 4], default=3, help="bots in each game")
+    parser.add_argument("--concurrency", type=int, default=1000, help="games in play at once")
+    parser.add_argument("--timeout", type=float, default=1.0, help="seconds a bot has to answer each decision")
+    parser.add_argument("--seed", type=int, default=42, help="master seed of the dice")
+    parser.add_argument("--strategy", choices=[*STRATEGIES], default="RandomStrategy", help="strategy of a bot")
+    parser.add_argument("--seat", type=int, default=ANY_SEAT, help="seat a bot asks for; the first free by default")
+    parser.add_argument(
+        "--bots", nargs="+", choices=[*STRATEGIES], default=[*STRATEGIES], help="strategies of a load test's bots"
+    )
+    args = parser.parse_args()
+
+    if args.mode == "serve":
+        asyncio.run(serve(args))
+    elif args.mode == "bot":
+        strategy = STRATEGIES[args.strategy]
+        decisions = asyncio.run(run_bot(strategy, host=args.host, port=args.port, path=args.path, seat=args.seat))
+        print(f"{decisions} decisions made")
+    else:
+        asyncio.run(load_test(args))
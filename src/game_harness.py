@@ -1,22 +1,29 @@
-import random
+import argparse
+import itertools
 
+from game_implementation.benchmark import run_benchmark, sprt
 from game_implementation.disc_state import DiscState
+from game_implementation.game_events import ConsoleEventSink, MultiEventSink
 from game_implementation.game_runner import run_games
-from game_implementation.strategy import PreferTakeOnDoubleSafeDie, RandomStrategy, TallestDaisyStrategy
+from game_implementation.league import run_league
+from game_implementation.profiling import Profiler
+from game_implementation.q_learning import QTableStrategy, train
+from game_implementation.results import run_stream, standard_aggregators
+from game_implementation.strategy import (
+    DOUBLE_TAKE_PREFERENCE,
+    PreferTakeOnDoubleSafeDie,
+    RandomStrategy,
+    TALLEST_DAISY_PREFERENCE,
+    TallestDaisyStrategy,
+)
+from game_implementation.tournament import run_tournament
+from game_implementation.trajectories import TrajectoryRecorder, TrajectoryWriter
+from game_implementation.tuning import DOUBLE_TAKE_SPACE, PreferenceTuner, TALLEST_DAISY_SPACE
 
 
 random_strategy = RandomStrategy()
-tallest_daisy = TallestDaisyStrategy({DiscState.Gone: 3, DiscState.Safe: 2, DiscState.Vulnerable: 2})
-prefer_double_take = PreferTakeOnDoubleSafeDie(
-    {
-        (DiscState.Gone, True): 3,
-        (DiscState.Gone, False): 3,
-        (DiscState.Safe, True): 1,
-        (DiscState.Safe, False): 1,
-        (DiscState.Vulnerable, True): 2,
-        (DiscState.Vulnerable, False): 0,
-    }
-)
+tallest_daisy = TallestDaisyStrategy(TALLEST_DAISY_PREFERENCE)
+prefer_double_take = PreferTakeOnDoubleSafeDie(DOUBLE_TAKE_PREFERENCE)
 
 
 def make_strategies():
@@ -27,7 +34,199 @@ def make_strategies():
     ]
 
 
+def make_pool():
+    """Variants of the standard strategies for a league: TallestDaisy with every ranking of the action types."""
+    pool = [random_strategy, prefer_double_take]
+    names = ["Random", "PreferTakeOnDoubleSafeDie"]
+    states = [DiscState.Gone, DiscState.Safe, DiscState.Vulnerable]
+    for preferences in itertools.product(range(3), repeat=3):
+        pool.append(TallestDaisyStrategy(dict(zip(states, preferences))))
+        names.append("TallestDaisy " + " ".join(f"{state.name[0]}{rank}" for state, rank in zip(states, preferences)))
+    return pool, names
+
+
+DEFAULT_GAMES = 1000
+
+MODE_OPTIONS = {
+    "play": {"games", "workers", "verbose", "record", "profile", "profile_json"},
+    "results": {"games", "verbose"},
+    "benchmark": {"games"},
+    "sprt": {"games"},
+    "league": {"workers", "tables"},
+    "tune": {"workers"},
+    "train_q": {"games", "workers"},
+}
+"""Options each mode honours, besides --seed; giving any other option is an error"""
+
+
+def play(args, strategies):
+    sinks = [ConsoleEventSink()] if args.verbose else []
+    if args.workers > 1:
+        result = run_tournament(strategies, args.games, seed=args.seed, workers=args.workers)
+        print("\nWinner counts", [*result.winner_counts])
+        return
+
+    writer = TrajectoryWriter(args.record) if args.record else None
+    if writer is not None:
+        sinks.append(TrajectoryRecorder(writer))
+    profiler = Profiler() if args.profile or args.profile_json else None
+    try:
+        if profiler is not None:
+            with profiler:
+                run_games(strategies, args.games, events=MultiEventSink(*sinks), seed=args.seed, profiler=profiler)
+        else:
+            run_games(strategies, args.games, events=MultiEventSink(*sinks), seed=args.seed)
+    finally:
+        # Flushes the games recorded so far, however the run ends
+        if writer is not None:
+            writer.close()
+    if args.profile:
+        print(profiler.summary())
+    if args.profile_json:
+        with open(args.profile_json, "w") as file:
+            file.write(profiler.to_json())
+
+
+def stream_results(args, strategies):
+    aggregators = standard_aggregators(len(strategies))
+
+    def report_progress(record):
+        if (record.game_index + 1) % 1000 == 0:
+            print(f"{record.game_index + 1} games")
+            for aggregator in aggregators:
+                print(f"    {aggregator.summary()}")
+
+    sinks = [ConsoleEventSink()] if args.verbose else []
+    run_stream(
+        strategies,
+        args.games,
+        args.seed,
+        aggregators,
+        path=args.results,
+        events=MultiEventSink(*sinks),
+        on_record=report_progress,
+    )
+    print("\n".join(aggregator.summary() for aggregator in aggregators))
+
+
+def benchmark(args, strategies):
+    print(run_benchmark(strategies, args.games, seed=args.seed).report())
+
+
+def run_sprt(args, strategies):
+    print(sprt(strategies[0], strategies[1], strategies[2:], max_games=args.games, seed=args.seed))
+
+
+def league(args, strategies):
+    pool, names = make_pool()
+    standings = run_league(
+        pool,
+        args.league,
+        seed=args.seed,
+        workers=args.workers,
+        table_count=args.tables,
+        names=names,
+        on_update=lambda standings: print(f"\r{standings.games} games", end="", flush=True),
+    )
+    print()
+    print(standings.report())
+
+
+def tune(args, strategies):
+    space, opponents = {
+        "tallest-daisy": (TALLEST_DAISY_SPACE, strategies[1:]),
+        "double-take": (DOUBLE_TAKE_SPACE, [strategies[0], strategies[2]]),
+    }[args.tune]
+    tuner = PreferenceTuner(space, opponents, seed=args.seed, workers=args.workers)
+
+    def report_round(tuning_round):
+        best = tuning_round.ranking[0]
+        print(f"{len(tuning_round.ranking)} candidates after {tuning_round.games} games each")
+        print(f"    best {space.describe(best)}: {tuner.fitness(best)}")
+
+    tuner.successive_halving(on_round=report_round)
+
+
+def train_q(args, strategies):
+    table = train(
+        args.games,
+        len(strategies),
+        seed=args.seed,
+        workers=args.workers,
+        on_batch=lambda games, decisions: print(f"\r{games} games, {decisions} decisions", end="", flush=True),
+    )
+    print()
+    table.save(args.train_q)
+    print(run_benchmark([QTableStrategy(table), *strategies[1:]], DEFAULT_GAMES, seed=args.seed).report())
+
+
+MODES = {
+    "play": play,
+    "results": stream_results,
+    "benchmark": benchmark,
+    "sprt": run_sprt,
+    "league": league,
+    "tune": tune,
+    "train_q": train_q,
+}
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description="Play a series of Peruke games between the standard strategies")
+    parser.add_argument("--games", type=int, help=f"number of games to play, {DEFAULT_GAMES} by default")
+    parser.add_argument("--verbose", action="store_true", help="print a commentary of every game")
+    parser.add_argument("--seed", type=int, default=42, help="master seed; results do not depend on --workers")
+    parser.add_argument("--workers", type=int, help="number of worker processes, 1 by default")
+    parser.add_argument("--record", help="append a binary log of every game to this trajectory file")
+    parser.add_argument("--tables", type=int, help="number of league tables; a full round robin by default")
+    parser.add_argument("--profile", action="store_true", help="print time spent in each phase of the games")
+    parser.add_argument("--profile-json", help="write the profile as JSON to this file")
+
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument(
+        "--benchmark", action="store_true", help="report win rates with confidence intervals, by seat, and Elo"
+    )
+    modes.add_argument(
+        "--sprt", action="store_true", help="test the first strategy against the second, stopping when significant"
+    )
+    modes.add_argument(
+        "--league",
+        type=int,
+        choices=[2, 3, 4],
+        help="rank variants of the strategies in a league with tables of this many players",
+    )
+    modes.add_argument(
+        "--tune",
+        choices=["tallest-daisy", "double-take"],
+        help="search for the best preference table of a strategy against the other two standard strategies",
+    )
+    modes.add_argument(
+        "--train-q", help="train a Q-table by --games games of self-play on --workers processes, saving it to this file"
+    )
+    modes.add_argument(
+        "--results", help="append a CSV record of every game to this file, resuming the series if it has games already"
+    )
+    return parser
+
+
+def parse_args(parser, argv=None):
+    """Parse and check the arguments, returning them and the mode they select."""
+    args = parser.parse_args(argv)
+    mode = next((mode for mode in MODES if mode != "play" and getattr(args, mode)), "play")
+    option_mode = "--" + mode.replace("_", "-") if mode != "play" else "a plain series"
+    for option in ["games", "workers", "verbose", "record", "tables", "profile", "profile_json"]:
+        if getattr(args, option) not in (None, False) and option not in MODE_OPTIONS[mode]:
+            parser.error(f"--{option.replace('_', '-')} does not apply to {option_mode}")
+
+    if args.games is None:
+        args.games = DEFAULT_GAMES
+    if args.workers is None:
+        args.workers = 1
+    if args.workers > 1 and (args.record or args.profile or args.profile_json):
+        parser.error("--record and --profile need a single worker")
+    return args, mode
+
+
 if __name__ == "__main__":
-    random.seed(42)
-    strategies = make_strategies()
-    run_games(strategies, 1000)
+    args, mode = parse_args(make_parser())
+    MODES[mode](args, make_strategies())
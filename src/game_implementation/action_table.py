@@ -0,0 +1,57 @@
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+from game_implementation.action import Action
+from game_implementation.disc_state import DISC_BITS, DISC_CODES, DISC_MASK, DISC_STATES, DiscState
+from game_implementation.player import Player, possible_new_state
+from game_implementation.types import DiscId, PlayerCount
+
+ActionTable = List[List[Tuple[Tuple[Action, ...], ...]]]
+"""Legal actions indexed by [acting player][disc id][disc column]"""
+
+ACTIONS = {
+    (target_id, disc_id, new_state): Action(target_id, disc_id, new_state)
+    for target_id in range(4)
+    for disc_id in range(6)
+    for new_state in DiscState
+}
+"""Interned actions, shared by every game"""
+
+
+def disc_column(players: Sequence[Player], disc_id: DiscId) -> int:
+    """Pack the state of one disc across all players, 2 bits per player with player 0 in the lowest bits."""
+    column = 0
+    for player in reversed(players):
+        column = (column << DISC_BITS) | DISC_CODES[player.discs[disc_id]]
+    return column
+
+
+def _legal_actions(player_count: PlayerCount, player_id: int, disc_id: DiscId, column: int) -> Tuple[Action, ...]:
+    actions = []
+    for target_id in range(player_count):
+        code = (column >> (DISC_BITS * target_id)) & DISC_MASK
+        if code >= len(DISC_STATES):
+            return ()
+        new_state = possible_new_state(DISC_STATES[code], target_id == player_id)
+        if new_state is not None:
+            actions.append(ACTIONS[(target_id, disc_id, new_state)])
+    return tuple(actions)
+
+
+@lru_cache(maxsize=None)
+def action_table(player_count: PlayerCount) -> ActionTable:
+    """
+    Precomputed legal actions for every state of a disc across all players.
+
+    The same tuples are returned for every lookup, so callers must not modify them.
+    """
+    return [
+        [
+            tuple(
+                _legal_actions(player_count, player_id, disc_id, column)
+                for column in range(1 << (DISC_BITS * player_count))
+            )
+            for disc_id in range(6)
+        ]
+        for player_id in range(player_count)
+    ]
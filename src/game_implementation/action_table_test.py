@@ -0,0 +1,47 @@
+import itertools
+
+import pytest
+
+from game_implementation.action import Action
+from game_implementation.action_table import action_table, disc_column
+from game_implementation.disc_state import DISC_STATES, DiscState
+from game_implementation.game import Game
+from game_implementation.player import Player
+
+
+class TestActionTable:
+    @pytest.mark.parametrize("player_count", [2, 3, 4])
+    def test_matches_player_rules(self, player_count):
+        table = action_table(player_count)
+
+        for disc_id in (0, 5):
+            for states in itertools.product(DISC_STATES, repeat=player_count):
+                players = [Player(target_id, init_disks={disc_id: state}) for target_id, state in enumerate(states)]
+                for player_id in range(player_count):
+                    expected = [
+                        Action(target.player_id, disc_id, new_state)
+                        for target in players
+                        for new_state in [target.possible_new_state(disc_id, target.player_id == player_id)]
+                        if new_state is not None
+                    ]
+
+                    assert [*table[player_id][disc_id][disc_column(players, disc_id)]] == expected
+
+    def test_actions_are_interned(self):
+        game = Game(player_count=3)
+        other_game = Game(player_count=3)
+
+        assert game.possible_actions(0, 2) is other_game.possible_actions(0, 2)
+
+    def test_possible_actions_follow_disc_changes(self):
+        game = Game(player_count=2)
+
+        game.play_action(0, Action(1, 3, DiscState.Gone))
+        assert [*game.possible_actions(0, 3)] == [Action(0, 3, DiscState.Safe)]
+
+        game.play_action(0, Action(0, 3, DiscState.Safe))
+        assert [*game.possible_actions(0, 3)] == []
+        assert [*game.possible_actions(1, 3)] == [Action(0, 3, DiscState.Vulnerable)]
+
+        game.end_round(0)
+        assert [*game.possible_actions(0, 3)] == [Action(0, 3, DiscState.Safe), Action(1, 3, DiscState.Gone)]
@@ -0,0 +1,296 @@
+from typing import Dict, Optional, Protocol, Sequence, Union
+
+import numpy as np
+
+from game_implementation.disc_state import DISC_CODES, DiscState
+from game_implementation.exceptions import IllegalMoveException
+from game_implementation.types import PlayerCount
+
+VULNERABLE = DISC_CODES[DiscState.Vulnerable]
+SAFE = DISC_CODES[DiscState.Safe]
+GONE = DISC_CODES[DiscState.Gone]
+
+DISC_SCORES = np.arange(1, 7, dtype=np.int16)
+
+# Indexed by 3 * (target is the current player) + current state of the target's disc
+_LEGAL = np.array([True, True, False, True, False, False])
+_NEW_STATE = np.array([GONE, VULNERABLE, GONE, SAFE, SAFE, SAFE], dtype=np.int8)
+# Sign of the change to the target's expected score, indexed by the disc's new state
+_SAFE_SIGN = np.array([-1, 1, 0], dtype=np.int16)
+
+
+class BatchStrategy(Protocol):
+    def choose_targets(
+        self, batch: "BatchGame", games: np.ndarray, die: np.ndarray, legal: np.ndarray, new_states: np.ndarray
+    ) -> np.ndarray:
+        """
+        Choose the player to play a die against, for many games at once.
+
+        Args:
+            batch: games being played
+            games: indices of the games to choose for; the current player of each is `batch.player_id[games]`
+            die: die rolled in each game
+            legal: (games, players) mask of players the die can be played against
+            new_states: (games, players) state the target's disc would move to, where legal
+
+        Returns:
+            target player for each game; ignored where no target is legal
+        """
+        pass
+
+
+class BatchGame:
+    """
+    Many independent games played in lockstep on NumPy arrays.
+
+    Follows the same rules as `Game`: dice are used in the order rolled, every usable die must be used, a round
+    ends after a turn in which any player loses all their discs, the player after the one whose turn ended the
+    round wins it, and the game ends after one round per player.
+    """
+
+    player_count: PlayerCount
+    taken: np.ndarray
+    """(games, players) total score of discs taken this round"""
+    scores: np.ndarray
+    """(games, players) cumulative score from previous rounds"""
+    expected: np.ndarray
+    """(games, players) putative scores if the current round ended now, kept up to date with the other arrays"""
+    gone: np.ndarray
+    """(games, players) number of gone discs, kept up to date with `discs`"""
+    player_id: np.ndarray
+    """(games,) player whose turn is next"""
+    round: np.ndarray
+    turn: np.ndarray
+    done: np.ndarray
+    """(games,) True once a game is over"""
+
+    def __init__(
+        self,
+        game_count: int,
+        player_count: PlayerCount = 3,
+        start_player: Union[int, np.ndarray] = 0,
+        rng: Optional[np.random.Generator] = None,
+    ):
+        self.game_count = game_count
+        self.player_count = player_count
+        self.rng = rng if rng is not None else np.random.default_rng()
+        # Stored die-major so the states of one disc across all players are contiguous
+        self._discs = np.full((game_count, 6, player_count), VULNERABLE, dtype=np.int8)
+        self.taken = np.zeros((game_count, player_count), dtype=np.int16)
+        self.scores = np.zeros((game_count, player_count), dtype=np.int16)
+        self.expected = np.zeros((game_count, player_count), dtype=np.int16)
+        self.gone = np.zeros((game_count, player_count), dtype=np.int8)
+        self.start_player = np.broadcast_to(np.asarray(start_player, dtype=np.int8), (game_count,)).copy()
+        self.player_id = self.start_player.copy()
+        self.round = np.zeros(game_count, dtype=np.int8)
+        self.turn = np.zeros(game_count, dtype=np.int32)
+        self.done = np.zeros(game_count, dtype=bool)
+
+    @property
+    def discs(self) -> np.ndarray:
+        """(games, players, 6) view of the disc states, coded as in `disc_state.DISC_CODES`"""
+        return self._discs.transpose(0, 2, 1)
+
+    def roll_dice(self, count: int) -> np.ndarray:
+        """Roll three dice for each of `count` games, (count, 3)."""
+        return self.rng.integers(0, 6, size=(count, 3), dtype=np.int8)
+
+    def expected_scores(self, games: np.ndarray) -> np.ndarray:
+        """(games, players) putative scores if the current round ended now."""
+        return self.expected[games]
+
+    def _action_codes(self, games: np.ndarray, die: np.ndarray) -> np.ndarray:
+        own = np.arange(self.player_count) == self.player_id[games, None]
+        return 3 * own + self.discs[games, :, die]
+
+    def legal_targets(self, games: np.ndarray, die: np.ndarray) -> np.ndarray:
+        """(games, players) mask of players the current player can play the die against."""
+        return _LEGAL[self._action_codes(games, die)]
+
+    def new_states(self, games: np.ndarray, die: np.ndarray) -> np.ndarray:
+        """(games, players) disc state each player's disc would move to if the die were played against them."""
+        return _NEW_STATE[self._action_codes(games, die)]
+
+    def play_action(
+        self, games: np.ndarray, die: np.ndarray, targets: np.ndarray, new_states: Optional[np.ndarray] = None
+    ) -> None:
+        """Play a die against a target player in each game; the moves must be legal."""
+        if new_states is None:
+            new_states = self.new_states(games, die)
+        player_cells = games * self.player_count + self.player_id[games]
+        new_state = new_states[np.arange(len(games)), targets]
+        self._apply_actions(games, player_cells, targets, die, new_state, np.ones(len(games), dtype=bool))
+
+    def _apply_actions(
+        self,
+        games: np.ndarray,
+        player_cells: np.ndarray,
+        targets: np.ndarray,
+        die: np.ndarray,
+        new_state: np.ndarray,
+        played: np.ndarray,
+    ) -> None:
+        # Flat indices into (C contiguous) views are much cheaper than multi-dimensional fancy indexing, and
+        # applying unplayed dice as no-ops is cheaper than compressing every array down to the played games
+        target_cells = games * self.player_count + targets
+        disc_cells = ((games * 6 + die) * self.player_count) + targets
+        discs = self._discs.reshape(-1)
+        new_state = np.where(played, new_state, discs[disc_cells])
+        discs[disc_cells] = new_state
+        score = np.where(played, die.astype(np.int16) + 1, np.int16(0))
+        expected = self.expected.reshape(-1)
+        expected[target_cells] += _SAFE_SIGN[new_state] * score
+        taken = (new_state == GONE) & played
+        self.gone.reshape(-1)[target_cells] += taken
+        taken_score = score * taken
+        self.taken.reshape(-1)[player_cells] += taken_score
+        expected[player_cells] += taken_score
+
+    def is_round_over(self, games: np.ndarray) -> np.ndarray:
+        gone = self.gone[games]
+        over = gone[:, 0] == 6
+        for player_id in range(1, self.player_count):
+            over |= gone[:, player_id] == 6
+        return over
+
+    def set_initial_defence(self, games: Optional[np.ndarray] = None) -> None:
+        """Roll dice for each player and use them to set initial safe discs, in the given games or all games."""
+        if games is None:
+            games = np.arange(self.game_count)
+        for player_id in range(self.player_count):
+            dice = self.roll_dice(len(games))
+            for die_index in range(3):
+                self.discs[games, player_id, dice[:, die_index]] = SAFE
+        self.recompute_totals(games)
+
+    def recompute_totals(self, games: Optional[np.ndarray] = None) -> None:
+        """Recompute `expected` and `gone` after `discs`, `taken` or `scores` have been set directly."""
+        if games is None:
+            games = np.arange(self.game_count)
+        discs = self.discs[games]
+        self.expected[games] = self.scores[games] + self.taken[games] + ((discs == SAFE) * DISC_SCORES).sum(axis=2)
+        self.gone[games] = (discs == GONE).sum(axis=2)
+
+    def reset(self, games: np.ndarray) -> None:
+        """Start new games in place of the given games, with the same start players; initial defence is not set."""
+        self._discs[games] = VULNERABLE
+        self.taken[games] = 0
+        self.scores[games] = 0
+        self.expected[games] = 0
+        self.gone[games] = 0
+        self.player_id[games] = self.start_player[games]
+        self.round[games] = 0
+        self.turn[games] = 0
+        self.done[games] = False
+
+    def take_turn(self, games: np.ndarray, strategies: Sequence[BatchStrategy]) -> np.ndarray:
+        """
+        Roll dice for the current player of each game, choose and take actions.
+
+        Returns:
+            mask of the games whose round is over
+        """
+        count = len(games)
+        dice = self.roll_dice(count)
+        player_ids = self.player_id[games]
+        # Seats sharing a strategy are decided in one call; a single strategy for every seat needs no selection
+        seat_groups = {}
+        for player_id, strategy in enumerate(strategies):
+            seat_groups.setdefault(id(strategy), (strategy, []))[1].append(player_id)
+        groups = [
+            (strategy, None if len(seats) == self.player_count else np.flatnonzero(np.isin(player_ids, seats)))
+            for strategy, seats in seat_groups.values()
+        ]
+        own = 3 * (np.arange(self.player_count) == player_ids[:, None])
+        disc_rows = games * 6
+        player_cells = games * self.player_count + player_ids
+        chosen_offset = np.arange(count) * self.player_count
+        discs = self._discs.reshape(-1, self.player_count)
+        for die_index in range(3):
+            die = dice[:, die_index]
+            codes = own + np.take(discs, disc_rows + die, axis=0)
+            legal = np.take(_LEGAL, codes)
+            new_states = np.take(_NEW_STATE, codes)
+            targets = np.zeros(count, dtype=np.intp)
+            for strategy, rows in groups:
+                if rows is None:
+                    targets = strategy.choose_targets(self, games, die, legal, new_states)
+                elif len(rows):
+                    targets[rows] = strategy.choose_targets(self, games[rows], die[rows], legal[rows], new_states[rows])
+            chosen = chosen_offset + targets
+            played = np.take(legal, chosen)
+            usable = legal[:, 0].copy()
+            for target in range(1, self.player_count):
+                usable |= legal[:, target]
+            if np.count_nonzero(played) != np.count_nonzero(usable):
+                raise IllegalMoveException("Strategy chose an illegal target for a usable die")
+            self._apply_actions(games, player_cells, targets, die, np.take(new_states, chosen), played)
+        self.turn[games] += 1
+        return self.is_round_over(games)
+
+    def end_round(self, games: np.ndarray, winner_ids: np.ndarray) -> None:
+        """Winners take vulnerable discs; update all players' scores with safe and taken discs."""
+        discs = self.discs[games]
+        vulnerable = ((discs == VULNERABLE) * DISC_SCORES).sum(axis=2)
+        winner = np.arange(self.player_count) == winner_ids[:, None]
+        self.taken[games, winner_ids] += np.where(winner, 0, vulnerable).sum(axis=1).astype(np.int16)
+        safe = ((discs == SAFE) * DISC_SCORES).sum(axis=2)
+        self.scores[games] += self.taken[games] + safe.astype(np.int16)
+        self.taken[games] = 0
+        self.expected[games] = self.scores[games]
+        self.gone[games] = 0
+        self.discs[games] = VULNERABLE
+        self.turn[games] = 0
+        self.round[games] += 1
+        self.done[games] = self.round[games] == self.player_count
+
+    def end_turn(self, games: np.ndarray, round_over: np.ndarray) -> None:
+        """Pass play to the next player, ending rounds (and games) where `round_over`, as `Game.play_round`."""
+        self.player_id[games] = (self.player_id[games] + 1) % self.player_count
+        ended = games[round_over]
+        self.end_round(ended, self.player_id[ended])
+
+    def step(self, strategies: Sequence[BatchStrategy], games: Optional[np.ndarray] = None) -> None:
+        """Take one turn in the given unfinished games, or every unfinished game, ending rounds and games."""
+        if games is None:
+            games = np.flatnonzero(~self.done)
+        self.end_turn(games, self.take_turn(games, strategies))
+
+    def play(self, strategies: Sequence[BatchStrategy]) -> np.ndarray:
+        """Play every game to the end, returns the `winners` mask."""
+        self.set_initial_defence()
+        while not self.done.all():
+            self.step(strategies)
+        return self.winners()
+
+    def winners(self) -> np.ndarray:
+        """(games, players) mask of player(s) with highest score"""
+        return self.scores == self.scores.max(axis=1, keepdims=True)
+
+
+class BatchRandomStrategy(BatchStrategy):
+    """Array version of `RandomStrategy`: play each die against a uniformly chosen legal target."""
+
+    def choose_targets(
+        self, batch: BatchGame, games: np.ndarray, die: np.ndarray, legal: np.ndarray, new_states: np.ndarray
+    ) -> np.ndarray:
+        return np.argmax(batch.rng.random(legal.shape, dtype=np.float32) * legal, axis=1)
+
+
+class BatchTallestDaisyStrategy(BatchStrategy):
+    """Array version of `TallestDaisyStrategy`: prefer by action type, then the lowest expected score."""
+
+    def __init__(self, action_preference: Dict[DiscState, int]):
+        self.action_preference = action_preference
+        self.preference_by_code = np.zeros(len(DISC_CODES), dtype=np.int64)
+        for disc_state, preference in action_preference.items():
+            self.preference_by_code[DISC_CODES[disc_state]] = preference
+
+    def choose_targets(
+        self, batch: BatchGame, games: np.ndarray, die: np.ndarray, legal: np.ndarray, new_states: np.ndarray
+    ) -> np.ndarray:
+        preference = self.preference_by_code[new_states]
+        expected = batch.expected_scores(games)
+        # Same order as sorting on (preference, -expected score) and taking the last: ties go to the later player
+        key = (preference * 4096 - expected) * batch.player_count + np.arange(batch.player_count)
+        return np.argmax(np.where(legal, key, np.iinfo(np.int64).min), axis=1)
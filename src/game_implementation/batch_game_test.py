@@ -0,0 +1,109 @@
+from typing import List
+
+import numpy as np
+import pytest
+from pytest_mock import MockFixture
+
+from game_implementation.batch_game import (
+    BatchGame,
+    BatchRandomStrategy,
+    BatchTallestDaisyStrategy,
+    GONE,
+    SAFE,
+    VULNERABLE,
+)
+from game_implementation.exceptions import IllegalMoveException
+from game_implementation.game import Game
+from game_implementation.strategy import TALLEST_DAISY_PREFERENCE, TallestDaisyStrategy
+
+
+class RecordingBatchGame(BatchGame):
+    """Batch game that records the dice rolled in each game, in order"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rolls: List[List[List[int]]] = [[] for _ in range(self.game_count)]
+        self.rolling_games = np.arange(self.game_count)
+
+    def roll_dice(self, count: int) -> np.ndarray:
+        dice = super().roll_dice(count)
+        for game, roll in zip(self.rolling_games, dice.tolist()):
+            self.rolls[game].append(roll)
+        return dice
+
+    def take_turn(self, games, strategies):
+        self.rolling_games = games
+        return super().take_turn(games, strategies)
+
+
+class TestBatchGame:
+    @pytest.mark.parametrize("player_count", [2, 3, 4])
+    def test_matches_game(self, mocker: MockFixture, player_count: int):
+        game_count = 30
+        batch = RecordingBatchGame(
+            game_count, player_count, start_player=np.arange(game_count) % player_count, rng=np.random.default_rng(5)
+        )
+
+        batch.play([BatchTallestDaisyStrategy(TALLEST_DAISY_PREFERENCE)] * player_count)
+
+        for game_index, rolls in enumerate(batch.rolls):
+            initial_rolls, turn_rolls = rolls[:player_count], rolls[player_count:]
+            mocker.patch("game_implementation.game.get_unique_dice", side_effect=[{*roll} for roll in initial_rolls])
+            mocker.patch("game_implementation.game.get_dice", side_effect=turn_rolls)
+            game = Game(player_count=player_count, start_player=game_index % player_count)
+
+            winners = game.play([TallestDaisyStrategy(TALLEST_DAISY_PREFERENCE)] * player_count)
+
+            assert [player.score for player in game.players] == batch.scores[game_index].tolist()
+            assert [*winners] == np.flatnonzero(batch.winners()[game_index]).tolist()
+
+    def test_play_finishes_every_game(self):
+        batch = BatchGame(200, 3, rng=np.random.default_rng(1))
+
+        winners = batch.play(
+            [BatchRandomStrategy(), BatchTallestDaisyStrategy(TALLEST_DAISY_PREFERENCE), BatchRandomStrategy()]
+        )
+
+        assert batch.done.all()
+        assert (batch.round == 3).all()
+        assert winners.any(axis=1).all()
+        assert (batch.discs == VULNERABLE).all()
+
+    def test_legal_targets_and_play_action(self):
+        batch = BatchGame(2, 2)
+        batch.discs[0, 0, 3] = SAFE
+        batch.discs[0, 1, 3] = SAFE
+        batch.discs[1, 1, 3] = GONE
+        batch.player_id[:] = 0
+        batch.recompute_totals()
+        games = np.arange(2)
+        die = np.array([3, 3])
+
+        assert batch.legal_targets(games, die).tolist() == [[False, True], [True, False]]
+
+        batch.play_action(games, die, np.array([1, 0]))
+
+        assert batch.discs[:, :, 3].tolist() == [[SAFE, VULNERABLE], [SAFE, GONE]]
+        assert batch.expected_scores(games).tolist() == [[4, 0], [4, 0]]
+
+    def test_end_round(self):
+        batch = BatchGame(1, 3)
+        batch.discs[0, 0] = GONE
+        batch.discs[0, 2, 5] = SAFE
+        batch.taken[0, 2] = 21
+
+        batch.end_round(np.array([0]), np.array([1]))
+
+        assert batch.scores[0].tolist() == [0, 15, 21 + 6]
+        assert batch.round[0] == 1
+        assert not batch.done[0]
+
+    def test_illegal_target(self):
+        class BadStrategy:
+            def choose_targets(self, batch, games, die, legal, new_states):
+                return np.argmin(legal, axis=1)
+
+        batch = BatchGame(10, 2, rng=np.random.default_rng(0))
+
+        with pytest.raises(IllegalMoveException):
+            batch.take_turn(np.arange(10), [BadStrategy()] * 2)
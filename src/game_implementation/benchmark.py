@@ -0,0 +1,280 @@
+"""
+Benchmarking strategies against each other with confidence intervals, seat and turn order breakdowns, Elo ratings
+and sequential testing.
+
+Ties are shared: a game won jointly by two players scores 1/2 for each, so win rates across the players of a game
+add up to one.
+"""
+import math
+import random
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+from game_implementation.dice import SeededDice
+from game_implementation.game import Game
+from game_implementation.game_events import GameEventSink, NULL_EVENT_SINK
+from game_implementation.game_runner import derive_seed
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.types import PlayerId
+
+Z_95 = 1.959963984540054
+"""Normal quantile for a two sided 95% confidence interval"""
+
+
+def wilson_interval(successes: float, trials: int, z: float = Z_95) -> Tuple[float, float]:
+    """Wilson score interval for a proportion; fractional successes (shared wins) are accepted."""
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    z2 = z * z
+    centre = (p + z2 / (2 * trials)) / (1 + z2 / trials)
+    half_width = z * math.sqrt(p * (1 - p) / trials + z2 / (4 * trials * trials)) / (1 + z2 / trials)
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+def elo_expected_score(elo_difference: float) -> float:
+    return 1 / (1 + 10 ** (-elo_difference / 400))
+
+
+def play_seated(
+    strategies: Sequence[Strategy], start_player: PlayerId, seed: int, events: GameEventSink = NULL_EVENT_SINK
+) -> Game:
+    """
+    Play one game, returning the finished game. The dice are rolled from `seed`, and the random module, which
+    random strategies use, is seeded from a stream derived from it; so games with the same seed roll the same dice
+    whoever sits where and whatever the strategies choose.
+    """
+    random.seed(derive_seed(seed, 0))
+    game = Game(player_count=len(strategies), start_player=start_player, events=events, dice_source=SeededDice(seed))
+    game.play(strategies)
+    return game
+
+
+class WinStats:
+    """Results of one strategy, overall or in one seat or turn order position."""
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        """Games won outright"""
+        self.ties = 0
+        """Games won jointly with other players"""
+        self.shares = 0.0
+        """Games won, a tie counting as a share of a win"""
+
+    def add(self, winner_count: int) -> None:
+        """Add a game with `winner_count` joint winners including this strategy, or 0 if it lost."""
+        self.games += 1
+        if winner_count == 1:
+            self.wins += 1
+        elif winner_count > 1:
+            self.ties += 1
+        if winner_count:
+            self.shares += 1 / winner_count
+
+    @property
+    def win_rate(self) -> float:
+        return self.shares / self.games if self.games else 0.0
+
+    def interval(self, z: float = Z_95) -> Tuple[float, float]:
+        return wilson_interval(self.shares, self.games, z)
+
+    def __repr__(self):
+        low, high = self.interval()
+        return f"{self.win_rate:6.1%} [{low:6.1%}, {high:6.1%}] ({self.wins} won, {self.ties} tied of {self.games})"
+
+
+class EloRatings:
+    """
+    Online Elo ratings from multiplayer games, each game counting as the head to head results of every pair of
+    strategies in it: the higher final score wins the pair, equal scores draw.
+    """
+
+    def __init__(self, strategy_count: int, k: float = 16.0, initial: float = 1500.0):
+        self.k = k
+        self.ratings = [initial] * strategy_count
+
+    def update(self, lineup: Sequence[int], scores: Sequence[int]) -> None:
+        """
+        Args:
+            lineup: strategy index in each seat
+            scores: final score of each seat
+        """
+        seats = len(lineup)
+        changes = [0.0] * len(self.ratings)
+        for first in range(seats):
+            for second in range(first + 1, seats):
+                a, b = lineup[first], lineup[second]
+                if a == b:
+                    continue
+                actual = 1.0 if scores[first] > scores[second] else 0.5 if scores[first] == scores[second] else 0.0
+                change = self.k / (seats - 1) * (actual - elo_expected_score(self.ratings[a] - self.ratings[b]))
+                changes[a] += change
+                changes[b] -= change
+        self.ratings = [rating + change for rating, change in zip(self.ratings, changes)]
+
+
+class BenchmarkResult:
+    """Results of `run_benchmark`, indexed by strategy, then seat or turn order position."""
+
+    def __init__(self, names: Sequence[str], seed: int, k: float = 16.0):
+        count = len(names)
+        self.names = [*names]
+        self.seed = seed
+        self.games = 0
+        self.overall = [WinStats() for _ in range(count)]
+        self.by_seat = [[WinStats() for _ in range(count)] for _ in range(count)]
+        self.by_order = [[WinStats() for _ in range(count)] for _ in range(count)]
+        """Results by position in the turn order: 0 for the start player, then the players after them"""
+        self.elo = EloRatings(count, k=k)
+
+    def add_game(self, lineup: Sequence[int], game: Game) -> None:
+        player_count = len(lineup)
+        winners = game.winners()
+        self.games += 1
+        for seat, strategy_index in enumerate(lineup):
+            winner_count = len(winners) if seat in winners else 0
+            self.overall[strategy_index].add(winner_count)
+            self.by_seat[strategy_index][seat].add(winner_count)
+            self.by_order[strategy_index][(seat - game.start_player) % player_count].add(winner_count)
+        self.elo.update(lineup, [player.score for player in game.players])
+
+    def report(self) -> str:
+        width = max(len(name) for name in self.names)
+        lines = [f"{self.games} games, seed {self.seed}, win rate [95% interval]"]
+        for index, name in enumerate(self.names):
+            lines.append(f"{name:{width}}  Elo {self.elo.ratings[index]:6.0f}  {self.overall[index]}")
+            for seat, stats in enumerate(self.by_seat[index]):
+                lines.append(f"{'':{width}}    seat {seat}: {stats}")
+            for order, stats in enumerate(self.by_order[index]):
+                lines.append(f"{'':{width}}    turn {order}: {stats}")
+        return "\n".join(lines)
+
+
+def run_benchmark(
+    strategies: Sequence[Strategy],
+    games: int,
+    seed: Optional[int] = None,
+    names: Optional[Sequence[str]] = None,
+) -> BenchmarkResult:
+    """
+    Play a series of games with one player per strategy, balancing seats and start players.
+
+    Game i starts with player i % n and seats the strategies rotated by (i // n) % n places, so every n * n games
+    each strategy plays every seat with every start player once.
+
+    Args:
+        strategies: one per player
+        games: number of games to play
+        seed: master seed; game i is seeded from it and i, see `game_runner.derive_seed`
+        names: of the strategies in the report, their class names by default
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 63)
+    count = len(strategies)
+    result = BenchmarkResult(names or [type(strategy).__name__ for strategy in strategies], seed)
+    for game_index in range(games):
+        rotation = (game_index // count) % count
+        lineup = [(seat + rotation) % count for seat in range(count)]
+        game = play_seated([strategies[index] for index in lineup], game_index % count, derive_seed(seed, game_index))
+        result.add_game(lineup, game)
+    return result
+
+
+class SprtResult(NamedTuple):
+    games: int
+    wins: int
+    draws: int
+    losses: int
+    llr: float
+    """Log likelihood ratio of H1 (candidate is elo1 stronger) to H0 (candidate is elo0 stronger)"""
+    lower: float
+    upper: float
+    accepted: Optional[bool]
+    """True if H1 was accepted, False if H0 was, None if the game limit was reached first"""
+
+    @property
+    def score(self) -> float:
+        return (self.wins + self.draws / 2) / self.games if self.games else 0.5
+
+    @property
+    def elo(self) -> float:
+        """Elo difference estimated from the score"""
+        score = min(max(self.score, 1e-6), 1 - 1e-6)
+        return -400 * math.log10(1 / score - 1)
+
+
+def sprt_llr(wins: int, draws: int, losses: int, elo0: float, elo1: float) -> float:
+    """
+    Generalised SPRT log likelihood ratio of H1: score = E(elo1) against H0: score = E(elo0), using the normal
+    approximation for a win/draw/loss outcome with the observed variance.
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0
+    mean = (wins + draws / 2) / games
+    variance = (wins + draws / 4) / games - mean * mean
+    if variance <= 0:
+        return 0.0
+    score0 = elo_expected_score(elo0)
+    score1 = elo_expected_score(elo1)
+    return games * (score1 - score0) * (2 * mean - score0 - score1) / (2 * variance)
+
+
+def sprt(
+    candidate: Strategy,
+    baseline: Strategy,
+    opponents: Sequence[Strategy] = (),
+    elo0: float = 0.0,
+    elo1: float = 30.0,
+    alpha: float = 0.05,
+    beta: float = 0.05,
+    max_games: int = 100_000,
+    seed: Optional[int] = None,
+) -> SprtResult:
+    """
+    Compare two strategies with a sequential probability ratio test, stopping as soon as either hypothesis is
+    accepted.
+
+    Each game counts as a win, draw or loss for the candidate by comparing its final score with the baseline's.
+    Games are played in pairs with the same dice and start player, the candidate and baseline swapping seats, which
+    cancels much of the luck of the dice; the seats of the pair and opponents rotate from pair to pair.
+
+    Args:
+        candidate: strategy under test
+        baseline: strategy to compare against
+        opponents: strategies for any further seats
+        elo0: Elo advantage of the candidate under H0
+        elo1: Elo advantage of the candidate under H1
+        alpha: probability of accepting H1 when H0 holds
+        beta: probability of accepting H0 when H1 holds
+        max_games: stop undecided after this many games
+        seed: master seed; pair k is seeded from it and k
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 63)
+    lower = math.log(beta / (1 - alpha))
+    upper = math.log((1 - beta) / alpha)
+    lineup = [candidate, baseline, *opponents]
+    count = len(lineup)
+    wins = draws = losses = 0
+    llr = 0.0
+    for game_index in range(max_games):
+        pair = game_index // 2
+        rotation = (pair // count) % count
+        seats = [(seat + rotation) % count for seat in range(count)]
+        candidate_seat, baseline_seat = seats.index(0), seats.index(1)
+        if game_index % 2:
+            candidate_seat, baseline_seat = baseline_seat, candidate_seat
+            seats[candidate_seat], seats[baseline_seat] = 0, 1
+        game = play_seated([lineup[index] for index in seats], pair % count, derive_seed(seed, pair))
+        difference = game.players[candidate_seat].score - game.players[baseline_seat].score
+        if difference > 0:
+            wins += 1
+        elif difference == 0:
+            draws += 1
+        else:
+            losses += 1
+        llr = sprt_llr(wins, draws, losses, elo0, elo1)
+        if game_index % 2 and not lower < llr < upper:
+            return SprtResult(game_index + 1, wins, draws, losses, llr, lower, upper, llr >= upper)
+    return SprtResult(max_games, wins, draws, losses, llr, lower, upper, None)
@@ -0,0 +1,140 @@
+from typing import Collection, List
+
+import pytest
+
+from game_implementation.benchmark import (
+    EloRatings,
+    play_seated,
+    run_benchmark,
+    sprt,
+    sprt_llr,
+    wilson_interval,
+    WinStats,
+)
+from game_implementation.game import Game
+from game_implementation.game_events import GameEventSink
+from game_implementation.strategy import (
+    DOUBLE_TAKE_PREFERENCE,
+    PreferTakeOnDoubleSafeDie,
+    RandomStrategy,
+    TALLEST_DAISY_PREFERENCE,
+    TallestDaisyStrategy,
+)
+from game_implementation.types import DiscId, PlayerId
+
+
+def make_strategies():
+    return [
+        RandomStrategy(),
+        TallestDaisyStrategy(TALLEST_DAISY_PREFERENCE),
+        RandomStrategy(),
+    ]
+
+
+class DiceSink(GameEventSink):
+    def __init__(self):
+        self.rolls: List[List[DiscId]] = []
+
+    def dice_rolled(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> None:
+        self.rolls.append([*dice])
+
+
+class TestBenchmark:
+    @pytest.mark.parametrize(
+        "successes, trials, expected",
+        [
+            # reference values, e.g. from statsmodels proportion_confint(method="wilson")
+            (5, 10, (0.2366, 0.7634)),
+            (0, 10, (0.0, 0.2775)),
+            (10, 10, (0.7225, 1.0)),
+            (81, 263, (0.2553, 0.3662)),
+        ],
+    )
+    def test_wilson_interval(self, successes, trials, expected):
+        assert wilson_interval(successes, trials) == pytest.approx(expected, abs=1e-4)
+
+    def test_wilson_interval_without_trials(self):
+        assert wilson_interval(0, 0) == (0.0, 1.0)
+
+    def test_win_stats_share_ties(self):
+        stats = WinStats()
+        for winner_count in [1, 0, 2, 3]:
+            stats.add(winner_count)
+
+        assert (stats.games, stats.wins, stats.ties) == (4, 1, 2)
+        assert stats.win_rate == pytest.approx((1 + 1 / 2 + 1 / 3) / 4)
+
+    def test_elo_updates_pairs(self):
+        elo = EloRatings(3, k=16)
+        elo.update([0, 1, 2], [30, 20, 20])
+
+        assert elo.ratings == pytest.approx([1508, 1496, 1496])
+        assert sum(elo.ratings) == pytest.approx(4500)
+
+    def test_elo_ignores_same_strategy_pairs(self):
+        elo = EloRatings(2)
+        elo.update([0, 0, 1], [30, 20, 20])
+
+        # beats strategy 1 from seat 0 and draws with it from seat 1
+        assert elo.ratings == pytest.approx([1504, 1496])
+
+    def test_run_benchmark_balances_seats(self):
+        result = run_benchmark(make_strategies(), 18, seed=3)
+
+        assert result.games == 18
+        for index in range(3):
+            assert result.overall[index].games == 18
+            assert [stats.games for stats in result.by_seat[index]] == [6, 6, 6]
+            assert [stats.games for stats in result.by_order[index]] == [6, 6, 6]
+        # ties are shared, so win rates add up to one
+        assert sum(stats.shares for stats in result.overall) == pytest.approx(18)
+        assert result.report().startswith("18 games, seed 3")
+
+    def test_run_benchmark_is_reproducible(self):
+        first = run_benchmark(make_strategies(), 9, seed=5)
+        second = run_benchmark(make_strategies(), 9, seed=5)
+
+        assert first.report() == second.report()
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_swapped_seats_roll_the_same_dice(self, seed: int):
+        tallest_daisy = TallestDaisyStrategy(TALLEST_DAISY_PREFERENCE)
+        double_take = PreferTakeOnDoubleSafeDie(DOUBLE_TAKE_PREFERENCE)
+        first, second = DiceSink(), DiceSink()
+
+        play_seated([tallest_daisy, double_take, RandomStrategy()], 1, seed, first)
+        play_seated([double_take, tallest_daisy, RandomStrategy()], 1, seed, second)
+
+        # Rolls are the same until the shorter game ends
+        length = min(len(first.rolls), len(second.rolls))
+        assert length > 3
+        assert first.rolls[:length] == second.rolls[:length]
+
+    def test_sprt_llr(self):
+        assert sprt_llr(0, 0, 0, 0, 30) == 0
+        assert sprt_llr(10, 0, 10, 0, 30) < 0
+        assert sprt_llr(15, 0, 5, 0, 30) > 0
+
+    def test_sprt_accepts_stronger_candidate(self):
+        strategies = make_strategies()
+        result = sprt(strategies[1], strategies[0], strategies[2:], seed=1)
+
+        assert result.accepted is True
+        assert result.llr >= result.upper
+        assert result.games == result.wins + result.draws + result.losses
+        assert result.games % 2 == 0
+        assert result.elo > 0
+
+    def test_sprt_rejects_weaker_candidate(self):
+        strategies = make_strategies()
+        result = sprt(strategies[0], strategies[1], seed=1)
+
+        assert result.accepted is False
+        assert result.llr <= result.lower
+
+    def test_sprt_stops_at_game_limit(self):
+        strategies = make_strategies()
+        result = sprt(strategies[0], strategies[2], max_games=10, seed=1)
+
+        assert result.games == 10
+        assert result.accepted is None
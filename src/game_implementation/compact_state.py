@@ -0,0 +1,301 @@
+from typing import Collection, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+from game_implementation.action import Action
+from game_implementation.action_table import action_table
+from game_implementation.disc_state import DISC_BITS, DISC_CODES, DISC_MASK, DISC_STATES, DiscState
+from game_implementation.game import Game
+from game_implementation.game_events import GameEventSink, NULL_EVENT_SINK
+from game_implementation.player import Player
+from game_implementation.types import DiscId, DiscScore, PlayerCount, PlayerId
+
+PLAYER_BITS = 6 * DISC_BITS
+"""Bits used for each player's discs, and for each player's taken discs"""
+PLAYER_MASK = (1 << PLAYER_BITS) - 1
+ALL_GONE = sum(DISC_CODES[DiscState.Gone] << (DISC_BITS * disc_id) for disc_id in range(6))
+"""Packed discs of a player who has lost all their discs"""
+MAX_TAKEN_PER_SCORE = DISC_MASK
+"""A player can take each disc score at most once from each of (at most 3) opponents per round"""
+
+_TURN_BITS = 16
+_SCORE_BITS = 10
+
+
+def pack_discs(discs: Sequence[DiscState]) -> int:
+    """Pack six disc states into 12 bits, disc 0 in the lowest bits."""
+    packed = 0
+    for disc_id in range(5, -1, -1):
+        packed = (packed << DISC_BITS) | DISC_CODES[discs[disc_id]]
+    return packed
+
+
+def unpack_discs(packed: int) -> List[DiscState]:
+    return [DISC_STATES[(packed >> (DISC_BITS * disc_id)) & DISC_MASK] for disc_id in range(6)]
+
+
+def pack_taken(taken: Collection[DiscScore]) -> int:
+    """Pack taken disc scores as a count (0..3) per score, 12 bits; the order of taking is not kept."""
+    packed = 0
+    for score in taken:
+        shift = DISC_BITS * (score - 1)
+        if (packed >> shift) & DISC_MASK == MAX_TAKEN_PER_SCORE:
+            raise ValueError(f"Cannot pack more than {MAX_TAKEN_PER_SCORE} taken discs of score {score}")
+        packed += 1 << shift
+    return packed
+
+
+def unpack_taken(packed: int) -> List[DiscScore]:
+    """Taken disc scores in ascending order."""
+    return [score for score in range(1, 7) for _ in range((packed >> (DISC_BITS * (score - 1))) & DISC_MASK)]
+
+
+def taken_total(packed: int) -> int:
+    return sum(score * ((packed >> (DISC_BITS * (score - 1))) & DISC_MASK) for score in range(1, 7))
+
+
+def safe_total(packed_discs: int) -> int:
+    return sum(
+        disc_id + 1 for disc_id in range(6) if (packed_discs >> (DISC_BITS * disc_id)) & DISC_MASK == 1
+    )
+
+
+def vulnerable_total(packed_discs: int) -> int:
+    return sum(
+        disc_id + 1 for disc_id in range(6) if (packed_discs >> (DISC_BITS * disc_id)) & DISC_MASK == 0
+    )
+
+
+# Totals for every packed value of one player's discs or taken discs, for searches scoring many states
+_TAKEN_TOTALS = [taken_total(packed) for packed in range(1 << PLAYER_BITS)]
+_SAFE_TOTALS = [safe_total(packed) for packed in range(1 << PLAYER_BITS)]
+VULNERABLE_TOTALS = [vulnerable_total(packed) for packed in range(1 << PLAYER_BITS)]
+
+
+class CompactState(NamedTuple):
+    """
+    Immutable, hashable snapshot of a whole game.
+
+    Each player's discs and taken discs are packed into 12 bits, and all players are packed into a single int
+    (player 0 in the lowest bits), so copying is sharing a reference and equality and hashing are cheap.
+    Converting a game to a compact state and back is exact, except that taken discs come back sorted by score.
+    """
+
+    player_count: PlayerCount
+    start_player: PlayerId
+    player_id: PlayerId
+    """Player whose turn is next"""
+    round: int
+    turn: int
+    discs: int
+    """2 bits per disc (see DISC_CODES), 12 bits per player"""
+    taken: int
+    """2 bit count of taken discs per score, 12 bits per player"""
+    scores: Tuple[int, ...]
+    """Cumulative score from previous rounds"""
+
+    @classmethod
+    def from_game(cls, game: Game) -> "CompactState":
+        discs = 0
+        taken = 0
+        for player in reversed(game.players):
+            discs = (discs << PLAYER_BITS) | pack_discs(player.discs)
+            taken = (taken << PLAYER_BITS) | pack_taken(player.taken)
+        return cls(
+            game.player_count,
+            game.start_player,
+            game.player_id,
+            game.round,
+            game.turn,
+            discs,
+            taken,
+            tuple(player.score for player in game.players),
+        )
+
+    def to_game(self, events: GameEventSink = NULL_EVENT_SINK) -> Game:
+        players = [
+            Player(
+                player_id,
+                init_taken=unpack_taken(self.player_taken(player_id)),
+                init_score=self.scores[player_id],
+                init_disks=unpack_discs(self.player_discs(player_id)),
+            )
+            for player_id in range(self.player_count)
+        ]
+        game = Game(
+            player_count=self.player_count,
+            start_player=self.start_player,
+            turn=self.turn,
+            round=self.round,
+            player_init=players,
+            events=events,
+        )
+        game.player_id = self.player_id
+        return game
+
+    def player_discs(self, player_id: PlayerId) -> int:
+        return (self.discs >> (PLAYER_BITS * player_id)) & PLAYER_MASK
+
+    def player_taken(self, player_id: PlayerId) -> int:
+        return (self.taken >> (PLAYER_BITS * player_id)) & PLAYER_MASK
+
+    def disc(self, player_id: PlayerId, disc_id: DiscId) -> DiscState:
+        return DISC_STATES[(self.discs >> (PLAYER_BITS * player_id + DISC_BITS * disc_id)) & DISC_MASK]
+
+    def round_score(self, player_id: PlayerId) -> int:
+        """Putative additional score for a player from the current round if it ended now."""
+        shift = PLAYER_BITS * player_id
+        return _TAKEN_TOTALS[(self.taken >> shift) & PLAYER_MASK] + _SAFE_TOTALS[(self.discs >> shift) & PLAYER_MASK]
+
+    def expected_score(self, player_id: PlayerId) -> int:
+        """Putative score for a player if the current round ended now."""
+        return self.scores[player_id] + self.round_score(player_id)
+
+    def to_int(self) -> int:
+        """Pack the whole state into a single int, for dense storage of very many states."""
+        if self.turn >> _TURN_BITS or any(score >> _SCORE_BITS for score in self.scores):
+            raise ValueError(f"State too large to pack: turn={self.turn}, scores={self.scores}")
+        packed = 0
+        for score in reversed(self.scores):
+            packed = (packed << _SCORE_BITS) | score
+        packed = (packed << (PLAYER_BITS * self.player_count)) | self.taken
+        packed = (packed << (PLAYER_BITS * self.player_count)) | self.discs
+        packed = (packed << _TURN_BITS) | self.turn
+        packed = (packed << 3) | self.round
+        packed = (packed << 2) | self.player_id
+        packed = (packed << 2) | self.start_player
+        return (packed << 2) | (self.player_count - 2)
+
+    @classmethod
+    def from_int(cls, packed: int) -> "CompactState":
+        player_count = (packed & 3) + 2
+        packed >>= 2
+        start_player = packed & 3
+        packed >>= 2
+        player_id = packed & 3
+        packed >>= 2
+        round = packed & 7
+        packed >>= 3
+        turn = packed & ((1 << _TURN_BITS) - 1)
+        packed >>= _TURN_BITS
+        all_players_bits = PLAYER_BITS * player_count
+        discs = packed & ((1 << all_players_bits) - 1)
+        packed >>= all_players_bits
+        taken = packed & ((1 << all_players_bits) - 1)
+        packed >>= all_players_bits
+        scores = tuple((packed >> (_SCORE_BITS * player)) & ((1 << _SCORE_BITS) - 1) for player in range(player_count))
+        return cls(player_count, start_player, player_id, round, turn, discs, taken, scores)
+
+    def possible_actions(self, player_id: PlayerId, disc_id: DiscId) -> Sequence[Action]:
+        """Legal actions for a die, as `Game.possible_actions`."""
+        column = 0
+        for target_id in range(self.player_count):
+            code = (self.discs >> (PLAYER_BITS * target_id + DISC_BITS * disc_id)) & DISC_MASK
+            column |= code << (DISC_BITS * target_id)
+        return action_table(self.player_count)[player_id][disc_id][column]
+
+    def with_action(self, player_id: PlayerId, action: Action) -> "CompactState":
+        """State after a player plays a legal action."""
+        shift = PLAYER_BITS * action.target_id + DISC_BITS * action.disc_id
+        discs = (self.discs & ~(DISC_MASK << shift)) | (DISC_CODES[action.new_state] << shift)
+        taken = self.taken
+        if action.new_state == DiscState.Gone:
+            taken += 1 << (PLAYER_BITS * player_id + DISC_BITS * action.disc_id)
+        # Direct construction is much cheaper than _replace, and this is the innermost step of searches
+        return CompactState(
+            self.player_count, self.start_player, self.player_id, self.round, self.turn, discs, taken, self.scores
+        )
+
+    def is_round_over(self) -> bool:
+        return any(self.player_discs(player_id) == ALL_GONE for player_id in range(self.player_count))
+
+    def is_game_over(self) -> bool:
+        return self.round == self.player_count
+
+    def end_turn(self) -> "CompactState":
+        """Pass play to the next player, ending the round if it is over, as `Game.play_round`."""
+        state = self._replace(turn=self.turn + 1, player_id=(self.player_id + 1) % self.player_count)
+        if self.is_round_over():
+            state = state.end_round(state.player_id)
+        return state
+
+    def end_round(self, round_winner_id: PlayerId) -> "CompactState":
+        """Winner takes vulnerable discs; add round scores to scores, as `Game.end_round`."""
+        taken = self.taken
+        for player_id in range(self.player_count):
+            if player_id != round_winner_id:
+                discs = self.player_discs(player_id)
+                for disc_id in range(6):
+                    if (discs >> (DISC_BITS * disc_id)) & DISC_MASK == DISC_CODES[DiscState.Vulnerable]:
+                        taken += 1 << (PLAYER_BITS * round_winner_id + DISC_BITS * disc_id)
+        state = self._replace(taken=taken)
+        scores = tuple(self.scores[player_id] + state.round_score(player_id) for player_id in range(self.player_count))
+        return self._replace(round=self.round + 1, turn=0, discs=0, taken=0, scores=scores)
+
+    def winners(self) -> Collection[PlayerId]:
+        """Return player(s) with highest score"""
+        winning_score = max(self.scores)
+        return [player_id for player_id, score in enumerate(self.scores) if score == winning_score]
+
+
+def turn_outcomes(
+    state: CompactState, dice: Sequence[DiscId], played: Tuple[Action, ...] = ()
+) -> Iterator[Tuple[Tuple[Action, ...], CompactState]]:
+    """
+    Every legal way for the player to move to play a roll, with the state it leads to.
+
+    Dice may be used in any order; a turn only ends once no remaining die can be used.
+    """
+    usable = False
+    for index, die in enumerate(dice):
+        if die in dice[:index]:
+            continue
+        actions = state.possible_actions(state.player_id, die)
+        if actions:
+            usable = True
+            remaining = [*dice]
+            del remaining[index]
+            for action in actions:
+                yield from turn_outcomes(state.with_action(state.player_id, action), remaining, (*played, action))
+    if not usable:
+        yield played, state
+
+
+def distinct_turns(state: CompactState, dice: Sequence[DiscId]) -> Dict[CompactState, Tuple[Action, ...]]:
+    """
+    Turns for the player to move, keeping one turn for each distinct resulting state: the first found by
+    `turn_outcomes`, in the order it finds them.
+
+    Playing the same dice in a different order often reaches the same position part way through a turn, such as
+    making two discs safe with a 1 and a 2. The search only goes on from the first visit to each position with
+    each multiset of dice left, which finds the same turns as `turn_outcomes` in about half the time.
+    """
+    outcomes: Dict[CompactState, Tuple[Action, ...]] = {}
+    seen = set()
+    player_id = state.player_id
+
+    def search(state: CompactState, dice: Tuple[DiscId, ...], played: Tuple[Action, ...]) -> None:
+        usable = False
+        for index, die in enumerate(dice):
+            if die in dice[:index]:
+                continue
+            actions = state.possible_actions(player_id, die)
+            if actions:
+                usable = True
+                after_index = index + 1
+                remaining = dice[:index] + dice[after_index:]
+                remaining_multiset = tuple(sorted(remaining))
+                for action in actions:
+                    after = state.with_action(player_id, action)
+                    node = (after, remaining_multiset)
+                    if node not in seen:
+                        seen.add(node)
+                        search(after, remaining, (*played, action))
+        if not usable:
+            outcomes.setdefault(state, played)
+
+    search(state, tuple(dice), ())
+    return outcomes
+
+
+def legal_turns(game: Game, player_id: PlayerId, dice: Sequence[DiscId]) -> Dict[CompactState, Tuple[Action, ...]]:
+    """`distinct_turns` of a player in a game, for strategies choosing whole turns rather than a die at a time."""
+    return distinct_turns(CompactState.from_game(game)._replace(player_id=player_id), dice)
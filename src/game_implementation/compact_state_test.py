@@ -0,0 +1,225 @@
+import random
+
+import pytest
+
+from game_implementation.action import Action
+from game_implementation.compact_state import (
+    CompactState,
+    distinct_turns,
+    legal_turns,
+    pack_discs,
+    pack_taken,
+    unpack_discs,
+    turn_outcomes,
+    unpack_taken,
+)
+from game_implementation.dice import get_dice, ReplayDice
+from game_implementation.disc_state import DiscState
+from game_implementation.game import Game
+from game_implementation.game_events import GameEventSink
+from game_implementation.player import Player
+from game_implementation.strategy import RandomStrategy
+from game_implementation.strategy_protocol import Strategy
+
+
+def make_game() -> Game:
+    game = Game(
+        player_count=3,
+        start_player=1,
+        turn=7,
+        round=2,
+        player_init=[
+            Player(0, init_taken=[1, 6], init_score=12, init_disks={0: DiscState.Safe, 1: DiscState.Gone}),
+            Player(1, init_disks=[DiscState.Gone] * 5 + [DiscState.Safe]),
+            Player(2, init_taken=[2, 2, 5], init_score=40, init_disks={5: DiscState.Gone}),
+        ],
+    )
+    game.player_id = 2
+    return game
+
+
+def make_start_of_turn_game() -> Game:
+    return Game(
+        player_count=3,
+        player_init=[
+            Player(0, init_disks={1: DiscState.Safe, 3: DiscState.Gone}),
+            Player(1, init_taken=[4], init_disks={1: DiscState.Safe, 2: DiscState.Safe}),
+            Player(2, init_disks={0: DiscState.Gone, 4: DiscState.Safe}),
+        ],
+    )
+
+
+class FixedStrategy(Strategy):
+    def __init__(self, actions):
+        self.actions = actions
+
+    def choose_actions(self, game, player_id, dice):
+        return self.actions
+
+
+class MirrorSink(GameEventSink):
+    """Follow a game with compact state transitions, checking they agree with the game at every event."""
+
+    def __init__(self):
+        self.state = None
+        self.turns = 0
+
+    def turn_started(self, game, player_id):
+        if self.state is not None:
+            self.state = self.state.end_turn()
+            self.turns += 1
+        else:
+            self.state = CompactState.from_game(game)
+        assert self.state == CompactState.from_game(game)
+
+    def action_played(self, game, player_id, action: Action):
+        if self.state is None:
+            return  # initial defence
+        assert self.state == CompactState.from_game(game)
+        disc_id = action.disc_id
+        assert self.state.possible_actions(player_id, disc_id) == game.possible_actions(player_id, disc_id)
+        self.state = self.state.with_action(player_id, action)
+
+    def game_ended(self, game, winners):
+        self.state = self.state.end_turn()
+        assert self.state == CompactState.from_game(game)
+        assert self.state.is_game_over()
+        assert self.state.winners() == winners
+
+
+class TestCompactState:
+    @pytest.mark.parametrize(
+        "discs",
+        [
+            [DiscState.Vulnerable] * 6,
+            [DiscState.Gone] * 6,
+            [DiscState.Safe, DiscState.Vulnerable, DiscState.Gone, DiscState.Gone, DiscState.Safe, DiscState.Safe],
+        ],
+    )
+    def test_pack_discs_round_trip(self, discs):
+        assert unpack_discs(pack_discs(discs)) == discs
+
+    def test_fresh_player_packs_to_zero(self):
+        assert pack_discs(Player(0).discs) == 0
+
+    def test_pack_taken_sorts(self):
+        assert unpack_taken(pack_taken([6, 1, 3, 1])) == [1, 1, 3, 6]
+
+    def test_pack_taken_overflow(self):
+        with pytest.raises(ValueError):
+            pack_taken([4, 4, 4, 4])
+
+    def test_game_round_trip(self):
+        game = make_game()
+
+        restored = CompactState.from_game(game).to_game()
+
+        assert restored.players == game.players
+        assert (restored.player_count, restored.start_player, restored.player_id) == (3, 1, 2)
+        assert (restored.round, restored.turn) == (2, 7)
+
+    def test_queries(self):
+        state = CompactState.from_game(make_game())
+
+        assert state.disc(0, 0) == DiscState.Safe
+        assert state.disc(0, 1) == DiscState.Gone
+        assert state.disc(1, 5) == DiscState.Safe
+        assert [state.round_score(player_id) for player_id in range(3)] == [8, 6, 9]
+        assert [state.expected_score(player_id) for player_id in range(3)] == [20, 6, 49]
+
+    def test_equality_and_hash(self):
+        state = CompactState.from_game(make_game())
+        other = CompactState.from_game(make_game())
+
+        assert state == other
+        assert hash(state) == hash(other)
+        assert len({state, other}) == 1
+        assert state != state._replace(turn=8)
+
+    def test_int_round_trip(self):
+        state = CompactState.from_game(make_game())
+
+        assert CompactState.from_int(state.to_int()) == state
+
+    def test_int_round_trip_four_players(self):
+        state = CompactState.from_game(Game(player_count=4, round=4, player_init=[Player(3, init_score=1023)]))
+
+        assert CompactState.from_int(state.to_int()) == state
+
+    def test_to_int_overflow(self):
+        state = CompactState.from_game(Game(player_count=2, player_init=[Player(1, init_score=1024)]))
+
+        with pytest.raises(ValueError):
+            state.to_int()
+
+    @pytest.mark.parametrize("player_count", [2, 3, 4])
+    def test_transitions_follow_game(self, player_count):
+        random.seed(player_count)
+        for start_player in range(player_count):
+            sink = MirrorSink()
+            Game(player_count=player_count, start_player=start_player, events=sink).play(
+                [RandomStrategy()] * player_count
+            )
+            assert sink.turns > 0
+
+    def test_end_round(self):
+        state = CompactState.from_game(make_game())
+
+        ended = state.end_round(round_winner_id=0)
+
+        # Player 1 has no vulnerable discs, player 0 takes player 2's discs scoring 1 to 5
+        assert ended.scores == (20 + 15, 6, 49)
+        assert (ended.round, ended.turn, ended.discs, ended.taken) == (3, 0, 0, 0)
+        assert ended.player_id == state.player_id
+
+    @pytest.mark.parametrize("dice", [[1, 1, 3], [0, 2, 4], [3, 3, 3], [5, 1, 0]])
+    def test_turn_outcomes_are_legal_turns(self, dice):
+        state = CompactState.from_game(make_start_of_turn_game())
+
+        outcomes = list(turn_outcomes(state, dice))
+
+        assert outcomes
+        for actions, outcome in outcomes:
+            game = make_start_of_turn_game()
+            game.dice_source = ReplayDice([dice])
+            game.take_turn(0, FixedStrategy(actions))
+            assert CompactState.from_game(game) == outcome._replace(turn=1)
+
+    def test_distinct_turns(self):
+        state = CompactState.from_game(make_start_of_turn_game())
+
+        turns = distinct_turns(state, [0, 2, 4])
+
+        assert len(turns) < len(list(turn_outcomes(state, [0, 2, 4])))
+        assert set(turns) == {outcome for _, outcome in turn_outcomes(state, [0, 2, 4])}
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_distinct_turns_are_first_turn_outcomes(self, seed):
+        random.seed(seed)
+        game = Game(player_count=3)
+        game.set_initial_defence()
+        for _ in range(30):
+            state = CompactState.from_game(game)
+            dice = get_dice()
+            first_found = {}
+            for actions, outcome in turn_outcomes(state, dice):
+                first_found.setdefault(outcome, actions)
+
+            assert list(distinct_turns(state, dice).items()) == list(first_found.items())
+            if game.take_turn(game.player_id, RandomStrategy()):
+                break
+            game.player_id = (game.player_id + 1) % game.player_count
+
+    def test_legal_turns_combine_identical_dice(self):
+        game = make_start_of_turn_game()
+
+        turns = legal_turns(game, 0, [2, 2, 5])
+
+        # Player 1's safe disc 3 can be made vulnerable and then taken with the second 3
+        taken = [
+            actions
+            for actions in turns.values()
+            if Action(1, 2, DiscState.Vulnerable) in actions and Action(1, 2, DiscState.Gone) in actions
+        ]
+        assert taken
+        assert set(turns) == {outcome for _, outcome in turn_outcomes(CompactState.from_game(game), [2, 2, 5])}
@@ -0,0 +1,9 @@
+import pytest
+
+from game_implementation.player import Player
+
+
+@pytest.fixture(autouse=True)
+def check_player_consistency(monkeypatch):
+    """Cross-check every player's running totals against a full recompute in all tests."""
+    monkeypatch.setattr(Player, "check_consistency", True)
@@ -0,0 +1,213 @@
+"""
+Memoising the turns of deterministic strategies.
+
+`CachedStrategy` plays a wrapped strategy, remembering the turn it played for each position and roll, and replays
+the remembered turn when the same position and roll come up again. The wrapped strategy must be deterministic: a
+cached `RandomStrategy` would play the first random turn forever.
+
+The key is the position as a compact state, for the player to move and without the turn count, with the dice in the
+order rolled, as strategies such as those in `strategy` play the dice in that order; so a wrapped strategy plays
+exactly as it does unwrapped.
+
+Working out the key costs about as much as a decision of the simple strategies in `strategy`, so caching only pays
+for slow strategies, such as `ExpectimaxStrategy` and `MctsStrategy`, and only where positions repeat. Over whole
+games they rarely do, as scores and taken discs accumulate: fewer than one lookup in a thousand hits in games between
+the standard strategies. They repeat when the same positions are played over and over, as in evaluating a strategy
+from set positions, `round_analysis.StrategyPolicy`, or replaying a recorded game with other strategies.
+"""
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Collection, Iterator, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+from game_implementation.action import Action
+from game_implementation.compact_state import CompactState
+from game_implementation.disc_state import DISC_CODES, DISC_STATES
+from game_implementation.game import Game
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.types import DiscId, PlayerId
+
+Turn = Tuple[Action, ...]
+DecisionKey = Tuple[int, Tuple[DiscId, ...]]
+"""Packed compact state and the dice in the order rolled"""
+
+
+class DecisionCache(Protocol):
+    def get(self, key: DecisionKey) -> Optional[Turn]:
+        pass
+
+    def put(self, key: DecisionKey, turn: Turn) -> None:
+        pass
+
+
+class LruDecisionCache(DecisionCache):
+    """Cache of at most `max_size` turns in this process, evicting the least recently used."""
+
+    def __init__(self, max_size: int = 100_000):
+        self.max_size = max_size
+        self.evictions = 0
+        self._turns: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def get(self, key: DecisionKey) -> Optional[Turn]:
+        turn = self._turns.get(key)
+        if turn is not None:
+            self._turns.move_to_end(key)
+        return turn
+
+    def put(self, key: DecisionKey, turn: Turn) -> None:
+        self._turns[key] = turn
+        self._turns.move_to_end(key)
+        if len(self._turns) > self.max_size:
+            self._turns.popitem(last=False)
+            self.evictions += 1
+
+
+_ACTION_BITS = 7
+_ACTION_MASK = (1 << _ACTION_BITS) - 1
+
+
+def pack_turn(turn: Turn) -> int:
+    """Pack up to three actions into an int, with the action count plus one in the lowest bits, so it is never 0."""
+    packed = 0
+    for action in reversed(turn):
+        code = (action.target_id << 5) | (action.disc_id << 2) | DISC_CODES[action.new_state]
+        packed = (packed << _ACTION_BITS) | code
+    return (packed << 3) | (len(turn) + 1)
+
+
+def unpack_turn(packed: int) -> Turn:
+    count = (packed & 7) - 1
+    packed >>= 3
+    actions = []
+    for _ in range(count):
+        code = packed & _ACTION_MASK
+        actions.append(Action(code >> 5, (code >> 2) & 7, DISC_STATES[code & 3]))
+        packed >>= _ACTION_BITS
+    return tuple(actions)
+
+
+class SharedDecisionCache(DecisionCache):
+    """
+    Cache of turns in shared memory, for every process of a pool to use one cache.
+
+    The cache is a table of `slots` entries, each holding a 64 bit fingerprint of a key and a packed turn; a key
+    only goes in the slot its fingerprint picks, replacing whatever was there. Entries are written without locks:
+    the fingerprint is stored xor-ed with the turn, so an entry half written by another process fails the check on
+    reading and counts as a miss, rather than replaying a wrong turn (Hyatt and Mann, 2002).
+
+    The cache pickles as the name of its shared memory, so it can be passed to worker processes with the strategy
+    it belongs to. The process that created the cache should `unlink` it when done.
+    """
+
+    def __init__(self, slots: int = 1 << 20, name: Optional[str] = None):
+        """
+        Args:
+            slots: number of entries, if creating the cache
+            name: shared memory of an existing cache to attach to
+        """
+        self.slots = slots
+        self.replacements = 0
+        """Entries this process replaced with another key's"""
+        if name is None:
+            self._memory = shared_memory.SharedMemory(create=True, size=slots * 16)
+            self._owner = True
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self._entries = np.ndarray((slots, 2), dtype=np.int64, buffer=self._memory.buf)
+        if self._owner:
+            self._entries[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._entries[:, 1]))
+
+    def __getstate__(self):
+        return {"slots": self.slots, "name": self.name}
+
+    def __setstate__(self, state):
+        self.__init__(state["slots"], state["name"])
+
+    @staticmethod
+    def _fingerprint(key: DecisionKey) -> int:
+        # Hashes of ints, and tuples of them, are the same in every process
+        return hash(key)
+
+    def get(self, key: DecisionKey) -> Optional[Turn]:
+        fingerprint = self._fingerprint(key)
+        check, packed = self._entries[fingerprint % self.slots].tolist()
+        if packed == 0 or check ^ packed != fingerprint:
+            return None
+        return unpack_turn(packed)
+
+    def put(self, key: DecisionKey, turn: Turn) -> None:
+        fingerprint = self._fingerprint(key)
+        packed = pack_turn(turn)
+        entry = self._entries[fingerprint % self.slots]
+        check, old_packed = entry.tolist()
+        if old_packed != 0 and check ^ old_packed != fingerprint:
+            self.replacements += 1
+        entry[:] = (fingerprint ^ packed, packed)
+
+    def close(self) -> None:
+        self._entries = None
+        self._memory.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory, once no process needs the cache."""
+        self.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+def decision_key(game: Game, player_id: PlayerId, dice: Sequence[DiscId]) -> DecisionKey:
+    # The turn count does not affect play, so leaving it out of the key finds more transpositions
+    state = CompactState.from_game(game)._replace(player_id=player_id, turn=0)
+    return state.to_int(), tuple(dice)
+
+
+class CachedStrategy(Strategy):
+    """Play a deterministic strategy, replaying its turns for positions and rolls it has played before."""
+
+    def __init__(self, strategy: Strategy, cache: Optional[DecisionCache] = None):
+        """
+        Args:
+            strategy: deterministic strategy to play
+            cache: where to keep turns; a new `LruDecisionCache` by default. Strategies may share a cache only if
+                they play the same turns.
+        """
+        self.strategy = strategy
+        self.cache = cache if cache is not None else LruDecisionCache()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def choose_actions(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> Iterator[Action]:
+        key = decision_key(game, player_id, dice)
+        turn = self.cache.get(key)
+        if turn is not None:
+            self.hits += 1
+            yield from turn
+            return
+
+        self.misses += 1
+        played: List[Action] = []
+        # Actions are recorded as the game plays them, as the strategy may look at the game between dice
+        for action in self.strategy.choose_actions(game, player_id, dice):
+            played.append(action)
+            yield action
+        self.cache.put(key, tuple(played))
+
+    def __repr__(self):
+        return f"CachedStrategy({self.strategy!r}, hits={self.hits}, misses={self.misses})"
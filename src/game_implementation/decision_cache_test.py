@@ -0,0 +1,114 @@
+import pickle
+
+import pytest
+
+from game_implementation.action import Action
+from game_implementation.decision_cache import (
+    CachedStrategy,
+    decision_key,
+    LruDecisionCache,
+    pack_turn,
+    SharedDecisionCache,
+    unpack_turn,
+)
+from game_implementation.disc_state import DiscState
+from game_implementation.game import Game
+from game_implementation.strategy import RandomStrategy, TALLEST_DAISY_PREFERENCE, TallestDaisyStrategy
+from game_implementation.tournament import run_tournament
+
+
+def make_tallest_daisy():
+    return TallestDaisyStrategy(TALLEST_DAISY_PREFERENCE)
+
+
+@pytest.fixture
+def shared_cache():
+    cache = SharedDecisionCache(slots=1 << 12)
+    yield cache
+    cache.unlink()
+
+
+class TestDecisionCache:
+    @pytest.mark.parametrize(
+        "turn",
+        [
+            (),
+            (Action(0, 5, DiscState.Safe),),
+            (Action(3, 0, DiscState.Vulnerable), Action(3, 0, DiscState.Gone), Action(1, 2, DiscState.Gone)),
+        ],
+    )
+    def test_pack_turn(self, turn):
+        assert pack_turn(turn) != 0
+        assert unpack_turn(pack_turn(turn)) == turn
+
+    def test_key_ignores_turn_count_but_not_dice_order(self):
+        game = Game(3)
+        game.set_initial_defence()
+        key = decision_key(game, 1, [4, 0, 2])
+        game.turn = 7
+
+        assert decision_key(game, 1, [4, 0, 2]) == key
+        assert decision_key(game, 1, [2, 4, 0]) != key
+        assert decision_key(game, 2, [4, 0, 2]) != key
+
+    def test_lru_eviction(self):
+        cache = LruDecisionCache(max_size=2)
+        turn = (Action(0, 1, DiscState.Safe),)
+        cache.put((1, ()), turn)
+        cache.put((2, ()), turn)
+        cache.get((1, ()))
+        cache.put((3, ()), turn)
+
+        assert len(cache) == 2 and cache.evictions == 1
+        assert cache.get((2, ())) is None
+        assert cache.get((1, ())) == turn
+
+    def test_replays_cached_turns(self):
+        game = Game(3)
+        game.set_initial_defence()
+        strategy = CachedStrategy(make_tallest_daisy())
+
+        first = game.clone()
+        first.replay_turn(0, [3, 1, 3], strategy.choose_actions(first, 0, [3, 1, 3]))
+        second = game.clone()
+        second.replay_turn(0, [3, 1, 3], strategy.choose_actions(second, 0, [3, 1, 3]))
+        # The same dice in another order are another decision
+        third = game.clone()
+        third.replay_turn(0, [3, 3, 1], strategy.choose_actions(third, 0, [3, 3, 1]))
+
+        assert (strategy.hits, strategy.misses) == (1, 2)
+        assert [player.discs for player in first.players] == [player.discs for player in second.players]
+
+    def test_cached_games_match_plain_strategy(self):
+        cached = CachedStrategy(make_tallest_daisy())
+        plain = make_tallest_daisy()
+        with_cache = run_tournament([cached, RandomStrategy(), cached], 30, seed=2)
+        without = run_tournament([plain, RandomStrategy(), plain], 30, seed=2)
+
+        assert with_cache == without
+
+    def test_shared_cache(self, shared_cache):
+        key = (12345, (0, 2, 2))
+        turn = (Action(1, 2, DiscState.Vulnerable), Action(1, 2, DiscState.Gone))
+        shared_cache.put(key, turn)
+
+        attached = pickle.loads(pickle.dumps(shared_cache))
+        assert attached.get(key) == turn
+        assert attached.get((12346, (0, 2, 2))) is None
+        assert len(attached) == 1
+        attached.close()
+
+    def test_torn_entry_is_a_miss(self, shared_cache):
+        key = (1, (1, 2, 3))
+        shared_cache.put(key, (Action(0, 1, DiscState.Safe),))
+        slot = hash(key) % shared_cache.slots
+        shared_cache._entries[slot, 1] = pack_turn((Action(0, 2, DiscState.Safe),))
+
+        assert shared_cache.get(key) is None
+
+    def test_pool_shares_cache(self, shared_cache):
+        strategy = CachedStrategy(make_tallest_daisy(), shared_cache)
+        run_tournament([strategy, RandomStrategy(), RandomStrategy()], 20, seed=4, workers=2, batch_size=5)
+
+        # every worker's turns went into the one cache
+        assert len(shared_cache) > 100
@@ -1,15 +1,103 @@
+import itertools
+import random
+from collections import Counter
+from math import factorial
 from random import randrange
-from typing import Collection
+from typing import Collection, Iterable, List, Optional, Protocol, Sequence, Tuple
 
+from game_implementation.exceptions import DiceExhaustedException
 from game_implementation.types import DiscId
 
+FACES: Sequence[DiscId] = range(6)
+
+
+def _roll_outcomes() -> List[Tuple[Tuple[DiscId, ...], float]]:
+    outcomes = []
+    for dice in itertools.combinations_with_replacement(FACES, 3):
+        orderings = factorial(3)
+        for count in Counter(dice).values():
+            orderings //= factorial(count)
+        outcomes.append((dice, orderings / 6 ** 3))
+    return outcomes
+
+
+ROLL_OUTCOMES = _roll_outcomes()
+"""The 56 distinct rolls of three dice, sorted, with their probabilities"""
+
 
 def get_dice() -> Collection[DiscId]:
-    dice = [randrange(0, 6) for _ in range(3)]
-    print(f"Dice: {[d + 1 for d in dice]}")
-    return dice
+    return [randrange(0, 6) for _ in range(3)]
 
 
 def get_unique_dice() -> Collection[DiscId]:
     # For initial safety round. Should this be 3 dice, or as many as are unique?
     return {*get_dice()}
+
+
+class DiceSource(Protocol):
+    """Source of dice rolls for a game."""
+
+    def roll(self) -> Sequence[DiscId]:
+        """Roll three dice."""
+        pass
+
+
+class GlobalRandomDice(DiceSource):
+    """Roll with the global random module, as `get_dice` does."""
+
+    def roll(self) -> Sequence[DiscId]:
+        return [*get_dice()]
+
+
+class SeededDice(DiceSource):
+    """Roll with a private random number generator, isolated from the global random module and other games."""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    def roll(self) -> Sequence[DiscId]:
+        return self.rng.choices(FACES, k=3)
+
+
+class BufferedDice(DiceSource):
+    """Roll with a private random number generator, rolling a large block of dice at a time."""
+
+    def __init__(self, seed: Optional[int] = None, block_size: int = 4096):
+        self.rng = random.Random(seed)
+        self.block_size = block_size
+        self._buffer: List[DiscId] = []
+        self._position = 0
+
+    def roll(self) -> Sequence[DiscId]:
+        if self._position == len(self._buffer):
+            self._buffer = self.rng.choices(FACES, k=3 * self.block_size)
+            self._position = 0
+        position = self._position
+        self._position += 3
+        return self._buffer[position:position + 3]
+
+
+class ReplayDice(DiceSource):
+    """Replay a recorded stream of rolls."""
+
+    def __init__(self, rolls: Iterable[Sequence[DiscId]]):
+        self._rolls = iter(rolls)
+
+    def roll(self) -> Sequence[DiscId]:
+        try:
+            return [*next(self._rolls)]
+        except StopIteration:
+            raise DiceExhaustedException("No more recorded dice rolls")
+
+
+class RecordingDice(DiceSource):
+    """Record the rolls of another source, e.g. to replay them later with `ReplayDice`."""
+
+    def __init__(self, source: DiceSource):
+        self.source = source
+        self.rolls: List[Sequence[DiscId]] = []
+
+    def roll(self) -> Sequence[DiscId]:
+        dice = self.source.roll()
+        self.rolls.append(dice)
+        return dice
@@ -0,0 +1,77 @@
+import itertools
+from collections import Counter
+
+import pytest
+
+from game_implementation.action import Action
+from game_implementation.dice import BufferedDice, FACES, RecordingDice, ReplayDice, ROLL_OUTCOMES, SeededDice
+from game_implementation.disc_state import DiscState
+from game_implementation.exceptions import DiceExhaustedException
+from game_implementation.game import Game
+from game_implementation.player import Player
+from game_implementation.strategy import TALLEST_DAISY_PREFERENCE, TallestDaisyStrategy
+
+
+def play(dice_source) -> Game:
+    game = Game(player_count=3, dice_source=dice_source)
+    game.play([TallestDaisyStrategy(TALLEST_DAISY_PREFERENCE)] * 3)
+    return game
+
+
+class TestDice:
+    @pytest.mark.parametrize("dice_type", [SeededDice, BufferedDice])
+    def test_seeded_sources_are_reproducible(self, dice_type):
+        first = dice_type(7)
+        second = dice_type(7)
+
+        rolls = [first.roll() for _ in range(1000)]
+
+        assert rolls == [second.roll() for _ in range(1000)]
+        assert all(len(roll) == 3 and all(0 <= die < 6 for die in roll) for roll in rolls)
+        assert {die for roll in rolls for die in roll} == {*range(6)}
+
+    def test_buffered_dice_refills(self):
+        dice = BufferedDice(3, block_size=2)
+
+        rolls = [dice.roll() for _ in range(5)]
+
+        assert all(len(roll) == 3 for roll in rolls)
+
+    def test_replay_dice(self):
+        dice = ReplayDice([(1, 2, 3), [4, 4, 4]])
+
+        assert dice.roll() == [1, 2, 3]
+        assert dice.roll() == [4, 4, 4]
+        with pytest.raises(DiceExhaustedException):
+            dice.roll()
+
+    def test_games_with_the_same_seed_match(self):
+        assert play(SeededDice(11)).players == play(SeededDice(11)).players
+
+    def test_recorded_game_replays(self):
+        recording = RecordingDice(BufferedDice(5))
+        game = play(recording)
+
+        assert play(ReplayDice(recording.rolls)).players == game.players
+
+    def test_take_turn_uses_dice_source(self):
+        game = Game(player_count=2, player_init=[Player(0), Player(1)], dice_source=ReplayDice([[2, 2, 2]]))
+
+        class TakeStrategy:
+            def choose_actions(self, game, player_id, dice):
+                assert dice == [2, 2, 2]
+                return [Action(0, 2, DiscState.Safe), Action(1, 2, DiscState.Gone)]
+
+        game.take_turn(0, TakeStrategy())
+
+        assert game.players == [
+            Player(0, init_disks={2: DiscState.Safe}, init_taken=[3]),
+            Player(1, init_disks={2: DiscState.Gone}),
+        ]
+
+    def test_roll_outcomes_weight_ordered_rolls(self):
+        ordered = Counter(tuple(sorted(dice)) for dice in itertools.product(FACES, repeat=3))
+
+        assert len(ROLL_OUTCOMES) == 56
+        assert {dice: round(probability * 216) for dice, probability in ROLL_OUTCOMES} == ordered
+        assert sum(probability for _, probability in ROLL_OUTCOMES) == pytest.approx(1)
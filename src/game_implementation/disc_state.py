@@ -1,7 +1,15 @@
 from enum import Enum
+from typing import Tuple
 
 
 class DiscState(Enum):
     Vulnerable = "vuln"
     Safe = "SAFE"
     Gone = "----"
+
+
+DISC_STATES: Tuple[DiscState, ...] = (DiscState.Vulnerable, DiscState.Safe, DiscState.Gone)
+"""Disc states indexed by their 2 bit code; Vulnerable is 0 so a fresh player packs to 0"""
+DISC_CODES = {disc_state: code for code, disc_state in enumerate(DISC_STATES)}
+DISC_BITS = 2
+DISC_MASK = (1 << DISC_BITS) - 1
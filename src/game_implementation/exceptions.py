@@ -6,3 +6,18 @@ class DiscStateException(BaseException):
 class IllegalMoveException(BaseException):
     def __init__(self, *args: object) -> None:
         super().__init__(*args)
+
+
+class DiceExhaustedException(BaseException):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+
+class ReplayDivergenceException(BaseException):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+
+class AnalysisTooLargeException(BaseException):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
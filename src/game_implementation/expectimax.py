@@ -0,0 +1,110 @@
+import time
+from typing import Collection, Dict, Optional, Sequence, Tuple
+
+from game_implementation.action import Action
+from game_implementation.compact_state import CompactState, distinct_turns, VULNERABLE_TOTALS
+from game_implementation.dice import ROLL_OUTCOMES
+from game_implementation.game import Game
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.types import DiscId, PlayerId
+
+Values = Tuple[float, ...]
+"""Value of a position to each player"""
+
+VULNERABLE_WEIGHT = 0.5
+"""Value of a vulnerable disc at the search horizon, relative to its score: it may yet be made safe, or be lost"""
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+def horizon_score(state: CompactState, player_id: PlayerId) -> float:
+    """Estimate of a player's final score for the round, counting vulnerable discs at `VULNERABLE_WEIGHT`."""
+    return state.expected_score(player_id) + VULNERABLE_WEIGHT * VULNERABLE_TOTALS[state.player_discs(player_id)]
+
+
+def margins(scores: Sequence[float]) -> Values:
+    """Each player's lead over their strongest opponent."""
+    best, second = sorted(scores, reverse=True)[:2]
+    return tuple(score - (second if score == best else best) for score in scores)
+
+
+class ExpectimaxStrategy(Strategy):
+    """
+    Choose the turn with the best expected value, searching whole turns of every player over all dice rolls.
+
+    Each player maximises their own value (max-n); at the search horizon a position is valued by each player's
+    `horizon_score` less the best of their opponents'. Values of positions are memoized across
+    turns, keyed on the compact state. With a time budget the search deepens one turn at a time, up to
+    `max_depth`, and plays the best turn of the deepest search to finish.
+    """
+
+    def __init__(self, max_depth: int = 2, time_budget: Optional[float] = None, max_memo_size: int = 1_000_000):
+        """
+        Args:
+            max_depth: number of turns to search, including this one
+            time_budget: seconds to spend on each decision, or None to always search to `max_depth`
+            max_memo_size: memoized values to keep before starting afresh
+        """
+        self.max_depth = max_depth
+        self.time_budget = time_budget
+        self.max_memo_size = max_memo_size
+        self.memo: Dict[Tuple[CompactState, int], Values] = {}
+        self.searched_depth = 0
+        """Depth of the search that chose the last turn"""
+        self._deadline: Optional[float] = None
+
+    def choose_actions(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> Collection[Action]:
+        state = CompactState.from_game(game)._replace(player_id=player_id)
+        return self.search(state, [*dice])
+
+    def search(self, state: CompactState, dice: Sequence[DiscId]) -> Tuple[Action, ...]:
+        """Best turn for the player to move in `state` with the rolled dice."""
+        outcomes = distinct_turns(state, dice)
+        best = next(iter(outcomes.values()))
+        self.searched_depth = 0
+        if len(outcomes) == 1:
+            return best
+        if len(self.memo) > self.max_memo_size:
+            self.memo.clear()
+        self._deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        try:
+            for depth in range(1, self.max_depth + 1):
+                best = self._best_turn(state.player_id, outcomes, depth)[0]
+                self.searched_depth = depth
+        except _SearchTimeout:
+            pass
+        return best
+
+    def _best_turn(
+        self, player_id: PlayerId, outcomes: Dict[CompactState, Tuple[Action, ...]], depth: int
+    ) -> Tuple[Tuple[Action, ...], Values]:
+        best_actions, best_values = (), None
+        for state, actions in outcomes.items():
+            values = self.value(state.end_turn(), depth - 1)
+            if best_values is None or values[player_id] > best_values[player_id]:
+                best_actions, best_values = actions, values
+        return best_actions, best_values
+
+    def value(self, state: CompactState, depth: int) -> Values:
+        """Expected values of a position before the player to move rolls, searching `depth` more turns."""
+        if state.is_game_over():
+            return margins(state.scores)
+        if depth == 0:
+            return margins([horizon_score(state, player_id) for player_id in range(state.player_count)])
+        # The turn count does not affect play, so leaving it out of the key finds more transpositions
+        key = (state._replace(turn=0), depth)
+        values = self.memo.get(key)
+        if values is not None:
+            return values
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _SearchTimeout()
+        totals = [0.0] * state.player_count
+        for dice, probability in ROLL_OUTCOMES:
+            roll_values = self._best_turn(state.player_id, distinct_turns(state, dice), depth)[1]
+            for player_id, value in enumerate(roll_values):
+                totals[player_id] += probability * value
+        values = tuple(totals)
+        self.memo[key] = values
+        return values
@@ -0,0 +1,80 @@
+import itertools
+import random
+
+import pytest
+from pytest_mock import MockFixture
+
+from game_implementation.compact_state import CompactState
+from game_implementation.disc_state import DiscState
+from game_implementation.expectimax import ExpectimaxStrategy, margins
+from game_implementation.game import Game
+from game_implementation.player import Player
+from game_implementation.strategy import RandomStrategy
+
+
+def make_game() -> Game:
+    game = Game(
+        player_count=3,
+        player_init=[
+            Player(0, init_disks={1: DiscState.Safe, 3: DiscState.Gone}),
+            Player(1, init_taken=[4], init_disks={1: DiscState.Safe, 2: DiscState.Safe}),
+            Player(2, init_disks={0: DiscState.Gone, 4: DiscState.Safe}),
+        ],
+    )
+    game.player_id = 0
+    return game
+
+
+class TestExpectimax:
+    def test_margins(self):
+        assert margins([10, 4, 7]) == (3, -6, -3)
+        assert margins([5, 5]) == (0, 0)
+
+    @pytest.mark.parametrize("player_count", [2, 3])
+    def test_plays_legal_games(self, player_count):
+        random.seed(player_count)
+        strategies = [ExpectimaxStrategy(max_depth=1)] + [RandomStrategy()] * (player_count - 1)
+
+        winners = Game(player_count=player_count).play(strategies)
+
+        assert winners
+
+    def test_memo_is_reused(self):
+        strategy = ExpectimaxStrategy(max_depth=2)
+        state = CompactState.from_game(make_game())
+
+        actions = strategy.search(state, [0, 2, 4])
+        memo_size = len(strategy.memo)
+
+        assert strategy.searched_depth == 2
+        assert memo_size > 0
+        assert strategy.search(state, [0, 2, 4]) == actions
+        assert len(strategy.memo) == memo_size
+
+    @pytest.mark.parametrize("completed_depth", [1, 2])
+    def test_time_budget_keeps_last_completed_turn(self, mocker: MockFixture, completed_depth):
+        # The best turn with these dice differs between depths 1 and 2
+        dice = [3, 4, 5]
+        state = CompactState.from_game(make_game())
+        completed = ExpectimaxStrategy(max_depth=completed_depth).search(state, dice)
+        # Count the clock readings of a search to that depth, the first of which sets the deadline
+        clock = mocker.patch("game_implementation.expectimax.time.perf_counter", return_value=0.0)
+        ExpectimaxStrategy(max_depth=completed_depth, time_budget=1.0).search(state, dice)
+        readings = clock.call_count
+        # A clock ticking once per reading passes the deadline at the first reading of the next depth
+        clock.side_effect = itertools.count()
+        strategy = ExpectimaxStrategy(max_depth=5, time_budget=readings - 0.5)
+
+        actions = strategy.search(state, dice)
+
+        assert strategy.searched_depth == completed_depth
+        assert actions == completed
+
+    def test_beats_random_players(self):
+        random.seed(0)
+        wins = 0
+        for game_index in range(30):
+            game = Game(player_count=3, start_player=game_index % 3)
+            wins += 0 in game.play([ExpectimaxStrategy(max_depth=1), RandomStrategy(), RandomStrategy()])
+
+        assert wins > 15
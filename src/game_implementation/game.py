@@ -1,13 +1,62 @@
-from typing import Collection, List, Sequence
+import time
+from typing import Any, Callable, Collection, Generator, Iterable, List, Optional, Protocol, Sequence, Tuple, TypeVar
 
 from game_implementation.action import Action
-from game_implementation.dice import get_dice, get_unique_dice
+from game_implementation.action_table import action_table, disc_column
+from game_implementation.dice import DiceSource, get_dice, get_unique_dice
 from game_implementation.disc_state import DiscState
 from game_implementation.exceptions import IllegalMoveException
+from game_implementation.game_events import GameEventSink, NULL_EVENT_SINK
 from game_implementation.player import Player
 from game_implementation.strategy_protocol import Strategy
 from game_implementation.types import DiscId, PlayerCount, PlayerId
 
+# Kinds of undo log entry
+_UNDO_DISC = 0
+_UNDO_TAKE = 1
+_UNDO_ROUND = 2
+
+T = TypeVar("T")
+
+Turns = Generator[PlayerId, bool, T]
+"""
+Turn order of play, as a generator: it yields the player to take each turn and is sent whether the turn ended the
+round, and returns when play is over. The turns themselves are taken by whoever drives it, see `play_turns`.
+"""
+
+TIMED_PHASES = ("play", "take_turn", "possible_actions", "play_action", "end_round")
+"""Methods of a game that can be timed; see `Game.time_phases`"""
+
+
+class PhaseTimer(Protocol):
+    """Receiver of the times of a game's phases"""
+
+    def phase_ended(self, phase: str, seconds: float) -> None:
+        pass
+
+
+def _timed(method: Callable, phase: str, timer: PhaseTimer) -> Callable:
+    def timed_method(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timer.phase_ended(phase, time.perf_counter() - start)
+
+    timed_method.__name__ = method.__name__
+    timed_method.__doc__ = method.__doc__
+    return timed_method
+
+
+def play_turns(turns: Turns[T], take_turn: Callable[[PlayerId], bool]) -> T:
+    """Drive a turn order, taking each turn with `take_turn`, which returns True if the round is over."""
+    try:
+        player_id = next(turns)
+        while True:
+            player_id = turns.send(take_turn(player_id))
+    except StopIteration as stop:
+        return stop.value
+
 
 class Game:
     player_count: PlayerCount
@@ -15,6 +64,9 @@ class Game:
     turn: int
     round: PlayerId
     players: List[Player]
+    events: GameEventSink
+    dice_source: Optional[DiceSource]
+    """Source of dice rolls; if None, dice are rolled with the global random module"""
 
     def __init__(
         self,
@@ -23,6 +75,8 @@ class Game:
         turn: int = 0,
         round: PlayerId = 0,
         player_init: Collection[Player] = (),
+        events: GameEventSink = NULL_EVENT_SINK,
+        dice_source: Optional[DiceSource] = None,
     ):
         self.player_count = player_count
         self.turn = turn
@@ -32,6 +86,14 @@ class Game:
         player_dict = {player.player_id: player for player in player_init}
         # Use any players supplied, create new players where not supplied
         self.players = [player_dict.get(player_id, Player(player_id)) for player_id in range(player_count)]
+        self.events = events
+        self.dice_source = dice_source
+        self._action_table = action_table(player_count)
+        self._refresh_disc_columns()
+        # Changes since the oldest push, while any push is outstanding; see push and pop
+        self._undo_log: Optional[List[Tuple[Any, ...]]] = None
+        self._undo_marks: List[Tuple[int, int, int, PlayerId]] = []
+        self._phase_timer: Optional[PhaseTimer] = None
 
     def __repr__(self):
         return "\n".join(
@@ -42,43 +104,124 @@ class Game:
             ]
         )
 
+    def _refresh_disc_columns(self) -> None:
+        # Packed state of each disc across all players; kept up to date as discs change so that
+        # possible_actions is a table lookup
+        self._disc_columns = [disc_column(self.players, disc_id) for disc_id in range(6)]
+
+    def _disc_changed(self, disc_id: DiscId) -> None:
+        self._disc_columns[disc_id] = disc_column(self.players, disc_id)
+
+    def clone(self, events: GameEventSink = NULL_EVENT_SINK, dice_source: Optional[DiceSource] = None) -> "Game":
+        """
+        Independent copy of the game, e.g. for lookahead.
+
+        Much cheaper than deepcopy: only the players' disc and taken lists are copied. The copy does not share the
+        event sink or dice source unless given them, so lookahead neither reports its moves nor uses up dice.
+        """
+        game = Game.__new__(Game)
+        game.__dict__.update(self.__dict__)
+        game.players = [player.clone() for player in self.players]
+        game.events = events
+        game.dice_source = dice_source
+        game._disc_columns = [*self._disc_columns]
+        game._undo_log = None
+        game._undo_marks = []
+        if self._phase_timer is not None:
+            game.time_phases(None)
+        return game
+
+    def time_phases(self, timer: Optional[PhaseTimer]) -> None:
+        """
+        Report the time of each call of this game's `TIMED_PHASES` to a timer from now on, or stop with None.
+
+        The timed methods are bound to the game itself, so games not timed, including clones of a timed game, pay
+        nothing for timing.
+        """
+        for phase in TIMED_PHASES:
+            self.__dict__.pop(phase, None)
+        self._phase_timer = timer
+        if timer is not None:
+            for phase in TIMED_PHASES:
+                setattr(self, phase, _timed(getattr(self, phase), phase, timer))
+
+    def push(self) -> None:
+        """
+        Start recording changes, so that `pop` can revert the game to its state now.
+
+        Pushes nest; each pop reverts to the matching push. Reverting costs time proportional to the number of
+        changes made since the push, not to the size of the game.
+        """
+        if self._undo_log is None:
+            self._undo_log = []
+        self._undo_marks.append((len(self._undo_log), self.turn, self.round, self.player_id))
+
+    def pop(self) -> None:
+        """Revert all changes since the last push."""
+        if not self._undo_marks:
+            raise IndexError("pop without a matching push")
+        mark, self.turn, self.round, self.player_id = self._undo_marks.pop()
+        log = self._undo_log
+        while len(log) > mark:
+            entry = log.pop()
+            if entry[0] == _UNDO_DISC:
+                _, player, disc_id, disc_state = entry
+                player.restore_disc(disc_id, disc_state)
+                self._disc_changed(disc_id)
+            elif entry[0] == _UNDO_TAKE:
+                entry[1].untake()
+            else:  # _UNDO_ROUND
+                for player, saved in zip(self.players, entry[1]):
+                    player.restore(*saved)
+                self._refresh_disc_columns()
+        if not self._undo_marks:
+            self._undo_log = None
+
+    def _log_disc(self, player: Player, disc_id: DiscId) -> None:
+        if self._undo_log is not None:
+            self._undo_log.append((_UNDO_DISC, player, disc_id, player.discs[disc_id]))
+
     def is_round_over(self) -> bool:
-        return any([player.is_over() for player in self.players])
+        return any(player.is_over() for player in self.players)
 
     def take_disc(self, taker: Player, target: Player, disc_id: DiscId) -> None:
+        disc_state = target.discs[disc_id]
         target.make_gone(disc_id)
         taker.take(disc_id)
+        # Logged only once the take is accepted, so that undoing a rejected take does not give back an earlier one
+        if self._undo_log is not None:
+            self._undo_log.append((_UNDO_DISC, target, disc_id, disc_state))
+            self._undo_log.append((_UNDO_TAKE, taker))
+        self._disc_changed(disc_id)
 
     def winner_take_vulnerable_discs(self, winner_id: PlayerId):
-        print(f"Giving vulnerable disks to winner: {winner_id}")
         winner = self.players[winner_id]
         loosers = [looser for looser in self.players if looser.player_id != winner_id]
         for looser in loosers:
             disc_ids = [disc_id for disc_id, disc in enumerate(looser.discs) if disc == DiscState.Vulnerable]
             for disc_id in disc_ids:
-                print(f"Taking {disc_id + 1} from {looser.player_id}")
                 self.take_disc(winner, looser, disc_id)
 
     def play_action(self, player_id: PlayerId, action: Action) -> bool:
-        print(f"Player: {player_id}: {action}")
+        self.events.action_played(self, player_id, action)
         target = self.players[action.target_id]
         if action.new_state == DiscState.Gone:
             player = self.players[player_id]
             self.take_disc(player, target, action.disc_id)
         elif action.new_state == DiscState.Vulnerable:
+            self._log_disc(target, action.disc_id)
             target.make_vulnerable(action.disc_id)
+            self._disc_changed(action.disc_id)
         elif action.new_state == DiscState.Safe:
+            self._log_disc(target, action.disc_id)
             target.make_safe(action.disc_id)
+            self._disc_changed(action.disc_id)
 
         return self.is_round_over()
 
     def possible_actions(self, player_id: PlayerId, disc_id: DiscId) -> Sequence[Action]:
-        actions = []
-        for target in self.players:
-            new_state = target.possible_new_state(disc_id, target.player_id == player_id)
-            if new_state is not None:
-                actions.append(Action(target.player_id, disc_id, new_state))
-        return actions
+        """Legal actions for a die, in target player order. The result is shared and must not be modified."""
+        return self._action_table[player_id][disc_id][self._disc_columns[disc_id]]
 
     def take_turn(self, player_id: PlayerId, strategy: Strategy) -> bool:
         """
@@ -91,21 +234,45 @@ class Game:
         Returns:
             True if round is over
         """
-        dice = get_dice()
+        dice = self.roll_dice()
+        self.events.dice_rolled(self, player_id, dice)
+        return self._apply_turn(player_id, dice, strategy.choose_actions(self, player_id, dice))
+
+    def roll_dice(self) -> Sequence[DiscId]:
+        """Dice for a turn, from the game's dice source."""
+        return get_dice() if self.dice_source is None else self.dice_source.roll()
+
+    def replay_turn(self, player_id: PlayerId, dice: Sequence[DiscId], actions: Iterable[Action]) -> bool:
+        """
+        Take a recorded turn: actions are checked against the dice and the rules as they are in `take_turn`.
+
+        Args:
+            player_id: id of player
+            dice: dice rolled
+            actions: actions taken
+
+        Returns:
+            True if round is over
+        """
+        self.events.dice_rolled(self, player_id, dice)
+        return self._apply_turn(player_id, dice, actions)
+
+    def _apply_turn(self, player_id: PlayerId, dice: Sequence[DiscId], actions: Iterable[Action]) -> bool:
         remaining_dice = [*dice]
 
-        for action in strategy.choose_actions(self, player_id, dice):
+        for action in actions:
             if action.disc_id not in remaining_dice:
                 if action.disc_id in dice:
                     raise IllegalMoveException(f"Dice {action.disc_id} already used ({action})")
                 else:
                     raise IllegalMoveException(f"Dice {action.disc_id} was not rolled ({action})")
+            if action not in self.possible_actions(player_id, action.disc_id):
+                raise IllegalMoveException(f"Player {player_id} cannot play {action}")
             self.play_action(player_id, action)
             remaining_dice.remove(action.disc_id)
 
         for unused_dice in remaining_dice:
-            available_action = [*self.possible_actions(player_id, unused_dice)]
-            if len(available_action):
+            if self.possible_actions(player_id, unused_dice):
                 raise IllegalMoveException(f"Unused dice {unused_dice}")
         self.turn += 1
 
@@ -124,10 +291,15 @@ class Game:
         """
         self.winner_take_vulnerable_discs(round_winner_id)
         round_scores = [player.round_score for player in self.players]
-        print(f"Scoring end of round: {round_scores}")
-
-        scores = [player.end_round() for player in self.players]
-        print(f"New score: {scores}")
+        if self._undo_log is not None:
+            # Resetting players replaces their lists, so keeping the old lists is enough to restore them
+            self._undo_log.append(
+                (_UNDO_ROUND, [(player.score, player.taken, player.discs) for player in self.players])
+            )
+        for player in self.players:
+            player.end_round()
+        self._refresh_disc_columns()
+        self.events.round_ended(self, round_winner_id, round_scores)
 
         self.turn = 0
         self.round += 1
@@ -139,7 +311,8 @@ class Game:
     def set_initial_defence(self):
         """ Roll dice for each player and use them to set initial safe dice. """
         for player_id in range(self.player_count):
-            dice = get_unique_dice()
+            dice = get_unique_dice() if self.dice_source is None else {*self.dice_source.roll()}
+            self.events.dice_rolled(self, player_id, dice)
             for d in dice:
                 self.play_action(player_id, Action(player_id, d, DiscState.Safe))
 
@@ -148,31 +321,46 @@ class Game:
         winning_score = max([player.score for player in self.players])
         return [player.player_id for player in self.players if player.score == winning_score]
 
-    def play_round(self, strategies: Sequence[Strategy]) -> bool:
+    def round_turns(self) -> Turns[bool]:
         """
-        Take turns until a round ends.
+        Turn order of a round, ending the round once a turn ends it; see `Turns`.
+
+        Returns:
+            True if game has ended
         """
         end_of_round = False
         while not end_of_round:
-            print(self, "\n")
-            end_of_round = self.take_turn(self.player_id, strategies[self.player_id])
+            self.events.turn_started(self, self.player_id)
+            end_of_round = yield self.player_id
             self.player_id = (self.player_id + 1) % self.player_count
 
         return self.end_round(round_winner_id=self.player_id)
 
-    def play(self, strategies: Sequence[Strategy]) -> Collection[PlayerId]:
-        """Start the game, take turns until round ends"""
-        print("Initial board")
-        print(self, "\n", "Start Player:", self.start_player, "\n")
+    def game_turns(self) -> Turns[Collection[PlayerId]]:
+        """
+        Turn order of a game, from its start to its end; see `Turns`.
 
-        print("Initial defensive rolls")
+        Returns:
+            player(s) with highest score
+        """
+        self.events.game_started(self)
         self.set_initial_defence()
 
         game_over = False
         while not game_over:
-            game_over = self.play_round(strategies)
+            game_over = yield from self.round_turns()
 
         winners = self.winners()
-        print("\nEnd of game\nWinners: ", winners)
+        self.events.game_ended(self, winners)
 
         return winners
+
+    def play_round(self, strategies: Sequence[Strategy]) -> bool:
+        """
+        Take turns until a round ends.
+        """
+        return play_turns(self.round_turns(), lambda player_id: self.take_turn(player_id, strategies[player_id]))
+
+    def play(self, strategies: Sequence[Strategy]) -> Collection[PlayerId]:
+        """Start the game, take turns until round ends"""
+        return play_turns(self.game_turns(), lambda player_id: self.take_turn(player_id, strategies[player_id]))
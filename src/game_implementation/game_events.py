@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Collection, Protocol, Sequence, TYPE_CHECKING
+
+from game_implementation.action import Action
+from game_implementation.types import DiscId, PlayerId
+
+if TYPE_CHECKING:
+    from game_implementation.game import Game
+
+
+class GameEventSink(Protocol):
+    """
+    Observer for the progress of a game.
+
+    Every method is a no-op by default, so a sink only needs to implement the events it is interested in.
+    Events are raised with structured values; any formatting is left to the sink.
+    """
+
+    def game_started(self, game: Game) -> None:
+        pass
+
+    def turn_started(self, game: Game, player_id: PlayerId) -> None:
+        pass
+
+    def dice_rolled(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> None:
+        pass
+
+    def action_played(self, game: Game, player_id: PlayerId, action: Action) -> None:
+        pass
+
+    def round_ended(self, game: Game, round_winner_id: PlayerId, round_scores: Sequence[int]) -> None:
+        pass
+
+    def game_ended(self, game: Game, winners: Collection[PlayerId]) -> None:
+        pass
+
+
+class NullEventSink(GameEventSink):
+    """Ignore all events; the default for headless simulation."""
+
+
+NULL_EVENT_SINK = NullEventSink()
+
+
+class ConsoleEventSink(GameEventSink):
+    """Print a human readable commentary of the game to stdout."""
+
+    def game_started(self, game: Game) -> None:
+        print("Initial board")
+        print(game, "\n", "Start Player:", game.start_player, "\n")
+        print("Initial defensive rolls")
+
+    def turn_started(self, game: Game, player_id: PlayerId) -> None:
+        print(game, "\n")
+
+    def dice_rolled(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> None:
+        print(f"Dice: {[d + 1 for d in dice]}")
+
+    def action_played(self, game: Game, player_id: PlayerId, action: Action) -> None:
+        print(f"Player: {player_id}: {action}")
+
+    def round_ended(self, game: Game, round_winner_id: PlayerId, round_scores: Sequence[int]) -> None:
+        print(f"Giving vulnerable disks to winner: {round_winner_id}")
+        print(f"Scoring end of round: {[*round_scores]}")
+        print(f"New score: {[player.score for player in game.players]}")
+
+    def game_ended(self, game: Game, winners: Collection[PlayerId]) -> None:
+        print("\nEnd of game\nWinners: ", winners)
+
+
+class MultiEventSink(GameEventSink):
+    """Forward every event to several sinks, in order."""
+
+    def __init__(self, *sinks: GameEventSink):
+        self.sinks = sinks
+
+    def game_started(self, game: Game) -> None:
+        for sink in self.sinks:
+            sink.game_started(game)
+
+    def turn_started(self, game: Game, player_id: PlayerId) -> None:
+        for sink in self.sinks:
+            sink.turn_started(game, player_id)
+
+    def dice_rolled(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> None:
+        for sink in self.sinks:
+            sink.dice_rolled(game, player_id, dice)
+
+    def action_played(self, game: Game, player_id: PlayerId, action: Action) -> None:
+        for sink in self.sinks:
+            sink.action_played(game, player_id, action)
+
+    def round_ended(self, game: Game, round_winner_id: PlayerId, round_scores: Sequence[int]) -> None:
+        for sink in self.sinks:
+            sink.round_ended(game, round_winner_id, round_scores)
+
+    def game_ended(self, game: Game, winners: Collection[PlayerId]) -> None:
+        for sink in self.sinks:
+            sink.game_ended(game, winners)
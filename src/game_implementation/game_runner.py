@@ -1,19 +1,66 @@
-from collections import Sequence
+import hashlib
+import random
+from typing import Collection, Optional, Sequence, TYPE_CHECKING
 
 from game_implementation.game import Game, Strategy
+from game_implementation.game_events import GameEventSink, NULL_EVENT_SINK
+from game_implementation.types import PlayerId
 
+if TYPE_CHECKING:
+    from game_implementation.profiling import Profiler
 
-def run_games(strategies: Sequence[Strategy], iterations: int):
+
+def derive_seed(master_seed: int, stream_id: int) -> int:
+    """Derive an independent, reproducible seed for one stream (e.g. one game) from a master seed."""
+    digest = hashlib.sha256(f"{master_seed}:{stream_id}".encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def play_game(
+    strategies: Sequence[Strategy],
+    game_index: int,
+    seed: Optional[int] = None,
+    events: GameEventSink = NULL_EVENT_SINK,
+    profiler: Optional["Profiler"] = None,
+) -> Collection[PlayerId]:
+    """
+    Play a single game of a series, rotating the start player with the game index.
+
+    Args:
+        strategies: one per player
+        game_index: position of the game in the series
+        seed: master seed; if given, the random module is reseeded from it and the game index, so the game
+            can be reproduced independently of any other game in the series
+        events: sink for game events
+        profiler: if given, the game and strategies are profiled with it
+
+    Returns:
+        winners of the game
+    """
     player_count = len(strategies)
-    winner_counts = [0] * player_count
+    if seed is not None:
+        random.seed(derive_seed(seed, game_index))
+    game = Game(player_count=player_count, start_player=game_index % player_count, events=events)
+    if profiler is not None:
+        profiler.instrument(game)
+    return game.play(strategies)
 
-    for i in range(iterations):
-        start_player = i % player_count
-        game = Game(player_count=player_count, start_player=start_player)
 
-        winners = game.play(strategies)
+def run_games(
+    strategies: Sequence[Strategy],
+    iterations: int,
+    events: GameEventSink = NULL_EVENT_SINK,
+    seed: Optional[int] = None,
+    profiler: Optional["Profiler"] = None,
+):
+    """Play a series of games in this process and print the games won by each player."""
+    winner_counts = [0] * len(strategies)
+    if profiler is not None:
+        strategies = profiler.wrap_strategies(strategies)
 
-        for winner in winners:
+    for game_index in range(iterations):
+        for winner in play_game(strategies, game_index, seed=seed, events=events, profiler=profiler):
             winner_counts[winner] += 1
 
     print("\nWinner counts", winner_counts)
+    return winner_counts
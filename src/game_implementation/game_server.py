@@ -0,0 +1,439 @@
+"""
+Serving games to bots in other processes, over a local TCP or Unix socket.
+
+A `GameServer` plays many games at once on one asyncio event loop. Each game is a coroutine that waits only on the
+decisions of its own players, so while one game waits for a bot the loop plays the others. Bots connect as clients,
+one connection per seat, and every decision of that seat in every game goes down its connection: thousands of games
+share a handful of connections.
+
+The protocol is fixed size binary frames, little endian:
+
+- hello, client to server: `HELLO`, then the seat (player id) wanted, or `ANY_SEAT`
+- welcome, server to client: the client's seat (player id) and the player count
+- decision request, server to client: request id (u32), player id, the dice as `trajectories.encode_dice`, and the
+  game as `CompactState.to_int` in `STATE_BYTES` bytes
+- move, client to server: request id (u32), action count, and up to three actions as `trajectories.encode_action`,
+  padded with zeros
+
+Moves are matched to requests by request id, so a client may answer out of order. A decision that is not answered
+within the timeout, is answered with an illegal turn or is asked of a client that has disconnected is played by a
+fallback strategy instead, and a late answer is ignored. The server closes the connections when it is done; a client
+stops at end of file.
+"""
+import asyncio
+import os
+import struct
+import time
+from typing import Collection, Dict, Iterable, List, Mapping, Optional, Protocol, Sequence, Tuple
+
+from game_implementation.action import Action
+from game_implementation.compact_state import CompactState
+from game_implementation.dice import SeededDice
+from game_implementation.exceptions import IllegalMoveException
+from game_implementation.game import Game
+from game_implementation.game_events import GameEventSink
+from game_implementation.game_runner import derive_seed
+from game_implementation.results import P2Quantile
+from game_implementation.strategy import RandomStrategy
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.tournament import TournamentResult
+from game_implementation.trajectories import decode_action, decode_dice, encode_action, encode_dice
+from game_implementation.types import DiscId, PlayerCount, PlayerId
+
+HELLO = b"PRK\x01"
+ANY_SEAT = 0xFF
+STATE_BYTES = 24
+"""Bytes of a packed compact state; 4 players need 161 bits"""
+
+_WELCOME = struct.Struct("<BB")
+_REQUEST = struct.Struct(f"<IBB{STATE_BYTES}s")
+_MOVE = struct.Struct("<IB3s")
+
+
+class Seat(Protocol):
+    async def choose_actions(self, game: Game, player_id: PlayerId, dice: Sequence[DiscId]) -> Iterable[Action]:
+        """Actions for a roll, as `Strategy.choose_actions`, once they are known."""
+        pass
+
+
+class LocalSeat(Seat):
+    """Seat played by a strategy in the server's process, e.g. to play bots against the standard strategies."""
+
+    def __init__(self, strategy: Strategy):
+        self.strategy = strategy
+
+    async def choose_actions(self, game: Game, player_id: PlayerId, dice: Sequence[DiscId]) -> Iterable[Action]:
+        return self.strategy.choose_actions(game, player_id, dice)
+
+
+class SeatMetrics:
+    """Decisions asked of a remote seat, and the time from sending each request to receiving its move."""
+
+    def __init__(self):
+        self.decisions = 0
+        self.timeouts = 0
+        self.illegal = 0
+        """Moves that were not legal turns, played by the fallback strategy instead"""
+        self.disconnected = 0
+        """Decisions played by the fallback strategy because the client had disconnected"""
+        self.answered = 0
+        self.total_latency = 0.0
+        self.median_latency = P2Quantile(0.5)
+        self.p99_latency = P2Quantile(0.99)
+
+    def add_latency(self, seconds: float) -> None:
+        self.answered += 1
+        self.total_latency += seconds
+        self.median_latency.add(seconds)
+        self.p99_latency.add(seconds)
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.answered if self.answered else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.decisions} decisions, latency mean {self.mean_latency * 1e3:.3f} ms, "
+            f"p50 {self.median_latency.value() * 1e3:.3f} ms, p99 {self.p99_latency.value() * 1e3:.3f} ms, "
+            f"{self.timeouts} timed out, {self.illegal} illegal, {self.disconnected} after disconnecting"
+        )
+
+
+def decode_move(count: int, tokens: bytes) -> List[Action]:
+    """Actions of a move frame; a count or action code that is not a valid action raises `IllegalMoveException`."""
+    if count > len(tokens):
+        raise IllegalMoveException(f"Move of {count} actions")
+    actions = []
+    for token in tokens[:count]:
+        try:
+            actions.append(decode_action(token))
+        except (KeyError, IndexError):
+            raise IllegalMoveException(f"Unknown action code {token:#04x}")
+    return actions
+
+
+class RemoteSeat(Seat):
+    """Seat played by a client, see the module documentation for the protocol."""
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        seat: PlayerId,
+        timeout: Optional[float],
+        fallback: Strategy,
+    ):
+        """
+        Args:
+            reader: connection to the client, after the hello
+            writer: connection to the client, after the welcome
+            seat: player id the client plays
+            timeout: seconds to wait for each move; None waits for ever
+            fallback: plays decisions the client does not answer in time, answers with an illegal turn, or is asked
+                after disconnecting
+        """
+        self.seat = seat
+        self.timeout = timeout
+        self.fallback = fallback
+        self.metrics = SeatMetrics()
+        self._reader = reader
+        self._writer = writer
+        self._next_request = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._disconnected = False
+        self._read_task = asyncio.ensure_future(self._read_moves())
+
+    async def _read_moves(self) -> None:
+        try:
+            while True:
+                request_id, count, tokens = _MOVE.unpack(await self._reader.readexactly(_MOVE.size))
+                future = self._pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result((count, tokens))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self._disconnected = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"Seat {self.seat} disconnected"))
+            self._pending.clear()
+
+    async def choose_actions(self, game: Game, player_id: PlayerId, dice: Sequence[DiscId]) -> Iterable[Action]:
+        if self._disconnected:
+            self.metrics.decisions += 1
+            self.metrics.disconnected += 1
+            return self.fallback.choose_actions(game, player_id, dice)
+        request_id = self._next_request
+        self._next_request = (request_id + 1) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        state = CompactState.from_game(game)._replace(player_id=player_id).to_int()
+        # Unanswered requests are at most one per game in play, so the write buffer needs no flow control
+        request = _REQUEST.pack(request_id, player_id, encode_dice(dice), state.to_bytes(STATE_BYTES, "little"))
+        self._writer.write(request)
+        self.metrics.decisions += 1
+
+        start = time.perf_counter()
+        try:
+            count, tokens = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self._pending.pop(request_id, None)
+            self.metrics.timeouts += 1
+            return self.fallback.choose_actions(game, player_id, dice)
+        except ConnectionError:
+            self.metrics.disconnected += 1
+            return self.fallback.choose_actions(game, player_id, dice)
+        self.metrics.add_latency(time.perf_counter() - start)
+
+        try:
+            actions = decode_move(count, tokens)
+            # Checked on a copy, so an illegal turn does not leave the game half played
+            game.clone().replay_turn(player_id, dice, actions)
+        except IllegalMoveException:
+            self.metrics.illegal += 1
+            return self.fallback.choose_actions(game, player_id, dice)
+        return actions
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._read_task
+
+
+class _MoveCounter(GameEventSink):
+    def __init__(self):
+        self.moves = 0
+
+    def turn_started(self, game: Game, player_id: PlayerId) -> None:
+        self.moves += 1
+
+
+async def play_game(game: Game, seats: Sequence[Seat]) -> Collection[PlayerId]:
+    """Play a game as `Game.play` does, waiting for each player's seat to choose their actions."""
+    turns = game.game_turns()
+    try:
+        player_id = next(turns)
+        while True:
+            dice = game.roll_dice()
+            actions = await seats[player_id].choose_actions(game, player_id, dice)
+            player_id = turns.send(game.replay_turn(player_id, dice, actions))
+    except StopIteration as stop:
+        return stop.value
+
+
+class GameServer:
+    """
+    Play games between bots connected over a socket and strategies in this process.
+
+    Start the server, have the bots connect, wait for them with `wait_for_players`, then `play_games`. Clients take
+    the seat they ask for, or the first seat without a local strategy or a client; a client asking for a taken seat
+    is disconnected.
+    """
+
+    def __init__(
+        self,
+        player_count: PlayerCount = 3,
+        local_strategies: Mapping[PlayerId, Strategy] = {},
+        decision_timeout: Optional[float] = 1.0,
+        fallback: Optional[Strategy] = None,
+    ):
+        """
+        Args:
+            player_count: players in each game
+            local_strategies: strategies playing some of the seats in this process
+            decision_timeout: seconds a client has to answer each decision; None waits for ever
+            fallback: plays the decisions clients miss or get wrong; random by default
+        """
+        self.player_count = player_count
+        self.decision_timeout = decision_timeout
+        self.fallback = fallback if fallback is not None else RandomStrategy()
+        self.seats: List[Optional[Seat]] = [
+            LocalSeat(local_strategies[player_id]) if player_id in local_strategies else None
+            for player_id in range(player_count)
+        ]
+        self.seconds = 0.0
+        """Time spent in `play_games`"""
+        self._moves = _MoveCounter()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._seated: Optional[asyncio.Event] = None
+
+    @property
+    def moves(self) -> int:
+        """Turns played in all games so far"""
+        return self._moves.moves
+
+    @property
+    def remote_seats(self) -> List[RemoteSeat]:
+        return [seat for seat in self.seats if isinstance(seat, RemoteSeat)]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None) -> None:
+        """Listen on a Unix socket if a path is given, otherwise on TCP; port 0 picks a free port, see `address`."""
+        self._seated = asyncio.Event()
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._accept, path)
+        else:
+            self._server = await asyncio.start_server(self._accept, host, port)
+
+    @property
+    def address(self):
+        """Address the server listens on: (host, port) for TCP, a path for a Unix socket."""
+        return self._server.sockets[0].getsockname()
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            hello = await asyncio.wait_for(reader.readexactly(len(HELLO) + 1), self.decision_timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            hello = b""
+        seat = hello[-1] if hello[:-1] == HELLO else None
+        if seat == ANY_SEAT and None in self.seats:
+            seat = self.seats.index(None)
+        if seat is None or seat >= self.player_count or self.seats[seat] is not None:
+            writer.close()
+            return
+        self.seats[seat] = RemoteSeat(reader, writer, seat, self.decision_timeout, self.fallback)
+        writer.write(_WELCOME.pack(seat, self.player_count))
+        if None not in self.seats:
+            self._seated.set()
+
+    async def wait_for_players(self) -> None:
+        """Wait until every seat is taken."""
+        if None in self.seats:
+            await self._seated.wait()
+
+    async def play_games(self, games: int, seed: Optional[int] = None, concurrency: int = 1000) -> TournamentResult:
+        """
+        Play games with up to `concurrency` in play at once. Game i starts with player i % player_count and rolls
+        its own dice seeded from the master seed and i, so results with deterministic players do not depend on
+        `concurrency` or the speed of the clients, barring timeouts.
+        """
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), "little")
+        await self.wait_for_players()
+        seats = [*self.seats]
+        winner_counts = [0] * self.player_count
+        game_indices = iter(range(games))
+
+        async def play_in_turn() -> None:
+            for game_index in game_indices:
+                game = Game(
+                    self.player_count,
+                    start_player=game_index % self.player_count,
+                    events=self._moves,
+                    dice_source=SeededDice(derive_seed(seed, game_index)),
+                )
+                for winner in await play_game(game, seats):
+                    winner_counts[winner] += 1
+
+        start = time.perf_counter()
+        tasks = [asyncio.ensure_future(play_in_turn()) for _ in range(min(concurrency, games))]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # A game failing ends the run, so the games still in play are stopped rather than left running
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            self.seconds += time.perf_counter() - start
+        return TournamentResult(seed, games, tuple(winner_counts))
+
+    @property
+    def moves_per_second(self) -> float:
+        return self.moves / self.seconds if self.seconds else 0.0
+
+    def report(self) -> str:
+        lines = [f"{self.moves} moves in {self.seconds:.2f} s, {self.moves_per_second:.0f} moves/s"]
+        for seat in self.remote_seats:
+            lines.append(f"    seat {seat.seat}: {seat.metrics.summary()}")
+        return "\n".join(lines)
+
+    async def close(self) -> None:
+        """Stop listening and disconnect the clients, which then stop."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for seat in self.remote_seats:
+            await seat.close()
+
+
+async def run_bot(
+    strategy: Strategy, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None, seat: int = ANY_SEAT
+) -> int:
+    """
+    Client playing a seat with a strategy, until the server closes the connection. Connects to a Unix socket if a
+    path is given, otherwise over TCP.
+
+    Each request is answered before the next is read, so a slow strategy delays only its own seat's games. The
+    strategy sees a game rebuilt from the request's compact state, with its actions played as it chooses them.
+
+    Returns:
+        number of decisions made
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    decisions = 0
+    try:
+        writer.write(HELLO + bytes([seat]))
+        try:
+            await reader.readexactly(_WELCOME.size)
+        except asyncio.IncompleteReadError:
+            raise ConnectionError(f"Server refused the connection, seat {seat} is not free")
+        while True:
+            try:
+                frame = await reader.readexactly(_REQUEST.size)
+            except asyncio.IncompleteReadError:
+                break
+            request_id, player_id, dice_token, state = _REQUEST.unpack(frame)
+            game = CompactState.from_int(int.from_bytes(state, "little")).to_game()
+            actions = bytearray()
+            for action in strategy.choose_actions(game, player_id, [*decode_dice(dice_token)]):
+                game.play_action(player_id, action)
+                actions.append(encode_action(action))
+            writer.write(_MOVE.pack(request_id, len(actions), bytes(actions)))
+            decisions += 1
+    finally:
+        writer.close()
+    return decisions
+
+
+async def serve_local(
+    bots: Sequence[Strategy],
+    games: int,
+    seed: Optional[int] = None,
+    local_strategies: Mapping[PlayerId, Strategy] = {},
+    concurrency: int = 1000,
+    decision_timeout: Optional[float] = 1.0,
+    path: Optional[str] = None,
+) -> Tuple[TournamentResult, GameServer]:
+    """
+    Play games between strategies playing as clients of a server on the same event loop, over a real socket: the
+    stand-in for bots in other processes, for testing and load testing.
+
+    Args:
+        bots: strategies to connect as clients, taking the seats without a local strategy in order
+        games: number of games
+        seed: master seed, see `GameServer.play_games`
+        local_strategies: strategies playing seats in the server
+        concurrency: games in play at once
+        decision_timeout: seconds each client has to answer a decision
+        path: Unix socket to listen on; TCP on a free local port by default
+
+    Returns:
+        the result, and the server, for its metrics
+    """
+    server = GameServer(len(bots) + len(local_strategies), local_strategies, decision_timeout)
+    await server.start(path=path)
+    address = {"path": path} if path is not None else {"port": server.address[1]}
+    bot_seats = [player_id for player_id in range(server.player_count) if player_id not in local_strategies]
+    clients = [asyncio.ensure_future(run_bot(bot, seat=seat, **address)) for bot, seat in zip(bots, bot_seats)]
+    try:
+        result = await server.play_games(games, seed=seed, concurrency=concurrency)
+    finally:
+        await server.close()
+        await asyncio.gather(*clients, return_exceptions=True)
+    return result, server
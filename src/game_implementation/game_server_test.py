@@ -0,0 +1,174 @@
+import asyncio
+from typing import Collection, Iterator
+
+import pytest
+
+from game_implementation.action import Action
+from game_implementation.game import Game
+from game_implementation.exceptions import IllegalMoveException
+from game_implementation.game_server import (
+    _MOVE,
+    _REQUEST,
+    ANY_SEAT,
+    decode_move,
+    GameServer,
+    HELLO,
+    run_bot,
+    serve_local,
+)
+from game_implementation.strategy import (
+    DOUBLE_TAKE_PREFERENCE,
+    PreferTakeOnDoubleSafeDie,
+    TALLEST_DAISY_PREFERENCE,
+    TallestDaisyStrategy,
+)
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.types import DiscId, PlayerId
+
+
+class FirstActionStrategy(Strategy):
+    def choose_actions(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> Iterator[Action]:
+        for die in dice:
+            actions = game.possible_actions(player_id, die)
+            if actions:
+                yield actions[0]
+
+
+class PassStrategy(Strategy):
+    """Never plays an action, which is illegal whenever an action is possible."""
+
+    def choose_actions(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> Iterator[Action]:
+        return iter(())
+
+
+def make_strategies():
+    return [
+        TallestDaisyStrategy(TALLEST_DAISY_PREFERENCE),
+        FirstActionStrategy(),
+        PreferTakeOnDoubleSafeDie(DOUBLE_TAKE_PREFERENCE),
+    ]
+
+
+async def raw_client(address, answer, requests: int = -1):
+    """Connect, answer requests with `answer(request_id)` bytes, and disconnect after `requests` requests."""
+    reader, writer = await asyncio.open_connection(*address)
+    writer.write(HELLO + bytes([ANY_SEAT]))
+    await reader.readexactly(2)
+    try:
+        while requests != 0:
+            try:
+                frame = await reader.readexactly(_REQUEST.size)
+            except asyncio.IncompleteReadError:
+                break
+            writer.write(answer(_REQUEST.unpack(frame)[0]))
+            requests -= 1
+    finally:
+        writer.close()
+
+
+async def play_against_raw_client(games: int, answer, requests: int = -1):
+    server = GameServer(2, {0: FirstActionStrategy()})
+    await server.start()
+    client = asyncio.ensure_future(raw_client(server.address, answer, requests))
+    try:
+        result = await server.play_games(games, seed=2, concurrency=4)
+    finally:
+        await server.close()
+        await client
+    return result, server
+
+
+async def play_locally(games: int, seed: int):
+    server = GameServer(3, dict(enumerate(make_strategies())))
+    return await server.play_games(games, seed=seed)
+
+
+class TestGameServer:
+    @pytest.mark.parametrize("concurrency", [1, 7, 100])
+    def test_bots_play_as_strategies_in_the_server(self, concurrency: int):
+        result, server = asyncio.run(serve_local(make_strategies(), 30, seed=5, concurrency=concurrency))
+
+        assert result == asyncio.run(play_locally(30, seed=5))
+        assert result.games == 30
+        assert sum(result.winner_counts) >= 30
+        assert sum(seat.metrics.decisions for seat in server.remote_seats) == server.moves
+        assert server.moves_per_second > 0
+        for seat in server.remote_seats:
+            assert seat.metrics.timeouts == seat.metrics.illegal == 0
+            assert 0 < seat.metrics.median_latency.value() <= seat.metrics.p99_latency.value()
+
+    def test_unix_socket_and_local_seats(self, tmp_path):
+        strategies = make_strategies()
+        result, server = asyncio.run(
+            serve_local(strategies[1:], 10, seed=5, local_strategies={0: strategies[0]}, path=str(tmp_path / "sock"))
+        )
+
+        assert result == asyncio.run(play_locally(10, seed=5))
+        assert [seat.seat for seat in server.remote_seats] == [1, 2]
+
+    def test_illegal_moves_are_played_by_fallback(self):
+        result, server = asyncio.run(serve_local([PassStrategy(), FirstActionStrategy()], 10, seed=3))
+
+        assert result.games == 10
+        passing, playing = server.remote_seats
+        assert passing.metrics.illegal > 0
+        assert playing.metrics.illegal == 0
+
+    def test_unanswered_decisions_time_out(self):
+        async def run():
+            server = GameServer(2, {0: FirstActionStrategy()}, decision_timeout=0.01)
+            await server.start()
+            reader, writer = await asyncio.open_connection(*server.address)
+            writer.write(HELLO + bytes([ANY_SEAT]))
+            result = await server.play_games(3, seed=1)
+            await server.close()
+            writer.close()
+            return result, server
+
+        result, server = asyncio.run(run())
+
+        assert result.games == 3
+        (seat,) = server.remote_seats
+        assert seat.metrics.timeouts == seat.metrics.decisions > 0
+        assert "timed out" in server.report()
+
+    def test_taken_seat_is_refused(self):
+        async def run():
+            server = GameServer(2, {0: FirstActionStrategy()})
+            await server.start()
+            try:
+                await run_bot(FirstActionStrategy(), port=server.address[1], seat=0)
+            finally:
+                await server.close()
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(run())
+
+    @pytest.mark.parametrize(
+        "count, tokens",
+        [(1, b"\x03\x00\x00"), (1, b"\xff\x00\x00"), (2, b"\x00\x7f\x00"), (7, b"\x00\x00\x00")],
+    )
+    def test_garbage_moves_are_illegal(self, count: int, tokens: bytes):
+        with pytest.raises(IllegalMoveException):
+            decode_move(count, tokens)
+
+        result, server = asyncio.run(
+            play_against_raw_client(5, lambda request_id: _MOVE.pack(request_id, count, tokens))
+        )
+
+        assert result.games == 5
+        (seat,) = server.remote_seats
+        assert seat.metrics.illegal == seat.metrics.decisions > 0
+
+    def test_disconnected_bot_is_played_by_fallback(self):
+        def answer(request_id):
+            return _MOVE.pack(request_id, 0, b"")
+
+        result, server = asyncio.run(play_against_raw_client(20, answer, requests=10))
+
+        assert result.games == 20
+        assert sum(result.winner_counts) >= 20
+        (seat,) = server.remote_seats
+        assert seat.metrics.decisions > 10
+        assert seat.metrics.disconnected == seat.metrics.decisions - 10
+        assert "after disconnecting" in server.report()
@@ -1,3 +1,4 @@
+import random
 from typing import Collection, List, Union
 
 # from unittest.mock import MagicMock
@@ -9,8 +10,10 @@ from pytest_mock import MockFixture
 from game_implementation.action import Action
 from game_implementation.disc_state import DiscState
 from game_implementation.exceptions import DiscStateException, IllegalMoveException
-from game_implementation.game import Game, Strategy
+from game_implementation.game import Game, Strategy, Turns
+from game_implementation.game_events import ConsoleEventSink, GameEventSink
 from game_implementation.player import Player
+from game_implementation.strategy import RandomStrategy
 from game_implementation.types import DiscId, PlayerId
 
 
@@ -223,7 +226,7 @@ class TestGame:
 
         possible_actions = game.possible_actions(0, dice)
 
-        assert possible_actions == expected_actions
+        assert [*possible_actions] == expected_actions
 
     @pytest.mark.parametrize(
         "init_players, dice_rolls, chosen_actions, expected_player_states",
@@ -310,6 +313,12 @@ class TestGame:
                     Action(1, 3, DiscState.Gone),
                 ],
             ),
+            (
+                # making an opponent's disc safe is not a legal move
+                [Player(0), Player(1)],
+                [1, 2, 3],
+                [Action(1, 1, DiscState.Safe), Action(1, 2, DiscState.Gone), Action(1, 3, DiscState.Gone)],
+            ),
         ],
     )
     def test_take_turn_fails(
@@ -408,8 +417,14 @@ class TestGame:
     def test_play(self, mocker: MockFixture):
         game = Game(player_count=3, player_init=[])
 
+        def round_without_turns(game_over: bool) -> Turns[bool]:
+            return game_over
+            yield
+
         mock_set_initial_defence = mocker.patch.object(game, "set_initial_defence")
-        mock_play_round = mocker.patch.object(game, "play_round", side_effect=[False, False, True])
+        mock_round_turns = mocker.patch.object(
+            game, "round_turns", side_effect=[round_without_turns(game_over) for game_over in (False, False, True)]
+        )
         mocker.patch.object(game, "winners", side_effect=[[3, 2]])
 
         mock_strategy = MagicMock(Strategy)
@@ -418,5 +433,141 @@ class TestGame:
         winners = game.play(strategies)
 
         assert mock_set_initial_defence.call_count == 1
-        assert mock_play_round.call_count == 3
+        assert mock_round_turns.call_count == 3
         assert winners == [3, 2]
+
+    def test_play_is_silent_by_default(self, capsys):
+        game = Game(player_count=3)
+
+        game.play([RandomStrategy()] * 3)
+
+        assert capsys.readouterr().out == ""
+
+    def test_play_raises_events(self):
+        class RecordingSink(GameEventSink):
+            def __init__(self):
+                self.events = []
+
+            def game_started(self, game: Game) -> None:
+                self.events.append("game_started")
+
+            def turn_started(self, game: Game, player_id: PlayerId) -> None:
+                self.events.append("turn_started")
+
+            def round_ended(self, game: Game, round_winner_id: PlayerId, round_scores) -> None:
+                self.events.append("round_ended")
+
+            def game_ended(self, game: Game, winners) -> None:
+                self.events.append(("game_ended", [*winners]))
+
+        sink = RecordingSink()
+        game = Game(player_count=3, events=sink)
+
+        winners = game.play([RandomStrategy()] * 3)
+
+        assert sink.events[0] == "game_started"
+        assert sink.events[-1] == ("game_ended", winners)
+        assert sink.events.count("round_ended") == 3
+        assert "turn_started" in sink.events
+
+    def test_console_event_sink(self, capsys, mocker: MockFixture):
+        mocker.patch("game_implementation.game.get_dice", return_value=[1, 2, 3])
+        game = Game(player_count=2, events=ConsoleEventSink())
+
+        game.take_turn(0, RandomStrategy())
+
+        output = capsys.readouterr().out
+        assert "Dice: [2, 3, 4]" in output
+        assert output.count("Player: 0:") == 3
+
+    def test_clone_is_independent(self):
+        game = Game(player_count=3, start_player=1, round=1, player_init=[Player(2, init_taken=[3], init_score=7)])
+        game.player_id = 2
+
+        clone = game.clone()
+        clone.play_action(2, Action(0, 1, DiscState.Gone))
+        clone.turn += 1
+
+        assert game.players[0].discs[1] == DiscState.Vulnerable
+        assert game.players[2].taken == [3]
+        assert game.turn == 0
+        assert clone.players[2].taken == [3, 2]
+        assert (clone.start_player, clone.round, clone.player_id) == (1, 1, 2)
+        assert game.possible_actions(1, 1) == (
+            Action(0, 1, DiscState.Gone),
+            Action(1, 1, DiscState.Safe),
+            Action(2, 1, DiscState.Gone),
+        )
+        assert clone.possible_actions(1, 1) == (Action(1, 1, DiscState.Safe), Action(2, 1, DiscState.Gone))
+
+    def test_clone_does_not_share_events_or_dice(self):
+        game = Game(player_count=2, events=ConsoleEventSink(), dice_source=MagicMock())
+
+        clone = game.clone()
+
+        assert not isinstance(clone.events, ConsoleEventSink)
+        assert clone.dice_source is None
+
+    def test_pop_reverts_turns_and_rounds(self):
+        random.seed(5)
+        game = Game(player_count=3)
+        game.set_initial_defence()
+        strategies = [RandomStrategy()] * 3
+
+        def play_turn() -> bool:
+            round_over = game.take_turn(game.player_id, strategies[game.player_id])
+            game.player_id = (game.player_id + 1) % game.player_count
+            if round_over:
+                game.end_round(game.player_id)
+            return round_over
+
+        rounds_reverted = 0
+        while game.round < game.player_count:
+            before = game.clone()
+            game.push()
+            rounds_reverted += play_turn()
+            game.pop()
+
+            assert game.players == before.players
+            assert (game.turn, game.round, game.player_id) == (before.turn, before.round, before.player_id)
+            assert game._disc_columns == before._disc_columns
+            play_turn()
+
+        assert rounds_reverted > 0
+
+    def test_pop_after_rejected_take(self):
+        game = Game(
+            player_count=2,
+            player_init=[Player(0, init_taken=[5]), Player(1, init_disks={0: DiscState.Safe})],
+        )
+        initial = game.clone()
+
+        game.push()
+        with pytest.raises(DiscStateException):
+            game.play_action(0, Action(1, 0, DiscState.Gone))
+        game.pop()
+
+        assert game.players == initial.players
+        assert game.players[0].taken == [5]
+        assert game.players[0].round_score == 5
+        for player in game.players:
+            player.verify_totals()
+
+    def test_nested_push_pop(self):
+        game = Game(player_count=2, player_init=[Player(1, init_disks={0: DiscState.Safe})])
+        initial = game.clone()
+
+        game.push()
+        game.play_action(0, Action(1, 0, DiscState.Vulnerable))
+        after_first = game.clone()
+        game.push()
+        game.play_action(0, Action(1, 0, DiscState.Gone))
+        game.turn = 1
+        game.pop()
+
+        assert game.players == after_first.players
+        assert game.turn == 0
+        game.pop()
+        assert game.players == initial.players
+        with pytest.raises(IndexError):
+            game.pop()
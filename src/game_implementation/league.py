@@ -0,0 +1,199 @@
+import itertools
+import random
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from game_implementation.benchmark import play_seated, WinStats
+from game_implementation.game_runner import derive_seed
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.tournament import batches
+from game_implementation.types import PlayerCount, PlayerId
+
+TABLE_SIZES = (2, 3, 4)
+"""Supported players per table, as `types.PlayerCount`"""
+
+
+class Fixture(NamedTuple):
+    lineup: Tuple[int, ...]
+    """Index in the pool of the strategy in each seat"""
+    start_player: PlayerId
+
+
+class FixtureResult(NamedTuple):
+    fixture_index: int
+    scores: Tuple[int, ...]
+    """Final score of each seat"""
+    winners: Tuple[PlayerId, ...]
+
+
+def table_fixtures(table: Sequence[int], first_start: int = 0) -> Iterator[Fixture]:
+    """
+    Games for one table of strategies: every turn order of the strategies once, so that position bias cancels out.
+
+    The start player rotates from game to game, and the strategies are seated to play in turn order from the start
+    player. The rules only depend on seats through the start player and turn order, so the seats themselves need no
+    balancing.
+    """
+    table_size = len(table)
+    for index, order in enumerate(itertools.permutations(table)):
+        start_player = (first_start + index) % table_size
+        lineup = order[-start_player:] + order[:-start_player] if start_player else order
+        yield Fixture(tuple(lineup), start_player)
+
+
+def round_robin_tables(pool_size: int, table_size: PlayerCount) -> Iterator[Tuple[int, ...]]:
+    """Every combination of `table_size` strategies from the pool."""
+    return itertools.combinations(range(pool_size), table_size)
+
+
+def shuffled_tables(pool_size: int, table_size: PlayerCount, table_count: int, seed: int) -> Iterator[Tuple[int, ...]]:
+    """
+    Tables for a pool too large for a round robin: each round the pool is shuffled and dealt into tables, the
+    strategies that have played most sitting out if there are too few for the last table, so appearances never
+    differ by more than one.
+    """
+    rng = random.Random(seed)
+    appearances = [0] * pool_size
+    seated = pool_size - pool_size % table_size
+    dealt = 0
+    while True:
+        pool = [*range(pool_size)]
+        rng.shuffle(pool)
+        # stable, so strategies that have played as often stay shuffled
+        pool.sort(key=lambda index: appearances[index])
+        playing = pool[:seated]
+        rng.shuffle(playing)
+        for first in range(0, seated, table_size):
+            if dealt == table_count:
+                return
+            last = first + table_size
+            table = tuple(sorted(playing[first:last]))
+            for index in table:
+                appearances[index] += 1
+            yield table
+            dealt += 1
+
+
+def schedule(
+    pool_size: int, table_size: PlayerCount, table_count: Optional[int] = None, seed: int = 0
+) -> List[Fixture]:
+    """
+    Fixtures of a league: a round robin of all tables of `table_size` strategies, or `table_count` shuffled tables.
+    Every table plays each turn order of its strategies once, see `table_fixtures`.
+    """
+    if table_size not in TABLE_SIZES:
+        raise ValueError(f"Tables must have {TABLE_SIZES} players, not {table_size}")
+    if pool_size < table_size:
+        raise ValueError(f"A pool of {pool_size} strategies cannot fill a table of {table_size}")
+    if table_count is None:
+        tables = round_robin_tables(pool_size, table_size)
+    else:
+        tables = shuffled_tables(pool_size, table_size, table_count, seed)
+    return [
+        fixture
+        for table_index, table in enumerate(tables)
+        for fixture in table_fixtures(table, first_start=table_index)
+    ]
+
+
+def play_fixtures(
+    pool: Sequence[Strategy], fixtures: Sequence[Fixture], seed: int, first_index: int
+) -> List[FixtureResult]:
+    """Play consecutive fixtures of a league; fixture i is seeded from the master seed and i."""
+    results = []
+    for fixture_index, fixture in enumerate(fixtures, start=first_index):
+        game = play_seated(
+            [pool[index] for index in fixture.lineup], fixture.start_player, derive_seed(seed, fixture_index)
+        )
+        results.append(
+            FixtureResult(fixture_index, tuple(player.score for player in game.players), tuple(game.winners()))
+        )
+    return results
+
+
+class Standings:
+    """League table, updated a game at a time, in any order."""
+
+    def __init__(self, names: Sequence[str]):
+        self.names = [*names]
+        self.results = [WinStats() for _ in names]
+        self.points = [0] * len(names)
+        """Total final score over all games"""
+        self.games = 0
+
+    def add(self, fixture: Fixture, result: FixtureResult) -> None:
+        self.games += 1
+        for seat, strategy_index in enumerate(fixture.lineup):
+            self.results[strategy_index].add(len(result.winners) if seat in result.winners else 0)
+            self.points[strategy_index] += result.scores[seat]
+
+    def ranking(self) -> List[int]:
+        """Pool indices, best first: by win rate, then mean score"""
+        return sorted(
+            range(len(self.names)),
+            key=lambda index: (-self.results[index].win_rate, -self.mean_score(index), index),
+        )
+
+    def mean_score(self, index: int) -> float:
+        games = self.results[index].games
+        return self.points[index] / games if games else 0.0
+
+    def report(self, top: Optional[int] = None) -> str:
+        width = max(len(name) for name in self.names)
+        lines = [f"{self.games} games, win rate [95% interval], mean score"]
+        for rank, index in enumerate(self.ranking()[:top], start=1):
+            lines.append(f"{rank:3} {self.names[index]:{width}}  {self.results[index]}  {self.mean_score(index):5.1f}")
+        return "\n".join(lines)
+
+
+def run_league(
+    pool: Sequence[Strategy],
+    table_size: PlayerCount = 3,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    batch_size: int = 100,
+    table_count: Optional[int] = None,
+    names: Optional[Sequence[str]] = None,
+    on_update: Optional[Callable[[Standings], None]] = None,
+) -> Standings:
+    """
+    Rank a pool of strategies by playing a league between them.
+
+    Batches of fixtures are spread over a pool of worker processes and results are added to the standings as each
+    batch comes back, calling `on_update` after each. Every game is seeded from the master seed and its fixture
+    index, so the games played only depend on the seed and schedule, not on the number of workers.
+
+    Args:
+        pool: strategies to rank, must be picklable if workers > 1
+        table_size: players per game
+        seed: master seed, chosen at random if not given
+        workers: number of processes; 1 plays all games in this process
+        batch_size: number of games sent to a worker at a time
+        table_count: number of tables to play, from shuffled deals of the pool; a full round robin if not given
+        names: of the strategies in the standings, their pool index and class name by default
+        on_update: called with the standings after each batch
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 63)
+    fixtures = schedule(len(pool), table_size, table_count, seed)
+    standings = Standings(names or [f"{index}: {type(strategy).__name__}" for index, strategy in enumerate(pool)])
+
+    def add_batch(results: List[FixtureResult]) -> None:
+        for result in results:
+            standings.add(fixtures[result.fixture_index], result)
+        if on_update is not None:
+            on_update(standings)
+
+    if workers == 1:
+        for first, last in batches(len(fixtures), batch_size):
+            add_batch(play_fixtures(pool, fixtures[first:last], seed, first))
+        return standings
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(play_fixtures, pool, fixtures[first:last], seed, first)
+            for first, last in batches(len(fixtures), batch_size)
+        ]
+        for future in as_completed(futures):
+            add_batch(future.result())
+    return standings
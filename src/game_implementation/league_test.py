@@ -0,0 +1,71 @@
+import itertools
+from collections import Counter
+
+import pytest
+
+from game_implementation.disc_state import DiscState
+from game_implementation.league import run_league, schedule, shuffled_tables, table_fixtures
+from game_implementation.strategy import RandomStrategy, TALLEST_DAISY_PREFERENCE, TallestDaisyStrategy
+
+
+def make_pool():
+    return [
+        RandomStrategy(),
+        TallestDaisyStrategy(TALLEST_DAISY_PREFERENCE),
+        TallestDaisyStrategy({DiscState.Gone: 0, DiscState.Safe: 1, DiscState.Vulnerable: 2}),
+        RandomStrategy(),
+    ]
+
+
+class TestLeague:
+    @pytest.mark.parametrize("table_size", [2, 3, 4])
+    def test_table_fixtures_cover_every_turn_order(self, table_size):
+        table = tuple(range(10, 10 + table_size))
+        fixtures = [*table_fixtures(table)]
+
+        turn_orders = {
+            tuple(fixture.lineup[(fixture.start_player + offset) % table_size] for offset in range(table_size))
+            for fixture in fixtures
+        }
+        assert turn_orders == set(itertools.permutations(table))
+        assert len(fixtures) == len(turn_orders)
+        assert Counter(fixture.start_player for fixture in fixtures) == Counter(
+            {seat: len(fixtures) // table_size for seat in range(table_size)}
+        )
+
+    def test_round_robin_schedule(self):
+        fixtures = schedule(5, 3)
+
+        assert len(fixtures) == 10 * 6
+        appearances = Counter(index for fixture in fixtures for index in fixture.lineup)
+        assert appearances == Counter({index: 6 * 6 for index in range(5)})
+
+    def test_shuffled_tables_balance_appearances(self):
+        tables = [*shuffled_tables(10, 3, 30, seed=1)]
+
+        assert len(tables) == 30
+        appearances = Counter(index for table in tables for index in table)
+        assert set(appearances.values()) == {9}
+
+    @pytest.mark.parametrize("pool_size, table_size", [(5, 5), (5, 1), (2, 3)])
+    def test_schedule_rejects_bad_tables(self, pool_size, table_size):
+        with pytest.raises(ValueError):
+            schedule(pool_size, table_size)
+
+    def test_run_league(self):
+        updates = []
+        standings = run_league(make_pool(), 3, seed=7, batch_size=5, on_update=lambda s: updates.append(s.games))
+
+        assert standings.games == 4 * 6
+        assert updates == [5, 10, 15, 20, 24]
+        assert sorted(standings.ranking()) == [0, 1, 2, 3]
+        assert [stats.games for stats in standings.results] == [18] * 4
+        assert sum(stats.shares for stats in standings.results) == pytest.approx(24)
+        assert standings.report(top=2).count("\n") == 2
+
+    def test_run_league_independent_of_workers(self):
+        single = run_league(make_pool(), 2, seed=3, batch_size=4)
+        multiple = run_league(make_pool(), 2, seed=3, batch_size=4, workers=2)
+
+        assert multiple.points == single.points
+        assert [stats.shares for stats in multiple.results] == pytest.approx([stats.shares for stats in single.results])
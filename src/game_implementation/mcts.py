@@ -0,0 +1,239 @@
+import math
+import random
+import time
+from typing import Collection, Dict, List, Optional, Protocol, Sequence, Tuple
+
+from game_implementation.action import Action
+from game_implementation.compact_state import CompactState, distinct_turns
+from game_implementation.dice import FACES
+from game_implementation.disc_state import DiscState
+from game_implementation.game import Game
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.types import DiscId, PlayerId
+
+Rewards = Tuple[float, ...]
+"""Reward of a playout to each player"""
+
+
+class RolloutPolicy(Protocol):
+    def play_turn(self, state: CompactState, dice: Sequence[DiscId], rng: random.Random) -> CompactState:
+        """Play a roll for the player to move, returning the state at the end of their turn."""
+        pass
+
+
+class RandomRollout(RolloutPolicy):
+    """`RandomStrategy` on compact states."""
+
+    def play_turn(self, state: CompactState, dice: Sequence[DiscId], rng: random.Random) -> CompactState:
+        player_id = state.player_id
+        for die in dice:
+            actions = state.possible_actions(player_id, die)
+            if actions:
+                state = state.with_action(player_id, rng.choice(actions))
+        return state
+
+
+class TallestDaisyRollout(RolloutPolicy):
+    """`TallestDaisyStrategy` on compact states."""
+
+    def __init__(self, action_preference: Dict[DiscState, int]):
+        self.action_preference = action_preference
+
+    def play_turn(self, state: CompactState, dice: Sequence[DiscId], rng: random.Random) -> CompactState:
+        player_id = state.player_id
+        for die in dice:
+            actions = state.possible_actions(player_id, die)
+            if actions:
+                # max keeps the first of equal actions, so search from the end as sorting and taking the last does
+                action = max(
+                    reversed(actions),
+                    key=lambda action: (
+                        self.action_preference[action.new_state],
+                        -state.expected_score(action.target_id),
+                    ),
+                )
+                state = state.with_action(player_id, action)
+        return state
+
+
+class SearchStats:
+    """Counters for the searches of an `MctsStrategy`."""
+
+    def __init__(self):
+        self.moves = 0
+        self.playouts = 0
+        self.seconds = 0.0
+        self.reused_playouts = 0
+        """Playouts already in the tree kept from earlier moves when a search started"""
+
+    @property
+    def playouts_per_second(self) -> float:
+        return self.playouts / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (
+            f"SearchStats(moves={self.moves}, playouts={self.playouts}, seconds={self.seconds:.3f}, "
+            f"playouts_per_second={self.playouts_per_second:.0f}, reused_playouts={self.reused_playouts})"
+        )
+
+
+class ChanceNode:
+    """Position after a turn, before the next player rolls; holds the statistics of the turn leading to it."""
+
+    __slots__ = ("state", "visits", "reward_sums", "children")
+
+    def __init__(self, state: CompactState):
+        self.state = state
+        self.visits = 0
+        self.reward_sums = [0.0] * state.player_count
+        self.children: Dict[Tuple[DiscId, ...], DecisionNode] = {}
+
+    def child(self, dice: Tuple[DiscId, ...]) -> "DecisionNode":
+        node = self.children.get(dice)
+        if node is None:
+            node = self.children[dice] = DecisionNode(self.state, dice)
+        return node
+
+
+class DecisionNode:
+    """Position after a roll; the player to move chooses between the distinct turns the roll allows."""
+
+    __slots__ = ("state", "dice", "visits", "turns", "children")
+
+    def __init__(self, state: CompactState, dice: Tuple[DiscId, ...]):
+        self.state = state
+        self.dice = dice
+        self.visits = 0
+        turns = distinct_turns(state, dice)
+        self.turns: List[Tuple[Action, ...]] = [*turns.values()]
+        self.children: List[ChanceNode] = [ChanceNode(outcome.end_turn()) for outcome in turns]
+
+    def select(self, exploration: float) -> ChanceNode:
+        """Child with the highest upper confidence bound for the player to move; unvisited children first."""
+        player_id = self.state.player_id
+        log_visits = math.log(self.visits) if self.visits else 0.0
+        best, best_bound = None, -math.inf
+        for child in self.children:
+            if child.visits == 0:
+                return child
+            bound = child.reward_sums[player_id] / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if bound > best_bound:
+                best, best_bound = child, bound
+        return best
+
+
+def _win_shares(scores: Sequence[int]) -> Rewards:
+    winning_score = max(scores)
+    winners = sum(score == winning_score for score in scores)
+    return tuple(1 / winners if score == winning_score else 0.0 for score in scores)
+
+
+class MctsStrategy(Strategy):
+    """
+    Monte Carlo tree search over whole turns, with chance nodes for dice rolls.
+
+    Each player picks the turn with the best upper confidence bound on their own reward (max-n UCT). Playouts
+    follow `rollout` on compact states until `playout_rounds` rounds have ended, or the game ends, and reward the
+    leaders by cumulative score. The subtree of the position reached is kept for the next move, so playouts
+    through the turns opponents actually played are not wasted.
+    """
+
+    def __init__(
+        self,
+        time_budget: Optional[float] = 0.1,
+        max_playouts: Optional[int] = None,
+        rollout: Optional[RolloutPolicy] = None,
+        exploration: float = math.sqrt(2),
+        playout_rounds: int = 1,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            time_budget: seconds to search for each move, or None to only stop after `max_playouts`
+            max_playouts: most playouts for each move, or None to only stop at `time_budget`
+            rollout: policy for playouts, RandomRollout by default
+            exploration: UCT exploration constant, for rewards between 0 and 1
+            playout_rounds: round ends to play out before scoring a playout
+            seed: seed for the playout dice and random choices
+        """
+        if time_budget is None and max_playouts is None:
+            raise ValueError("Need a time budget or a maximum number of playouts")
+        self.time_budget = time_budget
+        self.max_playouts = max_playouts
+        self.rollout = rollout if rollout is not None else RandomRollout()
+        self.exploration = exploration
+        self.playout_rounds = playout_rounds
+        self.rng = random.Random(seed)
+        self.stats = SearchStats()
+        self._root: Optional[ChanceNode] = None
+
+    def choose_actions(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> Collection[Action]:
+        state = CompactState.from_game(game)._replace(player_id=player_id)
+        return self.search(state, dice)
+
+    def search(self, state: CompactState, dice: Collection[DiscId]) -> Tuple[Action, ...]:
+        """Best turn for the player to move in `state` with the rolled dice."""
+        start = time.perf_counter()
+        root = self._find_root(state).child(tuple(sorted(dice)))
+        self.stats.reused_playouts += root.visits
+        if len(root.children) > 1:
+            deadline = None if self.time_budget is None else start + self.time_budget
+            playouts = 0
+            while (self.max_playouts is None or playouts < self.max_playouts) and (
+                deadline is None or time.perf_counter() < deadline
+            ):
+                self._playout(root)
+                playouts += 1
+            self.stats.playouts += playouts
+        best = max(range(len(root.children)), key=lambda index: root.children[index].visits)
+        self._root = root.children[best]
+        self.stats.moves += 1
+        self.stats.seconds += time.perf_counter() - start
+        return root.turns[best]
+
+    def _find_root(self, state: CompactState) -> ChanceNode:
+        """Node for `state` in the tree kept from the last move, or a new tree."""
+        if self._root is not None:
+            # Rounds and turns only move forwards, so the search can stop at positions past `state`
+            progress = (state.round, state.turn)
+            nodes = [self._root]
+            while nodes:
+                node = nodes.pop()
+                if node.state == state:
+                    return node
+                if (node.state.round, node.state.turn) < progress:
+                    nodes.extend(child for decision in node.children.values() for child in decision.children)
+        return ChanceNode(state)
+
+    def _playout(self, root: DecisionNode) -> None:
+        path: List[DecisionNode] = []
+        chance_path: List[ChanceNode] = []
+        node = root
+        while True:
+            path.append(node)
+            child = node.select(self.exploration)
+            chance_path.append(child)
+            if child.visits == 0 or child.state.is_game_over():
+                rewards = self._rollout(child.state)
+                break
+            node = child.child(self._roll())
+        for node in path:
+            node.visits += 1
+        for child in chance_path:
+            child.visits += 1
+            for player_id, reward in enumerate(rewards):
+                child.reward_sums[player_id] += reward
+
+    def _roll(self) -> Tuple[DiscId, ...]:
+        return tuple(sorted(self.rng.choices(FACES, k=3)))
+
+    def _rollout(self, state: CompactState) -> Rewards:
+        rounds_left = self.playout_rounds
+        while not state.is_game_over():
+            round = state.round
+            state = self.rollout.play_turn(state, self.rng.choices(FACES, k=3), self.rng).end_turn()
+            if state.round != round:
+                rounds_left -= 1
+                if rounds_left == 0:
+                    break
+        return _win_shares(state.scores)
@@ -0,0 +1,99 @@
+import itertools
+import random
+
+import pytest
+from pytest_mock import MockFixture
+
+from game_implementation.compact_state import CompactState, turn_outcomes
+from game_implementation.dice import ReplayDice
+from game_implementation.disc_state import DiscState
+from game_implementation.game import Game
+from game_implementation.mcts import MctsStrategy, RandomRollout, TallestDaisyRollout
+from game_implementation.player import Player
+from game_implementation.strategy import RandomStrategy, TallestDaisyStrategy
+
+PREFERENCE = {DiscState.Gone: 3, DiscState.Safe: 2, DiscState.Vulnerable: 1}
+
+
+def make_game() -> Game:
+    return Game(
+        player_count=3,
+        player_init=[
+            Player(0, init_disks={1: DiscState.Safe, 3: DiscState.Gone}),
+            Player(1, init_taken=[4], init_disks={1: DiscState.Safe, 2: DiscState.Safe}),
+            Player(2, init_disks={0: DiscState.Gone, 4: DiscState.Safe}),
+        ],
+    )
+
+
+class TestMcts:
+    @pytest.mark.parametrize("dice", [[1, 1, 3], [0, 2, 4], [3, 3, 3], [5, 1, 0]])
+    def test_tallest_daisy_rollout_follows_strategy(self, dice):
+        game = make_game()
+        state = CompactState.from_game(game)
+        game.dice_source = ReplayDice([dice])
+
+        game.take_turn(0, TallestDaisyStrategy(PREFERENCE))
+
+        played = TallestDaisyRollout(PREFERENCE).play_turn(state, dice, random.Random())
+        assert played == CompactState.from_game(game)._replace(turn=0)
+
+    @pytest.mark.parametrize("dice", [[1, 1, 3], [0, 2, 4], [3, 3, 3]])
+    def test_random_rollout_plays_legal_turns(self, dice):
+        state = CompactState.from_game(make_game())
+        rng = random.Random(1)
+
+        played = {RandomRollout().play_turn(state, dice, rng) for _ in range(50)}
+
+        assert played <= {outcome for _, outcome in turn_outcomes(state, dice)}
+
+    @pytest.mark.parametrize("player_count", [2, 3])
+    def test_plays_legal_games(self, player_count):
+        random.seed(player_count)
+        strategy = MctsStrategy(time_budget=None, max_playouts=50, seed=1)
+
+        winners = Game(player_count=player_count).play([strategy] + [RandomStrategy()] * (player_count - 1))
+
+        assert winners
+        assert strategy.stats.moves > 0
+        assert strategy.stats.playouts > 0
+        assert strategy.stats.playouts_per_second > 0
+
+    def test_tallest_daisy_rollouts(self):
+        random.seed(0)
+        strategy = MctsStrategy(time_budget=None, max_playouts=20, rollout=TallestDaisyRollout(PREFERENCE), seed=1)
+
+        assert Game(player_count=3).play([strategy, RandomStrategy(), RandomStrategy()])
+
+    def test_time_budget(self, mocker: MockFixture):
+        strategy = MctsStrategy(time_budget=0.05, seed=1)
+        state = CompactState.from_game(make_game())
+        # A clock advancing 10ms on every reading, so the deadline is 5 readings after the start
+        clock = (tick / 100 for tick in itertools.count())
+        mocker.patch("game_implementation.mcts.time.perf_counter", side_effect=clock)
+
+        strategy.search(state, [0, 2, 4])
+
+        # Stopped at the first reading at or past the deadline
+        assert strategy.stats.playouts == 4
+        assert strategy.stats.seconds == pytest.approx(0.06)
+
+    def test_needs_a_budget(self):
+        with pytest.raises(ValueError):
+            MctsStrategy(time_budget=None)
+
+    def test_subtree_kept_after_opponent_moves(self):
+        game = Game(player_count=2)
+        game.set_initial_defence()
+        strategy = MctsStrategy(time_budget=None, max_playouts=500, seed=1)
+        strategy.search(CompactState.from_game(game), [0, 2, 4])
+
+        # Follow the most explored opponent roll and turn to our next roll
+        opponent_roll = max(strategy._root.children.values(), key=lambda node: node.visits)
+        opponent_turn = max(opponent_roll.children, key=lambda node: node.visits)
+        dice, next_roll = max(opponent_turn.children.items(), key=lambda item: item[1].visits)
+        explored = next_roll.visits
+        strategy.search(opponent_turn.state, dice)
+
+        assert explored > 0
+        assert strategy.stats.reused_playouts == explored
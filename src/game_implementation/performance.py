@@ -0,0 +1,167 @@
+"""
+Throughput, latency and memory measurements of the game engine and strategies, compared against a stored baseline.
+
+Every measurement plays seeded games, so each run does the same work; only the timings vary. Timings are the best
+of a few repeats, which filters out most noise from other processes.
+"""
+import json
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from game_implementation.dice import get_dice
+from game_implementation.game import Game
+from game_implementation.strategy import RandomStrategy, standard_strategies
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.types import DiscId, PlayerId
+
+
+class Metric(NamedTuple):
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+def _best_time(function: Callable[[], None], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _play_games(strategies: Sequence[Strategy], games: int, seed: int) -> None:
+    random.seed(seed)
+    for game_index in range(games):
+        Game(len(strategies), start_player=game_index % len(strategies)).play(strategies)
+
+
+def sample_positions(count: int, seed: int) -> List[Tuple[Game, PlayerId, List[DiscId]]]:
+    """Positions from seeded games between random players: a game at the start of a turn, its player and a roll."""
+    random.seed(seed)
+    strategies = [RandomStrategy()] * 3
+    positions = []
+    while len(positions) < count:
+        game = Game(3)
+        game.set_initial_defence()
+        over = False
+        while not over and len(positions) < count:
+            positions.append((game.clone(), game.player_id, get_dice()))
+            over = game.take_turn(game.player_id, strategies[game.player_id])
+            game.player_id = (game.player_id + 1) % game.player_count
+    return positions
+
+
+def measure_play(games: int, seed: int, repeats: int = 3) -> Metric:
+    strategies = [*standard_strategies().values()]
+    seconds = _best_time(lambda: _play_games(strategies, games, seed), repeats)
+    return Metric("play games/s", games / seconds, "games/s", True)
+
+
+def measure_possible_actions(positions: Sequence[Tuple[Game, PlayerId, List[DiscId]]], repeats: int = 3) -> Metric:
+    def call_all():
+        for game, player_id, _ in positions:
+            possible_actions = game.possible_actions
+            for disc_id in range(6):
+                possible_actions(player_id, disc_id)
+
+    seconds = _best_time(call_all, repeats)
+    return Metric("possible_actions calls/s", len(positions) * 6 / seconds, "calls/s", True)
+
+
+def measure_decisions(
+    name: str, strategy: Strategy, positions: Sequence[Tuple[Game, PlayerId, List[DiscId]]], repeats: int = 3
+) -> List[Metric]:
+    """
+    Median and 99th percentile time for the strategy to choose all its actions for a roll, taking the best of
+    `repeats` times for each position. The actions are not played, so later choices in a turn see the roll's state.
+    """
+    latencies = []
+    for game, player_id, dice in positions:
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            [*strategy.choose_actions(game, player_id, dice)]
+            best = min(best, time.perf_counter() - start)
+        latencies.append(best)
+    latencies.sort()
+    return [
+        Metric(f"{name} p50", latencies[len(latencies) // 2] * 1e6, "us", False),
+        Metric(f"{name} p99", latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1e6, "us", False),
+    ]
+
+
+def measure_peak_memory(games: int, seed: int) -> Metric:
+    """Largest peak of memory allocated while playing a game, beyond what was allocated before it."""
+    strategies = [*standard_strategies().values()]
+    random.seed(seed)
+    peak = 0
+    tracemalloc.start()
+    try:
+        for game_index in range(games):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            Game(len(strategies), start_player=game_index % len(strategies)).play(strategies)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return Metric("peak memory per game", peak / 1024, "KiB", False)
+
+
+def run_suite(scale: float = 1.0, seed: int = 0) -> List[Metric]:
+    """
+    Run every measurement.
+
+    Args:
+        scale: multiplies the number of games and positions; small scales are quick but noisy
+        seed: seed of all games played
+    """
+    positions = sample_positions(max(1, int(2000 * scale)), seed)
+    metrics = [measure_play(max(1, int(300 * scale)), seed), measure_possible_actions(positions)]
+    for name, strategy in standard_strategies().items():
+        metrics.extend(measure_decisions(name, strategy, positions))
+    metrics.append(measure_peak_memory(max(1, int(20 * scale)), seed))
+    return metrics
+
+
+def compare(metrics: Sequence[Metric], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """
+    Regressions against a baseline: metrics more than `threshold` (a fraction) worse than their baseline value.
+    Metrics missing from the baseline are not compared.
+    """
+    regressions = []
+    for metric in metrics:
+        expected = baseline.get(metric.name)
+        if expected is None:
+            continue
+        change = (metric.value - expected) / expected
+        if not metric.higher_is_better:
+            change = -change
+        if change < -threshold:
+            regressions.append(
+                f"{metric.name}: {metric.value:.4g} {metric.unit} against a baseline of {expected:.4g} ({change:+.0%})"
+            )
+    return regressions
+
+
+def load_baseline(path: str) -> Dict[str, float]:
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_baseline(path: str, metrics: Sequence[Metric]) -> None:
+    with open(path, "w") as file:
+        json.dump({metric.name: metric.value for metric in metrics}, file, indent=2)
+        file.write("\n")
+
+
+def report(metrics: Sequence[Metric], baseline: Dict[str, float]) -> str:
+    lines = [f"{'metric':<36}{'value':>12} {'unit':<8}{'baseline':>12}"]
+    for metric in metrics:
+        expected = baseline.get(metric.name)
+        expected_text = f"{expected:12.4g}" if expected is not None else f"{'-':>12}"
+        lines.append(f"{metric.name:<36}{metric.value:12.4g} {metric.unit:<8}{expected_text}")
+    return "\n".join(lines)
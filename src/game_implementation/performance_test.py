@@ -0,0 +1,61 @@
+from game_implementation.compact_state import CompactState
+from game_implementation.performance import (
+    compare,
+    load_baseline,
+    measure_decisions,
+    Metric,
+    run_suite,
+    sample_positions,
+    save_baseline,
+)
+from game_implementation.strategy import standard_strategies
+
+
+class TestPerformance:
+    def test_sample_positions_are_seeded(self):
+        first = sample_positions(30, 4)
+        second = sample_positions(30, 4)
+
+        assert len(first) == 30
+        assert [(CompactState.from_game(game), player_id, dice) for game, player_id, dice in first] == [
+            (CompactState.from_game(game), player_id, dice) for game, player_id, dice in second
+        ]
+
+    def test_measure_decisions(self):
+        positions = sample_positions(20, 1)
+        p50, p99 = measure_decisions("random", standard_strategies()["RandomStrategy"], positions)
+
+        assert (p50.name, p99.name) == ("random p50", "random p99")
+        assert 0 < p50.value <= p99.value
+
+    def test_compare(self):
+        metrics = [
+            Metric("throughput", 80.0, "games/s", True),
+            Metric("latency", 12.0, "us", False),
+            Metric("memory", 10.5, "KiB", False),
+            Metric("new", 1.0, "us", False),
+        ]
+        baseline = {"throughput": 100.0, "latency": 10.0, "memory": 10.0}
+
+        regressions = compare(metrics, baseline, 0.1)
+
+        assert [regression.split(":")[0] for regression in regressions] == ["throughput", "latency"]
+        assert compare(metrics, baseline, 0.25) == []
+
+    def test_improvements_are_not_regressions(self):
+        metrics = [Metric("throughput", 200.0, "games/s", True), Metric("latency", 1.0, "us", False)]
+
+        assert compare(metrics, {"throughput": 100.0, "latency": 10.0}, 0.0) == []
+
+    def test_suite_round_trips_through_baseline(self, tmp_path):
+        metrics = run_suite(scale=0.01)
+        path = str(tmp_path / "baseline.json")
+        save_baseline(path, metrics)
+
+        assert load_baseline(path) == {metric.name: metric.value for metric in metrics}
+        assert {metric.name for metric in metrics} >= {
+            "play games/s",
+            "possible_actions calls/s",
+            "peak memory per game",
+            *(f"{name} p99" for name in standard_strategies()),
+        }
@@ -1,10 +1,23 @@
-from typing import Collection, Dict, List, Optional, Union
+from typing import Collection, Dict, List, Optional, Tuple, Union
 
 from game_implementation.disc_state import DiscState
 from game_implementation.types import DiscId, DiscScore, PlayerId
 from game_implementation.exceptions import DiscStateException
 
 
+def possible_new_state(disc_state: DiscState, is_own_turn: bool) -> Optional[DiscState]:
+    """State a disc can be moved to by a die, depending on whether it belongs to the player rolling."""
+    if is_own_turn:
+        if disc_state == DiscState.Vulnerable:
+            return DiscState.Safe
+    else:
+        if disc_state == DiscState.Safe:
+            return DiscState.Vulnerable
+        if disc_state == DiscState.Vulnerable:
+            return DiscState.Gone
+    return None
+
+
 class Player:
     player_id: PlayerId
     """Id of player for reporting"""
@@ -14,6 +27,8 @@ class Player:
     """6 Disc states"""
     score: int
     """Cumulative Score from previous rounds"""
+    check_consistency: bool = False
+    """Cross-check the running totals against a full recompute on every query (for tests)"""
 
     def __init__(
         self,
@@ -30,7 +45,6 @@ class Player:
             discs = [DiscState.Vulnerable] * 6
             for disc_id, disc_state in init_disks.items():
                 discs[disc_id] = disc_state
-            print(discs)
         else:
             discs = [*init_disks]
         self.discs = discs
@@ -38,6 +52,9 @@ class Player:
         if len(self.discs) != 6:
             raise ValueError(f"Illegal player disc set size: {len(self.discs)}")
 
+        # Running totals, maintained by the methods that change taken and discs
+        self._taken_total, self._safe_total, self._gone_count = self._recompute_totals()
+
     def __repr__(self) -> str:
         disc_state = ", ".join([disc.value for disc in self.discs])
         return f"{self.player_id}: {disc_state}. Taken={self.taken}. Round Score={self.round_score}"
@@ -45,17 +62,51 @@ class Player:
     def __eq__(self, other):
         return self.__dict__ == other.__dict__
 
+    def _recompute_totals(self) -> Tuple[int, int, int]:
+        return (
+            sum(self.taken),
+            sum([disc_id + 1 for disc_id, disc in enumerate(self.discs) if disc == DiscState.Safe]),
+            sum([disc == DiscState.Gone for disc in self.discs]),
+        )
+
+    def verify_totals(self):
+        """Check the running totals against a full recompute."""
+        totals = (self._taken_total, self._safe_total, self._gone_count)
+        expected = self._recompute_totals()
+        if totals != expected:
+            raise DiscStateException(f"running totals {totals} differ from recomputed totals {expected}")
+
+    def clone(self) -> "Player":
+        """Copy of the player, copying only the two short lists."""
+        player = Player.__new__(Player)
+        player.__dict__.update(self.__dict__)
+        player.taken = [*self.taken]
+        player.discs = [*self.discs]
+        return player
+
+    def restore(self, score: int, taken: List[DiscScore], discs: List[DiscState]):
+        """Restore a previous state, e.g. from before `end_round`; the lists are used, not copied."""
+        self.score = score
+        self.taken = taken
+        self.discs = discs
+        self._taken_total, self._safe_total, self._gone_count = self._recompute_totals()
+
     def reset(self):
         self.taken = []
         self.discs = [DiscState.Vulnerable] * 6
+        self._taken_total = self._safe_total = self._gone_count = 0
 
     def is_over(self) -> bool:
-        return all(([disc == DiscState.Gone for disc in self.discs]))
+        if self.check_consistency:
+            self.verify_totals()
+        return self._gone_count == 6
 
     @property
     def round_score(self) -> int:
         """Putative additional score from current round if it ended now."""
-        return sum(self.taken) + sum([disc_id + 1 for disc_id, disc in enumerate(self.discs) if disc == DiscState.Safe])
+        if self.check_consistency:
+            self.verify_totals()
+        return self._taken_total + self._safe_total
 
     @property
     def expected_score(self) -> int:
@@ -64,9 +115,7 @@ class Player:
 
     def end_round(self) -> int:
         """End current round now"""
-        round_score = self.round_score
-        print(f"Ending round for {self.player_id}: gaining {round_score}")
-        self.score += round_score
+        self.score += self.round_score
         self.reset()
         return self.score
 
@@ -74,27 +123,34 @@ class Player:
         if self.discs[disc_id] != DiscState.Vulnerable:
             raise DiscStateException(f"cannot make safe {self.discs[disc_id]}")
         self.discs[disc_id] = DiscState.Safe
+        self._safe_total += disc_id + 1
 
     def make_vulnerable(self, disc_id: DiscId):
         if self.discs[disc_id] != DiscState.Safe:
             raise DiscStateException(f"cannot make vulnerable {self.discs[disc_id]}")
         self.discs[disc_id] = DiscState.Vulnerable
+        self._safe_total -= disc_id + 1
 
     def take(self, disc_id: DiscId):
         self.taken.append(disc_id + 1)
+        self._taken_total += disc_id + 1
 
     def make_gone(self, disc_id: DiscId):
         if self.discs[disc_id] != DiscState.Vulnerable:
             raise DiscStateException(f"cannot take {self.discs[disc_id]}")
         self.discs[disc_id] = DiscState.Gone
+        self._gone_count += 1
+
+    def restore_disc(self, disc_id: DiscId, disc_state: DiscState):
+        """Set a disc back to a previous state, without checking the move is legal, to undo a change."""
+        old_state = self.discs[disc_id]
+        self.discs[disc_id] = disc_state
+        self._safe_total += (disc_id + 1) * ((disc_state == DiscState.Safe) - (old_state == DiscState.Safe))
+        self._gone_count += (disc_state == DiscState.Gone) - (old_state == DiscState.Gone)
+
+    def untake(self):
+        """Give back the last disc taken, to undo `take`."""
+        self._taken_total -= self.taken.pop()
 
     def possible_new_state(self, disc_id: DiscId, is_own_turn: bool) -> Optional[DiscState]:
-        if is_own_turn:
-            if self.discs[disc_id] == DiscState.Vulnerable:
-                return DiscState.Safe
-        else:
-            if self.discs[disc_id] == DiscState.Safe:
-                return DiscState.Vulnerable
-            if self.discs[disc_id] == DiscState.Vulnerable:
-                return DiscState.Gone
-        return None
+        return possible_new_state(self.discs[disc_id], is_own_turn)
@@ -244,3 +244,49 @@ class TestPlayer:
         new_state = player.possible_new_state(disk_id, is_own_turn)
 
         assert new_state == expected_state
+
+    def test_running_totals_follow_changes(self):
+        player = Player(0, init_disks={2: DiscState.Safe, 3: DiscState.Safe})
+
+        player.make_safe(0)
+        player.make_vulnerable(2)
+        player.take(4)
+        for disc_id in range(6):
+            if player.discs[disc_id] == DiscState.Vulnerable:
+                player.make_gone(disc_id)
+
+        player.verify_totals()
+        assert player.round_score == 1 + 4 + 5
+        assert not player.is_over()
+
+    def test_verify_totals_detects_direct_changes(self):
+        player = Player(0)
+
+        player.discs[0] = DiscState.Safe
+
+        with pytest.raises(DiscStateException):
+            player.round_score
+
+    def test_clone_is_independent(self):
+        player = Player(0, init_taken=[2], init_score=5, init_disks={1: DiscState.Safe})
+
+        clone = player.clone()
+        clone.make_vulnerable(1)
+        clone.take(3)
+
+        assert clone != player
+        assert player.discs[1] == DiscState.Safe
+        assert player.taken == [2]
+        assert player.round_score == 4
+
+    def test_undo_helpers_keep_totals(self):
+        player = Player(0, init_disks={2: DiscState.Safe})
+
+        player.take(4)
+        player.make_gone(0)
+        player.make_vulnerable(2)
+        player.untake()
+        player.restore_disc(0, DiscState.Vulnerable)
+        player.restore_disc(2, DiscState.Safe)
+
+        assert player == Player(0, init_disks={2: DiscState.Safe})
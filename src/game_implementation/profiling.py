@@ -0,0 +1,127 @@
+import json
+import time
+from typing import Any, Collection, Dict, Iterator, List, Optional
+
+from game_implementation.action import Action, ActionCounter, count_actions
+from game_implementation.game import Game, PhaseTimer
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.types import DiscId, PlayerId
+
+PHASES = ("play", "take_turn", "choose_actions", "possible_actions", "play_action", "end_round")
+"""Timed phases, outermost first; the time of a phase includes the phases it calls"""
+
+
+class PhaseStats:
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "seconds": self.seconds}
+
+
+class ProfiledStrategy(Strategy):
+    """Strategy timing the wrapped strategy's choices, excluding the time the game takes to play them."""
+
+    def __init__(self, strategy: Strategy, stats: PhaseStats):
+        self.strategy = strategy
+        self.stats = stats
+
+    def choose_actions(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> Iterator[Action]:
+        start = time.perf_counter()
+        actions = iter(self.strategy.choose_actions(game, player_id, dice))
+        elapsed = time.perf_counter() - start
+        while True:
+            start = time.perf_counter()
+            try:
+                action = next(actions, None)
+            finally:
+                elapsed += time.perf_counter() - start
+            if action is None:
+                break
+            yield action
+        self.stats.calls += 1
+        self.stats.seconds += elapsed
+
+
+class Profiler(PhaseTimer):
+    """
+    Timers and counters for the phases of games, for finding where time goes and catching regressions.
+
+    Games are profiled by timing their phases (see `instrument` and `Game.time_phases`), and strategies by wrapping
+    them (see `wrap_strategies`), so nothing is timed, and nothing costs anything, unless asked for. Actions are
+    counted while the profiler is active as a context manager (see `action.count_actions`).
+
+    Phase times are inclusive and include the profiler's own overhead of a few hundred nanoseconds per call, which
+    matters most for `possible_actions`.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, PhaseStats] = {phase: PhaseStats() for phase in PHASES}
+        self.seconds = 0.0
+        """Wall time while active"""
+        self._started: Optional[float] = None
+        self._actions = ActionCounter()
+        self._previous_actions: Optional[ActionCounter] = None
+
+    @property
+    def actions_created(self) -> int:
+        return self._actions.created
+
+    def phase_ended(self, phase: str, seconds: float) -> None:
+        stats = self.phases[phase]
+        stats.calls += 1
+        stats.seconds += seconds
+
+    def instrument(self, game: Game) -> Game:
+        """Profile a game from now on; clones of it are not profiled."""
+        game.time_phases(self)
+        return game
+
+    def wrap_strategies(self, strategies: List[Strategy]) -> List[Strategy]:
+        stats = self.phases["choose_actions"]
+        return [ProfiledStrategy(strategy, stats) for strategy in strategies]
+
+    def __enter__(self) -> "Profiler":
+        self._previous_actions = count_actions(self._actions)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.seconds += time.perf_counter() - self._started
+        count_actions(self._previous_actions)
+
+    @property
+    def games(self) -> int:
+        return self.phases["play"].calls
+
+    @property
+    def turns(self) -> int:
+        return self.phases["take_turn"].calls
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "seconds": self.seconds,
+            "games": self.games,
+            "turns": self.turns,
+            "games_per_second": self.games / self.seconds if self.seconds else 0.0,
+            "turns_per_second": self.turns / self.seconds if self.seconds else 0.0,
+            "actions_created": self.actions_created,
+            "phases": {phase: stats.as_dict() for phase, stats in self.phases.items()},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), indent=2)
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.games} games, {self.turns} turns in {self.seconds:.2f}s: "
+            f"{self.as_dict()['games_per_second']:.1f} games/s, {self.as_dict()['turns_per_second']:.0f} turns/s, "
+            f"{self.actions_created} actions created",
+            f"{'phase':<18}{'calls':>12}{'total s':>10}{'mean us':>10}{'% wall':>8}",
+        ]
+        for phase, stats in self.phases.items():
+            mean = stats.seconds / stats.calls * 1e6 if stats.calls else 0.0
+            share = stats.seconds / self.seconds * 100 if self.seconds else 0.0
+            lines.append(f"{phase:<18}{stats.calls:>12}{stats.seconds:>10.3f}{mean:>10.2f}{share:>8.1f}")
+        return "\n".join(lines)
@@ -0,0 +1,78 @@
+import json
+
+from game_implementation.action import Action
+from game_implementation.disc_state import DiscState
+from game_implementation.game import Game
+from game_implementation.game_runner import run_games
+from game_implementation.profiling import PHASES, Profiler
+from game_implementation.strategy import RandomStrategy, TALLEST_DAISY_PREFERENCE, TallestDaisyStrategy
+
+
+def make_strategies():
+    return [
+        RandomStrategy(),
+        TallestDaisyStrategy(TALLEST_DAISY_PREFERENCE),
+        RandomStrategy(),
+    ]
+
+
+class TestProfiler:
+    def test_profiled_games_play_the_same(self):
+        profiler = Profiler()
+        with profiler:
+            profiled = run_games(make_strategies(), 10, seed=3, profiler=profiler)
+
+        assert profiled == run_games(make_strategies(), 10, seed=3)
+
+    def test_counts(self):
+        profiler = Profiler()
+        with profiler:
+            run_games(make_strategies(), 5, seed=1, profiler=profiler)
+
+        assert profiler.games == 5
+        assert profiler.phases["end_round"].calls == 5 * 3
+        assert profiler.phases["choose_actions"].calls == profiler.turns > 0
+        assert profiler.phases["possible_actions"].calls > profiler.turns
+        # at least one die of the initial defence per player and game
+        assert profiler.actions_created >= 5 * 3
+        assert profiler.phases["play"].seconds <= profiler.seconds
+        assert profiler.phases["take_turn"].seconds <= profiler.phases["play"].seconds
+
+    def test_actions_only_counted_while_active(self):
+        profiler = Profiler()
+        with profiler:
+            Action(0, 1, DiscState.Safe)
+        Action(0, 1, DiscState.Safe)
+
+        assert profiler.actions_created == 1
+        assert Action(0, 1, DiscState.Safe) == (0, 1, DiscState.Safe)
+
+    def test_clones_are_not_profiled(self):
+        profiler = Profiler()
+        game = profiler.instrument(Game())
+
+        game.possible_actions(0, 0)
+        game.clone().possible_actions(0, 0)
+        assert profiler.phases["possible_actions"].calls == 1
+
+    def test_stop_timing(self):
+        profiler = Profiler()
+        game = profiler.instrument(Game())
+        game.time_phases(None)
+
+        game.possible_actions(0, 0)
+        assert profiler.phases["possible_actions"].calls == 0
+        assert "possible_actions" not in vars(game)
+
+    def test_reports(self):
+        profiler = Profiler()
+        with profiler:
+            run_games(make_strategies(), 2, seed=1, profiler=profiler)
+
+        report = json.loads(profiler.to_json())
+        assert report["games"] == 2
+        assert [*report["phases"]] == [*PHASES]
+        assert report["turns_per_second"] > 0
+        summary = profiler.summary().splitlines()
+        assert len(summary) == 2 + len(PHASES)
+        assert summary[0].startswith("2 games")
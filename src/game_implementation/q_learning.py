@@ -0,0 +1,285 @@
+"""
+Q-learning of a strategy by self-play, with the value table shared by worker processes.
+
+Decisions are the same as in `rl_env`: one die at a time, choosing the target player. As the effect of an action is
+known, the value of an action is the value of the position it leads to, an afterstate, so actions leading to
+equivalent positions share what is learnt about them. Positions are abstracted, from the deciding player's point of
+view, to disc state counts, the lead in banked score (earlier rounds and taken discs), the round and the dice left to
+play; abstractions keeping more of the state, such as every player's disc states, are seen too rarely to learn from
+in millions of games. The table is hashed: a key is hashed to one of 2**bits values, so memory is fixed whatever the
+number of positions seen, at the cost of occasional collisions.
+
+With several workers, every worker plays its own games and updates the one table in shared memory without locks, as
+in Hogwild (Recht et al., 2011): updates are rare enough to collide that a lost update costs less than a lock would.
+Training with workers is therefore not reproducible; with a single worker it is, given the seed.
+"""
+import random
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from multiprocessing import RawArray
+from typing import Callable, Collection, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from game_implementation.action import Action
+from game_implementation.disc_state import DiscState
+from game_implementation.game import Game
+from game_implementation.game_runner import derive_seed
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.tournament import batches
+from game_implementation.types import DiscId, PlayerCount, PlayerId
+
+LEAD_BUCKET = 3
+"""Leads in banked score are grouped in buckets of this size"""
+MAX_LEAD_BUCKET = 8
+
+
+class QTable:
+    """
+    Hashed table of action values and their visit counts, over any buffers, so it can live in shared memory.
+
+    Args:
+        values: float32 action values
+        visits: uint32 number of updates of each value, of the same length
+    """
+
+    def __init__(self, values: np.ndarray, visits: np.ndarray):
+        if len(values) & (len(values) - 1):
+            raise ValueError(f"Table size must be a power of two, not {len(values)}")
+        if len(visits) != len(values):
+            raise ValueError("Values and visits must be the same length")
+        self.values = values
+        self.visits = visits
+        self.mask = len(values) - 1
+
+    @classmethod
+    def zeros(cls, bits: int = 20) -> "QTable":
+        return cls(np.zeros(1 << bits, dtype=np.float32), np.zeros(1 << bits, dtype=np.uint32))
+
+    @property
+    def bits(self) -> int:
+        return self.mask.bit_length()
+
+    def index(self, game: Game, player_id: PlayerId, dice_left: int) -> int:
+        """
+        Table index of a position, from a player's point of view: the round, the dice they have left to play, and
+        their lead in banked score (scores of earlier rounds and discs taken) over the best opponent, bucketed, and
+        their gone and safe discs, and the most of each of an opponent.
+        """
+        me = game.players[player_id]
+        opponents = [player for player in game.players if player is not me]
+        lead = (me.score + sum(me.taken) - max(player.score + sum(player.taken) for player in opponents)) // LEAD_BUCKET
+        key = (
+            game.round,
+            dice_left,
+            max(-MAX_LEAD_BUCKET, min(MAX_LEAD_BUCKET, lead)),
+            me.discs.count(DiscState.Gone),
+            me.discs.count(DiscState.Safe),
+            max(player.discs.count(DiscState.Gone) for player in opponents),
+            max(player.discs.count(DiscState.Safe) for player in opponents),
+        )
+        return hash(key) & self.mask
+
+    def action_indices(self, game: Game, player_id: PlayerId, actions: Sequence[Action], dice_left: int) -> List[int]:
+        """Table index of the position after each action, see `index`."""
+        indices = []
+        for action in actions:
+            game.push()
+            game.play_action(player_id, action)
+            indices.append(self.index(game, player_id, dice_left))
+            game.pop()
+        return indices
+
+    def save(self, path: str) -> None:
+        """Save to a NumPy .npz file."""
+        np.savez_compressed(path, values=self.values, visits=self.visits)
+
+    @classmethod
+    def load(cls, path: str) -> "QTable":
+        with np.load(path) as arrays:
+            return cls(arrays["values"], arrays["visits"])
+
+
+class QTableStrategy(Strategy):
+    """Play the action leading to the position of highest value in a table, for each die in the order rolled."""
+
+    def __init__(self, table: QTable):
+        self.table = table
+
+    def choose_actions(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> Iterator[Action]:
+        dice = [*dice]
+        values = self.table.values
+        for index, die in enumerate(dice):
+            actions = game.possible_actions(player_id, die)
+            if len(actions) == 1:
+                yield actions[0]
+            elif actions:
+                indices = self.table.action_indices(game, player_id, actions, len(dice) - index - 1)
+                yield actions[max(range(len(actions)), key=lambda action_index: values[indices[action_index]])]
+
+
+class QLearner(Strategy):
+    """
+    Epsilon greedy strategy for every seat of self-play games, updating the table by Q(lambda) as it plays.
+
+    Each player's decisions are a trajectory of their own. At the end of a game, the value of every position a player
+    chose is updated towards its lambda return: the final share of the win, mixed at each earlier decision with the
+    value of the player's best choice at their next decision. Lambda 0 is one step Q-learning, which takes many games
+    to carry the reward back to the start of a game; lambda 1 is Monte Carlo. Forced moves are not decisions.
+    Call `game_over` after every game.
+    """
+
+    def __init__(self, table: QTable, alpha: float = 0.01, epsilon: float = 0.1, trace: float = 0.8):
+        self.table = table
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.trace = trace
+        self.decisions = 0
+        self._trajectories: Dict[PlayerId, List[list]] = {}
+        """Per player, the table index of each position they chose, and the value of their best choice next time"""
+
+    def _update(self, index: int, target: float) -> None:
+        """Move a value towards a target by the mean of its visits, until that is less than `alpha`."""
+        values, visits = self.table.values, self.table.visits
+        visits[index] += 1
+        values[index] += max(self.alpha, 1 / visits[index]) * (target - values[index])
+
+    def choose_actions(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> Iterator[Action]:
+        dice = [*dice]
+        values = self.table.values
+        trajectory = self._trajectories.setdefault(player_id, [])
+        for index, die in enumerate(dice):
+            actions = game.possible_actions(player_id, die)
+            if len(actions) == 1:
+                yield actions[0]
+            elif actions:
+                indices = self.table.action_indices(game, player_id, actions, len(dice) - index - 1)
+                action_values = [float(values[action_index]) for action_index in indices]
+                best = max(action_values)
+                if trajectory:
+                    trajectory[-1][1] = best
+
+                if random.random() < self.epsilon:
+                    choice = random.randrange(len(actions))
+                else:
+                    choice = random.choice([i for i, value in enumerate(action_values) if value == best])
+                trajectory.append([indices[choice], 0.0])
+                self.decisions += 1
+                yield actions[choice]
+
+    def game_over(self, winners: Collection[PlayerId]) -> None:
+        """Update the choices of every player towards their lambda returns."""
+        trace = self.trace
+        for player_id, trajectory in self._trajectories.items():
+            if not trajectory:
+                continue
+            target = 1 / len(winners) if player_id in winners else 0.0
+            self._update(trajectory[-1][0], target)
+            for index, next_best in reversed(trajectory[:-1]):
+                target = (1 - trace) * next_best + trace * target
+                self._update(index, target)
+        self._trajectories = {}
+
+
+def train_games(
+    table: QTable,
+    player_count: PlayerCount,
+    seed: int,
+    first_game: int,
+    last_game: int,
+    alpha: float = 0.01,
+    epsilon: float = 0.1,
+    trace: float = 0.8,
+) -> int:
+    """
+    Play self-play games [first_game, last_game) of a training run, updating the table. Each game is seeded from
+    the seed and its index, as in `game_runner.play_game`.
+
+    Returns:
+        number of decisions updated
+    """
+    learner = QLearner(table, alpha, epsilon, trace)
+    strategies = [learner] * player_count
+    for game_index in range(first_game, last_game):
+        random.seed(derive_seed(seed, game_index))
+        learner.game_over(Game(player_count, start_player=game_index % player_count).play(strategies))
+    return learner.decisions
+
+
+_worker_table: Optional[QTable] = None
+
+
+def _shared_table(shared_values, shared_visits) -> QTable:
+    return QTable(np.frombuffer(shared_values, dtype=np.float32), np.frombuffer(shared_visits, dtype=np.uint32))
+
+
+def _attach(shared_values, shared_visits) -> None:
+    global _worker_table
+    _worker_table = _shared_table(shared_values, shared_visits)
+
+
+def _train_batch(
+    player_count: PlayerCount, seed: int, first_game: int, last_game: int, alpha: float, epsilon: float, trace: float
+) -> Tuple[int, int]:
+    decisions = train_games(_worker_table, player_count, seed, first_game, last_game, alpha, epsilon, trace)
+    return last_game - first_game, decisions
+
+
+def train(
+    games: int,
+    player_count: PlayerCount = 3,
+    table: Optional[QTable] = None,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    batch_size: int = 500,
+    alpha: float = 0.01,
+    epsilon: float = 0.1,
+    trace: float = 0.8,
+    on_batch: Optional[Callable[[int, int], None]] = None,
+) -> QTable:
+    """
+    Train a table by self-play.
+
+    Args:
+        games: number of games to play
+        player_count: players in each game
+        table: table to go on training; a new table of 2**20 values by default, which is plenty
+        seed: master seed, chosen at random if not given
+        workers: number of processes, all updating the table in shared memory; 1 trains in this process
+        batch_size: games sent to a worker at a time
+        alpha: smallest learning rate; values are means of their targets until they have 1/alpha visits
+        epsilon: chance of exploring a random action at each decision
+        trace: lambda of the returns values are updated towards, see `QLearner`
+        on_batch: called with the games and decisions played so far as each batch finishes, for progress
+
+    Returns:
+        the trained table; a copy of `table` if there were several workers
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 63)
+    table = table if table is not None else QTable.zeros()
+    games_played = decisions = 0
+
+    if workers == 1:
+        for first_game, last_game in batches(games, batch_size):
+            decisions += train_games(table, player_count, seed, first_game, last_game, alpha, epsilon, trace)
+            games_played += last_game - first_game
+            if on_batch is not None:
+                on_batch(games_played, decisions)
+        return table
+
+    shared_arrays = (RawArray("f", len(table.values)), RawArray("I", len(table.values)))
+    shared = _shared_table(*shared_arrays)
+    shared.values[:] = table.values
+    shared.visits[:] = table.visits
+    with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=shared_arrays) as executor:
+        futures = [
+            executor.submit(_train_batch, player_count, seed, first_game, last_game, alpha, epsilon, trace)
+            for first_game, last_game in batches(games, batch_size)
+        ]
+        for future in as_completed(futures):
+            batch_games, batch_decisions = future.result()
+            games_played += batch_games
+            decisions += batch_decisions
+            if on_batch is not None:
+                on_batch(games_played, decisions)
+    return QTable(shared.values.copy(), shared.visits.copy())
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from game_implementation.compact_state import CompactState
+from game_implementation.disc_state import DiscState
+from game_implementation.game import Game
+from game_implementation.player import Player
+from game_implementation.q_learning import QLearner, QTable, QTableStrategy, train, train_games
+from game_implementation.strategy import RandomStrategy
+
+
+class TestQLearning:
+    def test_table_size(self):
+        with pytest.raises(ValueError):
+            QTable(np.zeros(1000, dtype=np.float32), np.zeros(1000, dtype=np.uint32))
+        assert QTable.zeros(bits=10).bits == 10
+
+    def test_action_indices(self):
+        game = Game(3, player_init=[Player(1, init_disks={2: DiscState.Safe})])
+        before = CompactState.from_game(game)
+        table = QTable.zeros(bits=16)
+        actions = game.possible_actions(0, 2)
+
+        indices = table.action_indices(game, 0, actions, 2)
+
+        assert CompactState.from_game(game) == before
+        # making a disc safe, making player 1's vulnerable and taking player 2's lead to different positions
+        assert [action.new_state for action in actions] == [DiscState.Safe, DiscState.Vulnerable, DiscState.Gone]
+        assert len(set(indices)) == 3
+        assert all(0 <= index < 1 << 16 for index in indices)
+
+    def test_training_is_reproducible(self):
+        first = QTable.zeros(bits=16)
+        second = QTable.zeros(bits=16)
+        decisions = train_games(first, 3, 7, 0, 10)
+        train_games(second, 3, 7, 0, 10)
+
+        assert decisions > 0
+        assert np.array_equal(first.values, second.values)
+        assert first.visits.sum() == decisions
+
+    def test_monte_carlo_values_are_win_shares(self):
+        table = QTable.zeros(bits=16)
+        learner = QLearner(table, epsilon=1.0, trace=1.0)
+        winners = Game(3).play([learner] * 3)
+        learner.game_over(winners)
+
+        visited = table.visits > 0
+        assert visited.any()
+        assert ((table.values[visited] >= 0) & (table.values[visited] <= 1)).all()
+
+    def test_train_in_batches(self):
+        progress = []
+        table = train(
+            12, table=QTable.zeros(bits=16), seed=3, batch_size=5, on_batch=lambda *args: progress.append(args)
+        )
+
+        assert [games for games, _ in progress] == [5, 10, 12]
+        assert progress[-1][1] == table.visits.sum()
+
+    def test_train_with_workers(self):
+        progress = []
+        table = train(
+            8,
+            table=QTable.zeros(bits=16),
+            seed=3,
+            workers=2,
+            batch_size=4,
+            on_batch=lambda *args: progress.append(args),
+        )
+
+        assert sorted(games for games, _ in progress) == [4, 8]
+        assert table.visits.sum() > 0
+
+    def test_save_and_load(self, tmp_path):
+        table = QTable.zeros(bits=12)
+        train_games(table, 3, 1, 0, 3)
+        path = str(tmp_path / "table.npz")
+        table.save(path)
+
+        loaded = QTable.load(path)
+        assert np.array_equal(loaded.values, table.values)
+        assert np.array_equal(loaded.visits, table.visits)
+
+    def test_strategy_plays_legal_games(self):
+        table = QTable.zeros(bits=16)
+        train_games(table, 3, 2, 0, 5)
+
+        winners = Game(3).play([QTableStrategy(table), RandomStrategy(), RandomStrategy()])
+        assert winners
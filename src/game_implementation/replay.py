@@ -0,0 +1,128 @@
+from typing import Dict, Sequence, Union
+
+import numpy as np
+
+from game_implementation.compact_state import CompactState
+from game_implementation.disc_state import DiscState
+from game_implementation.exceptions import DiscStateException, IllegalMoveException, ReplayDivergenceException
+from game_implementation.game import Game
+from game_implementation.game_events import GameEventSink, NULL_EVENT_SINK
+from game_implementation.trajectories import decode_game, GameTrajectory, Turn
+
+
+class GameReplay:
+    """
+    Re-execute a recorded game through the rules engine, without strategies.
+
+    Turns are applied with `Game.replay_turn` and rounds ended with `Game.end_round`, raising events as `Game.play`
+    does, so a replay can feed any event sink. The state is checkpointed every `checkpoint_interval` turns as the
+    replay passes, so `seek` only replays the turns since the nearest checkpoint. Any disagreement between the
+    record and the rules raises ReplayDivergenceException.
+    """
+
+    def __init__(
+        self,
+        trajectory: Union[GameTrajectory, Sequence[int], np.ndarray],
+        checkpoint_interval: int = 16,
+        events: GameEventSink = NULL_EVENT_SINK,
+    ):
+        """
+        Args:
+            trajectory: decoded game, or a game record (see `trajectories`)
+            checkpoint_interval: turns between checkpoints
+            events: sink for the events of the replayed game
+        """
+        self.trajectory = trajectory if isinstance(trajectory, GameTrajectory) else decode_game(trajectory)
+        self.checkpoint_interval = checkpoint_interval
+        self.events = events
+        self.game = Game(self.trajectory.player_count, start_player=self.trajectory.start_player, events=events)
+        self.position = 0
+        """Number of turns replayed, counting the initial defence of each player as a turn"""
+        self.checkpoints: Dict[int, CompactState] = {0: CompactState.from_game(self.game)}
+        events.game_started(self.game)
+
+    def __len__(self) -> int:
+        return len(self.trajectory.turns)
+
+    def is_over(self) -> bool:
+        return self.position == len(self.trajectory.turns)
+
+    def step(self) -> None:
+        """Replay the next turn, and the end of the round if it ends."""
+        if self.is_over():
+            raise IndexError("No more turns to replay")
+        turn = self.trajectory.turns[self.position]
+        try:
+            if self.position < self.game.player_count:
+                self._replay_initial_defence(turn)
+            else:
+                self._replay_turn(turn)
+        except (IllegalMoveException, DiscStateException) as error:
+            raise ReplayDivergenceException(f"Turn {self.position}: {error}") from error
+        self.position += 1
+        if self.position % self.checkpoint_interval == 0:
+            self.checkpoints[self.position] = CompactState.from_game(self.game)
+        if self.is_over():
+            self._check_game_over()
+
+    def run(self) -> Game:
+        """Replay to the end of the game."""
+        while not self.is_over():
+            self.step()
+        return self.game
+
+    def seek(self, position: int) -> Game:
+        """
+        Move to the state after `position` turns, from the nearest checkpoint at or before it.
+
+        The game is replaced, except when moving forwards from before the checkpoint, and taken discs come back
+        sorted by score (see `CompactState`). Events are only raised for the turns replayed.
+        """
+        if not 0 <= position <= len(self.trajectory.turns):
+            raise IndexError(f"Position {position} out of range 0..{len(self.trajectory.turns)}")
+        checkpoint = max(checkpoint for checkpoint in self.checkpoints if checkpoint <= position)
+        if not checkpoint <= self.position <= position:
+            self.game = self.checkpoints[checkpoint].to_game(self.events)
+            self.position = checkpoint
+        while self.position < position:
+            self.step()
+        return self.game
+
+    def _replay_initial_defence(self, turn: Turn) -> None:
+        game = self.game
+        dice = {*turn.dice}
+        if turn.player_id != self.position:
+            raise ReplayDivergenceException(f"Turn {self.position}: initial defence of player {turn.player_id}")
+        if sorted((action.target_id, action.disc_id, action.new_state) for action in turn.actions) != [
+            (turn.player_id, disc_id, DiscState.Safe) for disc_id in sorted(dice)
+        ]:
+            raise IllegalMoveException(f"Initial defence {turn.actions} does not match dice {sorted(dice)}")
+        game.events.dice_rolled(game, turn.player_id, dice)
+        for action in turn.actions:
+            game.play_action(turn.player_id, action)
+
+    def _replay_turn(self, turn: Turn) -> None:
+        game = self.game
+        if game.round == game.player_count:
+            raise ReplayDivergenceException(f"Turn {self.position}: recorded after the end of the game")
+        if turn.player_id != game.player_id:
+            raise ReplayDivergenceException(f"Turn {self.position}: player {turn.player_id}, not {game.player_id}")
+        game.events.turn_started(game, game.player_id)
+        round_over = game.replay_turn(turn.player_id, turn.dice, turn.actions)
+        game.player_id = (game.player_id + 1) % game.player_count
+        if round_over:
+            recorded_winners = self.trajectory.round_winners
+            if game.round < len(recorded_winners) and recorded_winners[game.round] != game.player_id:
+                raise ReplayDivergenceException(
+                    f"Turn {self.position}: round won by {game.player_id}, recorded {recorded_winners[game.round]}"
+                )
+            game.end_round(game.player_id)
+
+    def _check_game_over(self) -> None:
+        game = self.game
+        if game.round != game.player_count:
+            raise ReplayDivergenceException(f"Record ends in round {game.round} of {game.player_count}")
+        winners = game.winners()
+        if self.trajectory.winners and [*winners] != self.trajectory.winners:
+            raise ReplayDivergenceException(f"Game won by {winners}, recorded {self.trajectory.winners}")
+        self.events.game_ended(game, winners)
@@ -0,0 +1,130 @@
+import random
+
+import pytest
+
+from game_implementation.action import Action
+from game_implementation.compact_state import CompactState
+from game_implementation.disc_state import DiscState
+from game_implementation.exceptions import ReplayDivergenceException
+from game_implementation.game import Game
+from game_implementation.replay import GameReplay
+from game_implementation.strategy import RandomStrategy
+from game_implementation.trajectories import decode_game, encode_action, ROLL, ROUND_END, TrajectoryRecorder
+
+
+class ListWriter:
+    def __init__(self):
+        self.records = []
+
+    def write_game(self, record):
+        self.records.append(record)
+
+
+def record_game(player_count=3, start_player=0, seed=0):
+    random.seed(seed)
+    writer = ListWriter()
+    game = Game(player_count, start_player=start_player, events=TrajectoryRecorder(writer))
+    game.play([RandomStrategy()] * player_count)
+    return writer.records[0], game
+
+
+class StateSink(TrajectoryRecorder):
+    """Record the game, and the state after every turn."""
+
+    def __init__(self):
+        super().__init__(ListWriter())
+        self.states = []
+
+    def dice_rolled(self, game, player_id, dice):
+        if len(self._record) > 2:
+            self.states.append(CompactState.from_game(game))
+        super().dice_rolled(game, player_id, dice)
+
+
+class TestGameReplay:
+    @pytest.mark.parametrize("player_count", [2, 3, 4])
+    def test_replay_reproduces_record(self, player_count):
+        record, played = record_game(player_count, start_player=player_count - 1, seed=player_count)
+        writer = ListWriter()
+        replay = GameReplay(record, events=TrajectoryRecorder(writer))
+        game = replay.run()
+        assert writer.records == [record]
+        assert [player.score for player in game.players] == [player.score for player in played.players]
+        assert game.winners() == played.winners()
+
+    def test_seek(self):
+        record, _ = record_game(seed=1)
+        sink = StateSink()
+        replay = GameReplay(record, events=sink)
+        replay.run()
+        states = [*sink.states]
+        # states are captured at each roll, so there is none after the last turn
+        positions = range(1, len(replay))
+
+        replay = GameReplay(record, checkpoint_interval=4)
+        for position in [*positions[::3], *reversed(positions)]:
+            game = replay.seek(position)
+            assert replay.position == position
+            assert CompactState.from_game(game) == states[position - 1]
+        assert set(replay.checkpoints) == set(range(0, len(replay), 4))
+
+    def test_seek_out_of_range(self):
+        record, _ = record_game()
+        replay = GameReplay(record)
+        with pytest.raises(IndexError):
+            replay.seek(len(replay) + 1)
+
+    def test_step_past_end(self):
+        record, _ = record_game()
+        replay = GameReplay(record)
+        replay.run()
+        with pytest.raises(IndexError):
+            replay.step()
+
+    def test_illegal_action_diverges(self):
+        record, _ = record_game(seed=2)
+        trajectory = decode_game(record)
+        turns = trajectory.turns[trajectory.player_count:]
+        turn = next(turn for turn in turns if turn.actions)
+        action = turn.actions[0]
+        # making one's own disc gone is never legal
+        turn.actions[0] = Action(turn.player_id, action.disc_id, DiscState.Gone)
+        with pytest.raises(ReplayDivergenceException):
+            GameReplay(trajectory).run()
+
+    def test_corrupt_initial_defence_diverges(self):
+        record, _ = record_game()
+        record = bytearray(record)
+        # first action of the first initial defence, after its roll: make it an opponent's disc
+        action = record[4]
+        record[4] = encode_action(Action(1, (action >> 2) & 7, DiscState.Safe))
+        with pytest.raises(ReplayDivergenceException):
+            GameReplay(record).run()
+
+    def test_wrong_round_winner_diverges(self):
+        record, _ = record_game()
+        record = bytearray(record)
+        position = record.index(ROUND_END)
+        record[position + 1] = (record[position + 1] + 1) % 3
+        with pytest.raises(ReplayDivergenceException):
+            GameReplay(record).run()
+
+    def test_wrong_player_diverges(self):
+        record, _ = record_game()
+        record = bytearray(record)
+        trajectory = decode_game(record)
+        # the first roll after the initial defence
+        position = 2
+        for _ in range(trajectory.player_count + 1):
+            position = next(index for index in range(position, len(record)) if record[index] >= ROLL) + 2
+        player_id = record[position - 2] - ROLL
+        record[position - 2] = ROLL + (player_id + 1) % 3
+        with pytest.raises(ReplayDivergenceException):
+            GameReplay(record).run()
+
+    def test_truncated_record_diverges(self):
+        record, _ = record_game()
+        trajectory = decode_game(record)
+        del trajectory.turns[-1]
+        with pytest.raises(ReplayDivergenceException):
+            GameReplay(trajectory).run()
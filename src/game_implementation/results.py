@@ -0,0 +1,430 @@
+"""
+Streaming results of a series of games.
+
+Games are played one at a time into `GameRecord`s, which are fed to online aggregators and optionally appended to a
+CSV file, so a series of any length runs in constant memory and can be monitored as it goes. Every game is seeded
+from the master seed and its index (see `game_runner.play_game`), so a series interrupted part way through is resumed
+from its CSV file with the same results as if it had run uninterrupted.
+"""
+import bisect
+import csv
+import math
+import os
+from collections import Counter
+from typing import (
+    Callable,
+    Collection,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+from game_implementation.game import Game
+from game_implementation.game_events import GameEventSink, MultiEventSink, NULL_EVENT_SINK
+from game_implementation.game_runner import play_game
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.types import PlayerId
+
+if TYPE_CHECKING:
+    from game_implementation.profiling import Profiler
+
+
+class GameRecord(NamedTuple):
+    game_index: int
+    seed: Optional[int]
+    start_player: PlayerId
+    winners: Tuple[PlayerId, ...]
+    scores: Tuple[int, ...]
+    """Final score of each player"""
+    turns_per_round: Tuple[int, ...]
+
+    @property
+    def rounds(self) -> int:
+        return len(self.turns_per_round)
+
+
+class RecordingSink(GameEventSink):
+    """Collect the figures of a game's record as it is played."""
+
+    def __init__(self):
+        self.turns_per_round: List[int] = []
+        self.turns = 0
+        self.scores: Tuple[int, ...] = ()
+
+    def game_started(self, game: Game) -> None:
+        self.turns_per_round = []
+        self.turns = 0
+
+    def turn_started(self, game: Game, player_id: PlayerId) -> None:
+        self.turns += 1
+
+    def round_ended(self, game: Game, round_winner_id: PlayerId, round_scores: Sequence[int]) -> None:
+        self.turns_per_round.append(self.turns)
+        self.turns = 0
+
+    def game_ended(self, game: Game, winners: Collection[PlayerId]) -> None:
+        self.scores = tuple(player.score for player in game.players)
+
+
+def play_records(
+    strategies: Sequence[Strategy],
+    first_game: int,
+    last_game: int,
+    seed: Optional[int] = None,
+    events: GameEventSink = NULL_EVENT_SINK,
+    profiler: Optional["Profiler"] = None,
+) -> Iterator[GameRecord]:
+    """Play games [first_game, last_game) of a series, yielding the record of each as it ends."""
+    recorder = RecordingSink()
+    sink = MultiEventSink(recorder, events)
+    for game_index in range(first_game, last_game):
+        winners = play_game(strategies, game_index, seed=seed, events=sink, profiler=profiler)
+        yield GameRecord(
+            game_index,
+            seed,
+            game_index % len(strategies),
+            tuple(sorted(winners)),
+            recorder.scores,
+            tuple(recorder.turns_per_round),
+        )
+
+
+class Aggregator(Protocol):
+    def add(self, record: GameRecord) -> None:
+        pass
+
+    def summary(self) -> str:
+        pass
+
+
+Values = Callable[[GameRecord], Iterable[float]]
+"""The values an aggregator takes from each record"""
+
+
+def rounds(record: GameRecord) -> Iterable[float]:
+    return (record.rounds,)
+
+
+def turns_per_round(record: GameRecord) -> Iterable[float]:
+    return record.turns_per_round
+
+
+def scores(record: GameRecord) -> Iterable[float]:
+    return record.scores
+
+
+def winning_score(record: GameRecord) -> Iterable[float]:
+    return (max(record.scores),)
+
+
+class WinCounts(Aggregator):
+    """Games won (or tied) by each player, as `run_games` has always reported."""
+
+    def __init__(self, player_count: int):
+        self.counts = [0] * player_count
+
+    def add(self, record: GameRecord) -> None:
+        for winner in record.winners:
+            self.counts[winner] += 1
+
+    def summary(self) -> str:
+        return f"Winner counts {self.counts}"
+
+
+class RunningMean(Aggregator):
+    """Mean and standard deviation, by Welford's method."""
+
+    def __init__(self, name: str, values: Values):
+        self.name = name
+        self.values = values
+        self.count = 0
+        self.mean = 0.0
+        self._squares = 0.0
+
+    def add(self, record: GameRecord) -> None:
+        for value in self.values(record):
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self._squares += delta * (value - self.mean)
+
+    @property
+    def standard_deviation(self) -> float:
+        return math.sqrt(self._squares / (self.count - 1)) if self.count > 1 else 0.0
+
+    def summary(self) -> str:
+        return f"{self.name}: mean {self.mean:.3f}, sd {self.standard_deviation:.3f} over {self.count}"
+
+
+class Histogram(Aggregator):
+    """Counts of each value; for values with a small range, like rounds or turns."""
+
+    def __init__(self, name: str, values: Values):
+        self.name = name
+        self.values = values
+        self.counts: Counter = Counter()
+
+    def add(self, record: GameRecord) -> None:
+        self.counts.update(self.values(record))
+
+    def summary(self) -> str:
+        return f"{self.name}: " + ", ".join(f"{value}: {count}" for value, count in sorted(self.counts.items()))
+
+
+class P2Quantile:
+    """
+    Online estimate of one quantile in constant memory, by the P² algorithm (Jain and Chlamtac, 1985): five markers
+    track the minimum, the quantile, the maximum and the two halfway quantiles, and are moved by piecewise parabolic
+    interpolation as values arrive.
+    """
+
+    def __init__(self, quantile: float):
+        self.quantile = quantile
+        self.count = 0
+        self.heights: List[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self.increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        heights = self.heights
+        if self.count <= 5:
+            bisect.insort(heights, value)
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+        elif value > heights[4]:
+            heights[4] = value
+        marker = bisect.bisect_right(heights, value, 1, 4)
+        for index in range(marker, 5):
+            self.positions[index] += 1
+        for index in range(5):
+            self.desired[index] += self.increments[index]
+
+        positions = self.positions
+        for index in range(1, 4):
+            offset = self.desired[index] - positions[index]
+            if (offset >= 1 and positions[index + 1] - positions[index] > 1) or (
+                offset <= -1 and positions[index - 1] - positions[index] < -1
+            ):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(index, step)
+                if not heights[index - 1] < height < heights[index + 1]:
+                    height = heights[index] + step * (heights[index + step] - heights[index]) / (
+                        positions[index + step] - positions[index]
+                    )
+                heights[index] = height
+                positions[index] += step
+
+    def _parabolic(self, index: int, step: int) -> float:
+        heights, positions = self.heights, self.positions
+        return heights[index] + step / (positions[index + 1] - positions[index - 1]) * (
+            (positions[index] - positions[index - 1] + step)
+            * (heights[index + 1] - heights[index])
+            / (positions[index + 1] - positions[index])
+            + (positions[index + 1] - positions[index] - step)
+            * (heights[index] - heights[index - 1])
+            / (positions[index] - positions[index - 1])
+        )
+
+    def value(self) -> float:
+        if not self.heights:
+            return math.nan
+        if self.count <= 5:
+            return self.heights[round(self.quantile * (len(self.heights) - 1))]
+        return self.heights[2]
+
+
+class QuantileSketch(Aggregator):
+    """Estimates of several quantiles in constant memory, see `P2Quantile`."""
+
+    def __init__(self, name: str, values: Values, quantiles: Sequence[float] = (0.5, 0.9, 0.99)):
+        self.name = name
+        self.values = values
+        self.estimators = [P2Quantile(quantile) for quantile in quantiles]
+
+    def add(self, record: GameRecord) -> None:
+        for value in self.values(record):
+            for estimator in self.estimators:
+                estimator.add(value)
+
+    def summary(self) -> str:
+        return f"{self.name}: " + ", ".join(
+            f"p{estimator.quantile * 100:g} {estimator.value():.1f}" for estimator in self.estimators
+        )
+
+
+def standard_aggregators(player_count: int) -> List[Aggregator]:
+    return [
+        WinCounts(player_count),
+        RunningMean("score", scores),
+        QuantileSketch("winning score", winning_score),
+        Histogram("rounds", rounds),
+        RunningMean("turns per round", turns_per_round),
+        QuantileSketch("turns per round", turns_per_round),
+    ]
+
+
+CSV_FIELDS = ["game_index", "seed", "start_player", "winners", "scores", "turns_per_round"]
+
+
+def _join(values: Iterable[int]) -> str:
+    return ";".join(str(value) for value in values)
+
+
+def _split(text: str) -> Tuple[int, ...]:
+    return tuple(int(value) for value in text.split(";")) if text else ()
+
+
+class CsvResultSink:
+    """
+    Append game records to a CSV file, writing them in batches.
+
+    A line left incomplete by an interrupted run is removed when the file is reopened, so the file always holds
+    whole records of a prefix of the series.
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: List[GameRecord] = []
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new:
+            _truncate_partial_line(path)
+        self._file = open(path, "a", newline="")
+        self._writer = csv.writer(self._file)
+        if new:
+            self._writer.writerow(CSV_FIELDS)
+            self._file.flush()
+
+    def write(self, record: GameRecord) -> None:
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for record in self._pending:
+            self._writer.writerow(
+                [
+                    record.game_index,
+                    "" if record.seed is None else record.seed,
+                    record.start_player,
+                    _join(record.winners),
+                    _join(record.scores),
+                    _join(record.turns_per_round),
+                ]
+            )
+        self._pending = []
+        self._file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> "CsvResultSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _truncate_partial_line(path: str) -> None:
+    with open(path, "rb+") as file:
+        content_end = file.seek(0, os.SEEK_END)
+        position = content_end
+        while position > 0:
+            step = min(4096, position)
+            file.seek(position - step)
+            block = file.read(step)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != content_end:
+            file.truncate(position)
+
+
+def read_records(path: str) -> Iterator[GameRecord]:
+    """Records from a CSV file written by `CsvResultSink`, ignoring an incomplete last line."""
+    with open(path, newline="") as file:
+        lines = (line for line in file if line.endswith("\n"))
+        for row in csv.DictReader(lines, CSV_FIELDS):
+            if row["game_index"] == "game_index":
+                continue
+            yield GameRecord(
+                int(row["game_index"]),
+                int(row["seed"]) if row["seed"] else None,
+                int(row["start_player"]),
+                _split(row["winners"]),
+                _split(row["scores"]),
+                _split(row["turns_per_round"]),
+            )
+
+
+def _resume(path: str, seed: Optional[int], player_count: int, aggregators: Sequence[Aggregator]) -> int:
+    """Feed the records already in a series' file to aggregators, returning the number of games in it."""
+    first_game = 0
+    if os.path.exists(path):
+        for record in read_records(path):
+            if record.game_index != first_game:
+                raise ValueError(f"{path} has game {record.game_index} where game {first_game} was expected")
+            if record.seed != seed or len(record.scores) != player_count:
+                raise ValueError(f"{path} holds games of another series")
+            for aggregator in aggregators:
+                aggregator.add(record)
+            first_game += 1
+    return first_game
+
+
+def run_stream(
+    strategies: Sequence[Strategy],
+    games: int,
+    seed: Optional[int],
+    aggregators: Sequence[Aggregator] = (),
+    path: Optional[str] = None,
+    batch_size: int = 1000,
+    events: GameEventSink = NULL_EVENT_SINK,
+    on_record: Optional[Callable[[GameRecord], None]] = None,
+) -> int:
+    """
+    Play a series of games into aggregators and, optionally, a CSV file, resuming the series from the file.
+
+    Args:
+        strategies: one per player
+        games: number of games in the series, including any already in the file
+        seed: master seed; needed to resume, and checked against the file's
+        aggregators: fed every record, including those read back from the file
+        path: CSV file to append records to
+        batch_size: records written to the file at a time
+        events: sink for game events of the games played
+        on_record: called with each record played, for monitoring
+
+    Returns:
+        number of games played, not counting those read back from the file
+    """
+    first_game = _resume(path, seed, len(strategies), aggregators) if path is not None else 0
+    if path is not None and seed is None and first_game < games:
+        raise ValueError("Writing results to a file needs a seed, so the series can be resumed")
+
+    sink = CsvResultSink(path, batch_size) if path is not None else None
+    try:
+        for record in play_records(strategies, first_game, max(games, first_game), seed=seed, events=events):
+            for aggregator in aggregators:
+                aggregator.add(record)
+            if sink is not None:
+                sink.write(record)
+            if on_record is not None:
+                on_record(record)
+    finally:
+        if sink is not None:
+            sink.close()
+    return max(0, games - first_game)
@@ -0,0 +1,124 @@
+import random
+import statistics
+
+import pytest
+
+from game_implementation.results import (
+    CsvResultSink,
+    Histogram,
+    P2Quantile,
+    play_records,
+    read_records,
+    rounds,
+    run_stream,
+    RunningMean,
+    scores,
+    standard_aggregators,
+    turns_per_round,
+    WinCounts,
+)
+from game_implementation.strategy import RandomStrategy
+
+
+def make_strategies():
+    return [RandomStrategy(), RandomStrategy(), RandomStrategy()]
+
+
+class TestResults:
+    def test_records(self):
+        records = [*play_records(make_strategies(), 0, 5, seed=1)]
+
+        assert [record.game_index for record in records] == [*range(5)]
+        assert [record.start_player for record in records] == [0, 1, 2, 0, 1]
+        for record in records:
+            assert record.rounds == 3
+            assert all(turns > 0 for turns in record.turns_per_round)
+            assert record.winners == tuple(
+                player_id for player_id, score in enumerate(record.scores) if score == max(record.scores)
+            )
+
+    def test_records_do_not_depend_on_batches(self):
+        whole = [*play_records(make_strategies(), 0, 6, seed=3)]
+        parts = [*play_records(make_strategies(), 0, 2, seed=3), *play_records(make_strategies(), 2, 6, seed=3)]
+
+        assert whole == parts
+
+    def test_aggregators(self):
+        records = [*play_records(make_strategies(), 0, 20, seed=2)]
+        win_counts, mean, histogram = WinCounts(3), RunningMean("turns", turns_per_round), Histogram("rounds", rounds)
+        for record in records:
+            for aggregator in (win_counts, mean, histogram):
+                aggregator.add(record)
+
+        all_turns = [turns for record in records for turns in record.turns_per_round]
+        assert sum(win_counts.counts) == sum(len(record.winners) for record in records)
+        assert mean.mean == pytest.approx(statistics.mean(all_turns))
+        assert mean.standard_deviation == pytest.approx(statistics.stdev(all_turns))
+        assert histogram.counts == {3: 20}
+        assert "mean" in mean.summary()
+
+    @pytest.mark.parametrize("quantile", [0.1, 0.5, 0.9, 0.99])
+    def test_p2_quantile(self, quantile):
+        generator = random.Random(quantile)
+        values = [generator.gauss(0, 1) for _ in range(20000)]
+        estimator = P2Quantile(quantile)
+        for value in values:
+            estimator.add(value)
+
+        exact = sorted(values)[int(quantile * len(values))]
+        assert estimator.value() == pytest.approx(exact, abs=0.05)
+
+    def test_p2_quantile_few_values(self):
+        estimator = P2Quantile(0.5)
+        for value in [3, 1, 2]:
+            estimator.add(value)
+
+        assert estimator.value() == 2
+
+    def test_csv_round_trip(self, tmp_path):
+        path = str(tmp_path / "results.csv")
+        records = [*play_records(make_strategies(), 0, 7, seed=4)]
+        with CsvResultSink(path, batch_size=3) as sink:
+            for record in records:
+                sink.write(record)
+
+        assert [*read_records(path)] == records
+
+    def test_incomplete_line_is_dropped(self, tmp_path):
+        path = str(tmp_path / "results.csv")
+        records = [*play_records(make_strategies(), 0, 3, seed=4)]
+        with CsvResultSink(path) as sink:
+            for record in records:
+                sink.write(record)
+        with open(path, "a") as file:
+            file.write("3,4,0,1,50;6")
+
+        assert [*read_records(path)] == records
+        CsvResultSink(path).close()
+        assert [*read_records(path)] == records
+
+    def test_resume_matches_uninterrupted_run(self, tmp_path):
+        path = str(tmp_path / "results.csv")
+        whole = standard_aggregators(3)
+        run_stream(make_strategies(), 12, 5, whole)
+
+        assert run_stream(make_strategies(), 5, 5, [], path=path, batch_size=2) == 5
+        resumed = standard_aggregators(3)
+        assert run_stream(make_strategies(), 12, 5, resumed, path=path, batch_size=2) == 7
+
+        assert [aggregator.summary() for aggregator in resumed] == [aggregator.summary() for aggregator in whole]
+        assert [record.game_index for record in read_records(path)] == [*range(12)]
+
+    def test_resume_checks_series(self, tmp_path):
+        path = str(tmp_path / "results.csv")
+        run_stream(make_strategies(), 3, 5, path=path)
+
+        with pytest.raises(ValueError):
+            run_stream(make_strategies(), 6, 6, path=path)
+        with pytest.raises(ValueError):
+            run_stream(make_strategies()[:2], 6, 5, path=path)
+
+    def test_scores(self):
+        record = next(play_records(make_strategies(), 0, 1, seed=8))
+
+        assert tuple(scores(record)) == record.scores
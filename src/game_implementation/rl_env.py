@@ -0,0 +1,310 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from game_implementation.batch_game import BatchGame, BatchRandomStrategy, BatchStrategy
+from game_implementation.dice import DiceSource, GlobalRandomDice, SeededDice
+from game_implementation.disc_state import DISC_CODES, DISC_STATES
+from game_implementation.exceptions import IllegalMoveException
+from game_implementation.game import Game
+from game_implementation.strategy import RandomStrategy
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.types import PlayerCount, PlayerId
+
+SCORE_SCALE = 100.0
+"""Scores and taken totals are divided by this in observations"""
+
+_ONE_HOT_DISCS = np.eye(len(DISC_STATES), dtype=np.float32)
+_ONE_HOT_DICE = np.eye(6, dtype=np.float32)
+
+
+def observation_size(player_count: PlayerCount) -> int:
+    return player_count * (6 * len(DISC_STATES) + 2) + 6 + 6 + 1
+
+
+def encode_observations(
+    discs: np.ndarray,
+    taken: np.ndarray,
+    scores: np.ndarray,
+    die: np.ndarray,
+    remaining_dice: np.ndarray,
+    round: np.ndarray,
+) -> np.ndarray:
+    """
+    Observations for many decisions, shared by `PerukeEnv` and `VectorEnv`.
+
+    Players are ordered from the agent's point of view: the agent first, then the players after them in turn.
+
+    Args:
+        discs: (envs, players, 6) disc codes, as `disc_state.DISC_CODES`
+        taken: (envs, players) total score of discs taken this round
+        scores: (envs, players) cumulative scores from previous rounds
+        die: (envs,) die to play
+        remaining_dice: (envs, 6) count of each die still to play after this one
+        round: (envs,) current round
+
+    Returns:
+        (envs, `observation_size`) float32 observations: per player, one-hot disc states then the scaled taken
+        total and score; then the one-hot die, remaining dice counts and the fraction of rounds played
+    """
+    count, player_count = taken.shape
+    players = np.concatenate(
+        [
+            _ONE_HOT_DISCS[discs].reshape(count, player_count, -1),
+            taken[:, :, None] / SCORE_SCALE,
+            scores[:, :, None] / SCORE_SCALE,
+        ],
+        axis=2,
+    )
+    return np.concatenate(
+        [
+            players.reshape(count, -1),
+            _ONE_HOT_DICE[die],
+            remaining_dice,
+            (round / player_count)[:, None],
+        ],
+        axis=1,
+        dtype=np.float32,
+    )
+
+
+class PerukeEnv:
+    """
+    Single agent environment on `Game`, with the gymnasium reset/step interface.
+
+    The agent plays one seat against strategies for the others. Each step plays one die, in the order rolled:
+    the action is the target player (0 is the agent, then the players after them in turn), and
+    `info["action_mask"]` marks the legal targets, from `Game.possible_actions`. Dice that cannot be used are
+    skipped. The reward is the agent's share of the win when the game ends, else 0.
+    """
+
+    def __init__(
+        self,
+        player_count: PlayerCount = 3,
+        agent_id: PlayerId = 0,
+        opponents: Optional[Sequence[Strategy]] = None,
+    ):
+        """
+        Args:
+            player_count: number of players
+            agent_id: seat of the agent
+            opponents: strategy for every seat, the agent's is ignored; RandomStrategy by default
+        """
+        self.player_count = player_count
+        self.agent_id = agent_id
+        self.opponents = opponents if opponents is not None else [RandomStrategy()] * player_count
+        self.observation_size = observation_size(player_count)
+        self.action_count = player_count
+        self.dice_source: DiceSource = GlobalRandomDice()
+        self.game: Optional[Game] = None
+        self.episodes = 0
+        self._dice = []
+        self._die_index = 0
+
+    def reset(
+        self, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Start a new game; start players rotate between episodes unless `options["start_player"]` is given.
+
+        A seed seeds the dice; opponents' choices still use their own randomness.
+        """
+        if seed is not None:
+            self.dice_source = SeededDice(seed)
+        start_player = (options or {}).get("start_player", self.episodes % self.player_count)
+        self.episodes += 1
+        self.game = Game(self.player_count, start_player=start_player, dice_source=self.dice_source)
+        self.game.set_initial_defence()
+        self._dice = []
+        self._die_index = 0
+        self._advance()
+        return self._observation(), self._info()
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
+        """Play the current die against the target player `action`."""
+        if self.is_game_over():
+            raise IllegalMoveException("Game is over, call reset")
+        target_id = (self.agent_id + action) % self.player_count
+        die = self._dice[self._die_index]
+        for candidate in self.game.possible_actions(self.agent_id, die):
+            if candidate.target_id == target_id:
+                self.game.play_action(self.agent_id, candidate)
+                break
+        else:
+            raise IllegalMoveException(f"Cannot play die {die} against player {target_id}")
+        self._die_index += 1
+        self._advance()
+
+        terminated = self.is_game_over()
+        reward = 0.0
+        if terminated:
+            winners = self.game.winners()
+            reward = 1 / len(winners) if self.agent_id in winners else 0.0
+        return self._observation(), reward, terminated, False, self._info()
+
+    def is_game_over(self) -> bool:
+        return self.game.round == self.player_count
+
+    def action_mask(self) -> np.ndarray:
+        mask = np.zeros(self.player_count, dtype=bool)
+        if not self.is_game_over():
+            for action in self.game.possible_actions(self.agent_id, self._dice[self._die_index]):
+                mask[(action.target_id - self.agent_id) % self.player_count] = True
+        return mask
+
+    def _advance(self) -> None:
+        """Play on until the agent has a usable die, or the game ends."""
+        game = self.game
+        while not self.is_game_over():
+            if game.player_id == self.agent_id:
+                if not self._dice:
+                    self._dice = self.dice_source.roll()
+                    self._die_index = 0
+                    game.events.dice_rolled(game, self.agent_id, self._dice)
+                while self._die_index < 3 and not game.possible_actions(self.agent_id, self._dice[self._die_index]):
+                    self._die_index += 1
+                if self._die_index < 3:
+                    return
+                self._dice = []
+                game.turn += 1
+                round_over = game.is_round_over()
+            else:
+                round_over = game.take_turn(game.player_id, self.opponents[game.player_id])
+            game.player_id = (game.player_id + 1) % self.player_count
+            if round_over:
+                game.end_round(game.player_id)
+
+    def _observation(self) -> np.ndarray:
+        game = self.game
+        order = [(self.agent_id + offset) % self.player_count for offset in range(self.player_count)]
+        players = [game.players[player_id] for player_id in order]
+        remaining = np.zeros((1, 6), dtype=np.float32)
+        die = 0
+        if not self.is_game_over():
+            die = self._dice[self._die_index]
+            later = self._die_index + 1
+            for later_die in self._dice[later:]:
+                remaining[0, later_die] += 1
+        return encode_observations(
+            np.array([[[DISC_CODES[disc] for disc in player.discs] for player in players]]),
+            np.array([[sum(player.taken) for player in players]]),
+            np.array([[player.score for player in players]]),
+            np.array([die]),
+            remaining,
+            np.array([game.round]),
+        )[0]
+
+    def _info(self) -> Dict[str, Any]:
+        return {"action_mask": self.action_mask(), "scores": [player.score for player in self.game.players]}
+
+
+class VectorEnv:
+    """
+    Many `PerukeEnv` games stepped together on a `BatchGame`, with the agent in seat 0 of every game.
+
+    `step` takes one action per game and returns arrays; games that end are reset automatically, returning the
+    first observation of the new game, with the indices of the games that ended in `info["finished"]` and their
+    final scores, one row per game, in `info["final_scores"]`. Start players rotate across games. Nothing is
+    allocated per game, only per call.
+    """
+
+    def __init__(
+        self,
+        env_count: int,
+        player_count: PlayerCount = 3,
+        opponent: Optional[BatchStrategy] = None,
+        seed: Optional[int] = None,
+    ):
+        self.env_count = env_count
+        self.player_count = player_count
+        self.opponent = opponent if opponent is not None else BatchRandomStrategy()
+        self.observation_size = observation_size(player_count)
+        self.action_count = player_count
+        self.batch = BatchGame(
+            env_count, player_count, start_player=np.arange(env_count) % player_count, rng=np.random.default_rng(seed)
+        )
+        self._strategies = [self.opponent] * player_count
+        self._envs = np.arange(env_count)
+        self._dice = np.zeros((env_count, 3), dtype=np.int8)
+        self._die_index = np.zeros(env_count, dtype=np.int8)
+        self._rolled = np.zeros(env_count, dtype=bool)
+        """Whether the agent has rolled for their current turn"""
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        if seed is not None:
+            self.batch.rng = np.random.default_rng(seed)
+        self._start(self._envs)
+        return self._observations(), {"action_mask": self.action_mask()}
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """Play each game's current die against its target player in `actions`."""
+        batch = self.batch
+        envs = self._envs
+        actions = np.asarray(actions, dtype=np.intp)
+        die = self._current_dice()
+        new_states = batch.new_states(envs, die)
+        if not batch.legal_targets(envs, die)[np.arange(len(envs)), actions].all():
+            raise IllegalMoveException("Action for an unusable target")
+        batch.play_action(envs, die, actions, new_states)
+        self._die_index += 1
+        self._advance(envs)
+
+        terminated = batch.done.copy()
+        winners = batch.winners()
+        rewards = np.where(terminated, winners[:, 0] / winners.sum(axis=1), 0.0).astype(np.float32)
+        info = {}
+        finished = np.flatnonzero(terminated)
+        if len(finished):
+            info["finished"] = finished
+            info["final_scores"] = batch.scores[finished]
+            self._start(finished)
+        info["action_mask"] = self.action_mask()
+        return self._observations(), rewards, terminated, np.zeros(self.env_count, dtype=bool), info
+
+    def action_mask(self) -> np.ndarray:
+        return self.batch.legal_targets(self._envs, self._current_dice())
+
+    def _current_dice(self) -> np.ndarray:
+        return self._dice[self._envs, np.minimum(self._die_index, 2)]
+
+    def _start(self, envs: np.ndarray) -> None:
+        self.batch.reset(envs)
+        self.batch.set_initial_defence(envs)
+        self._rolled[envs] = False
+        self._advance(envs)
+
+    def _advance(self, envs: np.ndarray) -> None:
+        """Play on until the agent has a usable die, or the game ends, in each of the games."""
+        batch = self.batch
+        pending = envs
+        while len(pending):
+            pending = pending[~batch.done[pending]]
+            agent = batch.player_id[pending] == 0
+            opponents = pending[~agent]
+            if len(opponents):
+                batch.step(self._strategies, opponents)
+            agent_envs = pending[agent]
+            rolling = agent_envs[~self._rolled[agent_envs]]
+            self._dice[rolling] = batch.roll_dice(len(rolling))
+            self._die_index[rolling] = 0
+            self._rolled[rolling] = True
+            for _ in range(3):
+                playing = agent_envs[self._die_index[agent_envs] < 3]
+                die = self._dice[playing, self._die_index[playing]]
+                unusable = ~batch.legal_targets(playing, die).any(axis=1)
+                self._die_index[playing[unusable]] += 1
+            finished = agent_envs[self._die_index[agent_envs] == 3]
+            self._rolled[finished] = False
+            batch.turn[finished] += 1
+            batch.end_turn(finished, batch.is_round_over(finished))
+            pending = np.concatenate([opponents, finished])
+
+    def _observations(self) -> np.ndarray:
+        batch = self.batch
+        dice = self._dice
+        die_index = np.minimum(self._die_index, 2)
+        later = np.arange(3) > die_index[:, None]
+        remaining = (_ONE_HOT_DICE[dice] * later[:, :, None]).sum(axis=1)
+        return encode_observations(
+            batch.discs, batch.taken, batch.scores, self._current_dice(), remaining, batch.round
+        )
@@ -0,0 +1,149 @@
+import random
+
+import numpy as np
+import pytest
+
+from game_implementation.disc_state import DISC_STATES
+from game_implementation.exceptions import IllegalMoveException
+from game_implementation.game import Game
+from game_implementation.player import Player
+from game_implementation.rl_env import observation_size, PerukeEnv, VectorEnv
+from game_implementation.strategy_protocol import Strategy
+
+
+class FirstActionStrategy(Strategy):
+    def choose_actions(self, game, player_id, dice):
+        for die in dice:
+            actions = game.possible_actions(player_id, die)
+            if actions:
+                yield actions[0]
+
+
+def play_random_episode(env: PerukeEnv, seed: int):
+    rng = np.random.default_rng(seed)
+    observation, info = env.reset(seed=seed)
+    steps = 0
+    while True:
+        assert observation.shape == (env.observation_size,)
+        assert info["action_mask"].any()
+        action = rng.choice(np.flatnonzero(info["action_mask"]))
+        observation, reward, terminated, truncated, info = env.step(action)
+        steps += 1
+        if terminated:
+            return reward, steps, info
+
+
+class TestPerukeEnv:
+    @pytest.mark.parametrize("player_count, agent_id", [(2, 0), (3, 1), (4, 3)])
+    def test_random_episodes(self, player_count, agent_id):
+        random.seed(player_count)
+        env = PerukeEnv(player_count, agent_id=agent_id)
+
+        for seed in range(3):
+            reward, steps, info = play_random_episode(env, seed)
+
+            winning_score = max(info["scores"])
+            assert reward == pytest.approx(
+                (info["scores"][agent_id] == winning_score) / info["scores"].count(winning_score)
+            )
+            assert steps > 0
+            assert not info["action_mask"].any()
+
+    def test_seeded_dice_repeat(self):
+        first = play_random_episode(PerukeEnv(3, opponents=[FirstActionStrategy()] * 3), 7)
+
+        assert play_random_episode(PerukeEnv(3, opponents=[FirstActionStrategy()] * 3), 7)[:2] == first[:2]
+
+    def test_illegal_action(self):
+        env = PerukeEnv(2)
+        # A start where the first die cannot be played against one of the players
+        seed = 0
+        _, info = env.reset(seed=seed)
+        while info["action_mask"].all():
+            seed += 1
+            _, info = env.reset(seed=seed)
+
+        with pytest.raises(IllegalMoveException):
+            env.step(int(np.argmin(info["action_mask"])))
+
+    def test_observation_is_from_agent_seat(self):
+        env = PerukeEnv(3, agent_id=2)
+        env.reset(seed=3)
+        env.game.players[2].score = 50
+
+        observation = env._observation()
+
+        disc_features = 6 * len(DISC_STATES)
+        assert observation.shape == (observation_size(3),)
+        assert observation[disc_features + 1] == pytest.approx(0.5)
+
+
+class TestVectorEnv:
+    def test_random_play(self):
+        env = VectorEnv(64, seed=1)
+        observations, info = env.reset()
+        rng = np.random.default_rng(2)
+        finished = 0
+        rewards = 0.0
+
+        for _ in range(200):
+            mask = info["action_mask"]
+            assert mask.any(axis=1).all()
+            actions = np.argmax(rng.random(mask.shape) * mask, axis=1)
+            observations, reward, terminated, truncated, info = env.step(actions)
+            assert observations.shape == (64, env.observation_size)
+            assert not truncated.any()
+            assert (reward[~terminated] == 0).all()
+            if terminated.any():
+                assert (env.batch.round[terminated] == 0).all()
+                final_scores = info["final_scores"]
+                assert (info["finished"] == np.flatnonzero(terminated)).all()
+                assert final_scores.shape == (terminated.sum(), 3)
+                assert ((reward[terminated] > 0) == (final_scores[:, 0] == final_scores.max(axis=1))).all()
+            finished += terminated.sum()
+            rewards += reward.sum()
+
+        assert finished > 64
+        assert 0 < rewards < finished
+
+    def test_illegal_action(self):
+        env = VectorEnv(8, seed=1)
+        _, info = env.reset()
+
+        mask = info["action_mask"]
+        actions = np.argmax(mask, axis=1)
+        index = np.flatnonzero(~mask.all(axis=1))[0]
+        actions[index] = np.argmin(mask[index])
+
+        with pytest.raises(IllegalMoveException):
+            env.step(actions)
+
+    def test_observations_match_single_env(self):
+        env = VectorEnv(16, player_count=3, seed=4)
+        _, info = env.reset()
+        rng = np.random.default_rng(5)
+        for _ in range(20):
+            mask = info["action_mask"]
+            observations, _, _, _, info = env.step(np.argmax(rng.random(mask.shape) * mask, axis=1))
+
+        batch = env.batch
+        for index in range(env.env_count):
+            single = PerukeEnv(3, agent_id=0)
+            single.game = Game(
+                3,
+                round=int(batch.round[index]),
+                player_init=[
+                    Player(
+                        player_id,
+                        init_taken=[int(batch.taken[index, player_id])] if batch.taken[index, player_id] else [],
+                        init_score=int(batch.scores[index, player_id]),
+                        init_disks=[DISC_STATES[code] for code in batch.discs[index, player_id]],
+                    )
+                    for player_id in range(3)
+                ],
+            )
+            single._dice = [*env._dice[index]]
+            single._die_index = int(env._die_index[index])
+
+            assert np.array_equal(single._observation(), observations[index])
+            assert np.array_equal(single.action_mask(), info["action_mask"][index])
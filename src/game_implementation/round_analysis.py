@@ -0,0 +1,238 @@
+"""
+Exact round outcome probabilities for a fixed strategy profile.
+
+A round is a Markov chain over compact states: each turn the player to move rolls one of the 216 ordered rolls, and
+their policy maps the state and roll to a distribution over the states after their turn. Propagating the
+distribution over states turn by turn, merging equal states, gives the exact chance of the round ending on each turn
+and the exact distribution of round scores, to within the probability still in play when propagation stops.
+
+Gone discs never come back within a round, so the chain shrinks as a round goes on. Late in a round, with a few discs
+left in play, there are tens to hundreds of states and an analysis takes about a second, for an exact answer where
+Monte Carlo over as many seconds of games is good to a couple of percent. With many discs still in play, and
+especially with three or four players, there are millions of states: `RoundEvaluator.max_states` guards against
+starting such an analysis by accident.
+"""
+import itertools
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Protocol, Sequence, Tuple, Union
+
+from game_implementation.compact_state import CompactState, PLAYER_BITS, PLAYER_MASK, taken_total
+from game_implementation.dice import FACES
+from game_implementation.exceptions import AnalysisTooLargeException
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.types import DiscId, PlayerCount
+
+Distribution = Dict[CompactState, float]
+Rolls = Sequence[Tuple[Sequence[DiscId], float]]
+
+ORDERED_ROLLS: List[Tuple[Tuple[DiscId, ...], float]] = [
+    (dice, 1 / 6 ** 3) for dice in itertools.product(FACES, repeat=3)
+]
+"""Every roll of three dice in the order rolled, as `dice.get_dice`, since strategies may depend on the order"""
+
+
+class TurnPolicy(Protocol):
+    def turn_distribution(self, state: CompactState, rolls: Rolls) -> Distribution:
+        """
+        Distribution of the state after the turn of `state.player_id`, over the rolls and any randomness of the
+        policy. The turn is not ended: the player to move is unchanged.
+        """
+        pass
+
+
+class StrategyPolicy(TurnPolicy):
+    """Policy of a deterministic strategy, played on a game as `Game.take_turn` would."""
+
+    def __init__(self, strategy: Strategy):
+        self.strategy = strategy
+
+    def turn_distribution(self, state: CompactState, rolls: Rolls) -> Distribution:
+        game = state.to_game()
+        player_id = state.player_id
+        distribution: Distribution = defaultdict(float)
+        for dice, probability in rolls:
+            game.push()
+            game.replay_turn(player_id, dice, self.strategy.choose_actions(game, player_id, dice))
+            distribution[CompactState.from_game(game)] += probability
+            game.pop()
+        return distribution
+
+
+class RandomPolicy(TurnPolicy):
+    """Exact policy of `strategy.RandomStrategy`: a uniformly random legal action for each usable die in order."""
+
+    def turn_distribution(self, state: CompactState, rolls: Rolls) -> Distribution:
+        distribution: Distribution = defaultdict(float)
+        for dice, probability in rolls:
+            self._play_dice(state, dice, probability, distribution)
+        return distribution
+
+    def _play_dice(self, state: CompactState, dice: Sequence[DiscId], probability: float, distribution: Distribution):
+        if not dice:
+            distribution[state] += probability
+            return
+        remaining = dice[1:]
+        actions = state.possible_actions(state.player_id, dice[0])
+        if not actions:
+            self._play_dice(state, remaining, probability, distribution)
+        for action in actions:
+            after = state.with_action(state.player_id, action)
+            self._play_dice(after, remaining, probability / len(actions), distribution)
+
+
+def fold_taken(state: CompactState) -> CompactState:
+    """
+    Equivalent state with each player's taken discs added to their score.
+
+    States only differing in which discs were taken, not their total, then merge. Policies see the same expected
+    scores, but no taken discs; the built in strategies only look at expected scores.
+    """
+    scores = tuple(
+        score + taken_total((state.taken >> (PLAYER_BITS * player_id)) & PLAYER_MASK)
+        for player_id, score in enumerate(state.scores)
+    )
+    return CompactState(
+        state.player_count, state.start_player, state.player_id, state.round, 0, state.discs, 0, scores
+    )
+
+
+class RoundAnalysis(NamedTuple):
+    player_count: PlayerCount
+    end_turn: List[float]
+    """Probability of the round ending on each turn from the start of the analysis: end_turn[0] is the first"""
+    enders: List[float]
+    """Probability of the round ending on each player's turn"""
+    winners: List[float]
+    """Probability of each player winning the round, being the player after the one who ended it"""
+    round_scores: List[Dict[int, float]]
+    """Distribution of each player's round score, including the vulnerable discs the winner takes"""
+    unfinished: float
+    """Probability of the round still being in play when propagation stopped"""
+
+    def ended_within(self, turns: int) -> float:
+        return sum(self.end_turn[:turns])
+
+    def expected_round_scores(self) -> List[float]:
+        """Expected round scores, conditional on the round ending within the turns analysed."""
+        finished = 1 - self.unfinished
+        return [
+            sum(score * probability for score, probability in scores.items()) / finished
+            for scores in self.round_scores
+        ]
+
+
+class RoundEvaluator:
+    """
+    Propagate distributions over states through a round played by a fixed profile of policies.
+
+    Turn distributions are memoised by state, so states reached by many paths, or in several analyses with the
+    same evaluator, are evaluated once. Taken discs are folded into scores (see `fold_taken`).
+    """
+
+    def __init__(self, policies: Sequence[TurnPolicy], rolls: Rolls = ORDERED_ROLLS, max_states: int = 100_000):
+        """
+        Args:
+            policies: one per player
+            rolls: roll outcomes with their probabilities; `dice.ROLL_OUTCOMES` is exact and 4 times faster for
+                policies that do not depend on the order of the dice, like RandomPolicy
+            max_states: raise AnalysisTooLargeException rather than memoise more states than this
+        """
+        self.policies = [*policies]
+        self.rolls = [*rolls]
+        self.max_states = max_states
+        self.memo: Dict[CompactState, List[Tuple[CompactState, float]]] = {}
+
+    def transitions(self, state: CompactState) -> List[Tuple[CompactState, float]]:
+        """
+        Folded states after the turn of the player to move, and before the next player's, with their probabilities.
+        """
+        transitions = self.memo.get(state)
+        if transitions is None:
+            if len(self.memo) >= self.max_states:
+                raise AnalysisTooLargeException(f"More than {self.max_states} states to analyse")
+            next_player = (state.player_id + 1) % state.player_count
+            transitions = self.memo[state] = [
+                (fold_taken(outcome._replace(player_id=next_player)), probability)
+                for outcome, probability in self.policies[state.player_id].turn_distribution(state, self.rolls).items()
+            ]
+        return transitions
+
+    def analyse(
+        self, start: Union[CompactState, Distribution], max_turns: int = 10_000, tolerance: float = 1e-12
+    ) -> RoundAnalysis:
+        """
+        Play a round out from a state, or from a distribution over states with the same scores.
+
+        Args:
+            start: state(s) at the start of a turn in a round that is not over
+            max_turns: stop after this many turns
+            tolerance: stop once the probability of the round still being in play is below this
+        """
+        start = {start: 1.0} if isinstance(start, CompactState) else start
+        base_scores = next(iter(start)).scores
+        player_count = len(base_scores)
+        live: Distribution = defaultdict(float)
+        for state, probability in start.items():
+            if state.scores != base_scores:
+                raise ValueError("Start states must have the same scores")
+            live[fold_taken(state)] += probability
+
+        end_turn = []
+        enders = [0.0] * player_count
+        winners = [0.0] * player_count
+        round_scores: List[Dict[int, float]] = [defaultdict(float) for _ in range(player_count)]
+        for _ in range(max_turns):
+            ended = 0.0
+            following: Distribution = defaultdict(float)
+            for state, probability in live.items():
+                for outcome, outcome_probability in self.transitions(state):
+                    outcome_probability *= probability
+                    if not outcome.is_round_over():
+                        following[outcome] += outcome_probability
+                        continue
+                    ended += outcome_probability
+                    enders[state.player_id] += outcome_probability
+                    winners[outcome.player_id] += outcome_probability
+                    scores = outcome.end_round(outcome.player_id).scores
+                    for player_id in range(player_count):
+                        round_scores[player_id][scores[player_id] - base_scores[player_id]] += outcome_probability
+            end_turn.append(ended)
+            live = following
+            if sum(live.values()) < tolerance:
+                break
+        return RoundAnalysis(
+            player_count,
+            end_turn,
+            enders,
+            winners,
+            [dict(sorted(scores.items())) for scores in round_scores],
+            sum(live.values()),
+        )
+
+
+def monte_carlo_round(
+    state: CompactState, strategies: Sequence[Strategy], games: int, max_turns: int = 10_000
+) -> Tuple[List[int], List[List[int]]]:
+    """
+    Play a round out from a state many times with `Game`, for comparison with an analysis.
+
+    Returns:
+        the number of turns each round took to end (max_turns + 1 if it did not), and each player's round scores
+        in each game that ended
+    """
+    turns = []
+    round_scores: List[List[int]] = [[] for _ in strategies]
+    for _ in range(games):
+        game = state.to_game()
+        for turn in range(1, max_turns + 1):
+            over = game.take_turn(game.player_id, strategies[game.player_id])
+            game.player_id = (game.player_id + 1) % game.player_count
+            if over:
+                turns.append(turn)
+                game.winner_take_vulnerable_discs(game.player_id)
+                for player in game.players:
+                    round_scores[player.player_id].append(player.round_score)
+                break
+        else:
+            turns.append(max_turns + 1)
+    return turns, round_scores
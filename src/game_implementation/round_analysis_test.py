@@ -0,0 +1,126 @@
+import random
+import statistics
+
+import pytest
+
+from game_implementation.compact_state import CompactState
+from game_implementation.dice import ROLL_OUTCOMES
+from game_implementation.disc_state import DiscState
+from game_implementation.exceptions import AnalysisTooLargeException
+from game_implementation.game import Game
+from game_implementation.player import Player
+from game_implementation.round_analysis import (
+    fold_taken,
+    monte_carlo_round,
+    ORDERED_ROLLS,
+    RandomPolicy,
+    RoundEvaluator,
+    StrategyPolicy,
+)
+from game_implementation.strategy import RandomStrategy, TALLEST_DAISY_PREFERENCE, TallestDaisyStrategy
+
+G, S, V = DiscState.Gone, DiscState.Safe, DiscState.Vulnerable
+
+
+def late_round_state() -> CompactState:
+    """Two players late in a round, each with one disc still in play besides safe ones."""
+    game = Game(
+        player_count=2,
+        player_init=[
+            Player(0, init_taken=[1, 2, 4], init_score=10, init_disks=[G, G, V, G, S, G]),
+            Player(1, init_taken=[3, 6], init_disks=[G, S, G, G, S, G]),
+        ],
+    )
+    game.player_id = 1
+    return CompactState.from_game(game)
+
+
+def tallest_daisy():
+    return TallestDaisyStrategy(TALLEST_DAISY_PREFERENCE)
+
+
+class TestRoundAnalysis:
+    def test_rolls_are_distributions(self):
+        assert len(ORDERED_ROLLS) == 216
+        assert sum(probability for _, probability in ORDERED_ROLLS) == pytest.approx(1)
+
+    def test_fold_taken(self):
+        state = late_round_state()
+        folded = fold_taken(state)
+
+        assert folded.taken == 0
+        assert folded.scores == (17, 9)
+        assert [folded.expected_score(player_id) for player_id in range(2)] == [
+            state.expected_score(player_id) for player_id in range(2)
+        ]
+
+    @pytest.mark.parametrize(
+        "policy, rolls", [(RandomPolicy(), ROLL_OUTCOMES), (RandomPolicy(), ORDERED_ROLLS), (None, ORDERED_ROLLS)]
+    )
+    def test_turn_distribution_sums_to_one(self, policy, rolls):
+        policy = policy or StrategyPolicy(tallest_daisy())
+        distribution = policy.turn_distribution(late_round_state(), rolls)
+
+        assert sum(distribution.values()) == pytest.approx(1)
+        assert all(state.player_id == 1 for state in distribution)
+
+    def test_random_policy_ignores_dice_order(self):
+        state = late_round_state()
+        ordered = RandomPolicy().turn_distribution(state, ORDERED_ROLLS)
+        sorted_rolls = RandomPolicy().turn_distribution(state, ROLL_OUTCOMES)
+
+        assert ordered.keys() == sorted_rolls.keys()
+        for outcome, probability in ordered.items():
+            assert sorted_rolls[outcome] == pytest.approx(probability)
+
+    def test_analysis_is_consistent(self):
+        analysis = RoundEvaluator([RandomPolicy()] * 2, ROLL_OUTCOMES).analyse(late_round_state())
+
+        assert analysis.unfinished < 1e-12
+        assert sum(analysis.end_turn) == pytest.approx(1)
+        assert sum(analysis.enders) == pytest.approx(1)
+        assert sum(analysis.winners) == pytest.approx(1)
+        # the round ends on a player's turn, and is won by the next player
+        assert analysis.winners == pytest.approx(analysis.enders[::-1])
+        for scores in analysis.round_scores:
+            assert sum(scores.values()) == pytest.approx(1)
+        # player 0 has taken 7, and keeps at least their safe 5
+        assert min(analysis.round_scores[0]) >= 7
+        assert analysis.ended_within(len(analysis.end_turn)) == pytest.approx(1)
+
+    def test_max_turns(self):
+        analysis = RoundEvaluator([RandomPolicy()] * 2, ROLL_OUTCOMES).analyse(late_round_state(), max_turns=3)
+
+        assert len(analysis.end_turn) == 3
+        assert analysis.unfinished == pytest.approx(1 - analysis.ended_within(3))
+
+    def test_max_states(self):
+        evaluator = RoundEvaluator([RandomPolicy()] * 2, ROLL_OUTCOMES, max_states=5)
+
+        with pytest.raises(AnalysisTooLargeException):
+            evaluator.analyse(late_round_state())
+
+    def test_start_distribution_needs_same_scores(self):
+        state = late_round_state()
+
+        with pytest.raises(ValueError):
+            RoundEvaluator([RandomPolicy()] * 2).analyse({state: 0.5, state._replace(scores=(0, 0)): 0.5})
+
+    @pytest.mark.parametrize("strategy", [RandomStrategy(), tallest_daisy()])
+    def test_matches_monte_carlo(self, strategy):
+        policy = RandomPolicy() if isinstance(strategy, RandomStrategy) else StrategyPolicy(strategy)
+        state = late_round_state()
+        analysis = RoundEvaluator([policy] * 2).analyse(state)
+
+        random.seed(7)
+        games = 2000
+        turns, round_scores = monte_carlo_round(state, [strategy] * 2, games)
+        # within about 4 standard errors
+        for within in [1, 3, 10]:
+            expected = analysis.ended_within(within)
+            observed = sum(turn <= within for turn in turns) / games
+            assert observed == pytest.approx(expected, abs=4 * (expected * (1 - expected) / games) ** 0.5 + 1e-9)
+        for player_id, expected in enumerate(analysis.expected_round_scores()):
+            scores = round_scores[player_id]
+            standard_error = statistics.stdev(scores) / games ** 0.5
+            assert statistics.mean(scores) == pytest.approx(expected, abs=4 * standard_error)
@@ -62,3 +62,25 @@ class PreferTakeOnDoubleSafeDie(Strategy):
                     possible_actions, key=lambda action: self.ordering(game, action, die in remaining_dice)
                 )
                 yield ordered[-1]
+
+
+TALLEST_DAISY_PREFERENCE: Dict[DiscState, int] = {DiscState.Gone: 3, DiscState.Safe: 2, DiscState.Vulnerable: 2}
+"""Preference table of the standard `TallestDaisyStrategy`"""
+DOUBLE_TAKE_PREFERENCE: Dict[Tuple[DiscState, bool], int] = {
+    (DiscState.Gone, True): 3,
+    (DiscState.Gone, False): 3,
+    (DiscState.Safe, True): 1,
+    (DiscState.Safe, False): 1,
+    (DiscState.Vulnerable, True): 2,
+    (DiscState.Vulnerable, False): 0,
+}
+"""Preference table of the standard `PreferTakeOnDoubleSafeDie`"""
+
+
+def standard_strategies() -> Dict[str, Strategy]:
+    """An instance of every strategy class in this module, with the standard preference tables, by class name."""
+    return {
+        "RandomStrategy": RandomStrategy(),
+        "TallestDaisyStrategy": TallestDaisyStrategy(TALLEST_DAISY_PREFERENCE),
+        "PreferTakeOnDoubleSafeDie": PreferTakeOnDoubleSafeDie(DOUBLE_TAKE_PREFERENCE),
+    }
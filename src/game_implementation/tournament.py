@@ -0,0 +1,80 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, NamedTuple, Optional, Sequence, Tuple
+
+from game_implementation.game_runner import play_game
+from game_implementation.strategy_protocol import Strategy
+
+
+class TournamentResult(NamedTuple):
+    seed: int
+    """Master seed the games were played with; replaying with it reproduces the result"""
+    games: int
+    """Number of games played"""
+    winner_counts: Tuple[int, ...]
+    """Games won (or tied) by each seat"""
+
+    def merge(self, other: "TournamentResult") -> "TournamentResult":
+        if self.seed != other.seed:
+            raise ValueError(f"Cannot merge results from different seeds: {self.seed} and {other.seed}")
+        return TournamentResult(
+            self.seed,
+            self.games + other.games,
+            tuple(mine + theirs for mine, theirs in zip(self.winner_counts, other.winner_counts)),
+        )
+
+
+def play_batch(strategies: Sequence[Strategy], seed: int, first_game: int, last_game: int) -> TournamentResult:
+    """Play games [first_game, last_game) of a tournament. Each game has its own RNG stream, see `play_game`."""
+    winner_counts = [0] * len(strategies)
+    for game_index in range(first_game, last_game):
+        for winner in play_game(strategies, game_index, seed=seed):
+            winner_counts[winner] += 1
+    return TournamentResult(seed, last_game - first_game, tuple(winner_counts))
+
+
+def batches(iterations: int, batch_size: int) -> Iterator[Tuple[int, int]]:
+    for first_game in range(0, iterations, batch_size):
+        yield first_game, min(first_game + batch_size, iterations)
+
+
+def run_tournament(
+    strategies: Sequence[Strategy],
+    iterations: int,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    batch_size: int = 100,
+) -> TournamentResult:
+    """
+    Play a series of games spread over a pool of worker processes.
+
+    Every game is seeded from the master seed and its index in the series, so the result only depends on
+    the seed and the number of games, not on the number of workers or the batch size.
+
+    Args:
+        strategies: one per player, must be picklable
+        iterations: number of games to play
+        seed: master seed, chosen at random if not given (and reported in the result)
+        workers: number of processes; 1 plays all games in this process
+        batch_size: number of games sent to a worker at a time
+
+    Returns:
+        merged results of all batches
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 63)
+    result = TournamentResult(seed, 0, (0,) * len(strategies))
+
+    if workers == 1:
+        for first_game, last_game in batches(iterations, batch_size):
+            result = result.merge(play_batch(strategies, seed, first_game, last_game))
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(play_batch, strategies, seed, first_game, last_game)
+            for first_game, last_game in batches(iterations, batch_size)
+        ]
+        for future in futures:
+            result = result.merge(future.result())
+    return result
@@ -0,0 +1,46 @@
+import pytest
+
+from game_implementation.game_runner import derive_seed, run_games
+from game_implementation.strategy import RandomStrategy, TALLEST_DAISY_PREFERENCE, TallestDaisyStrategy
+from game_implementation.tournament import run_tournament, TournamentResult
+
+
+def make_strategies():
+    return [
+        RandomStrategy(),
+        TallestDaisyStrategy(TALLEST_DAISY_PREFERENCE),
+    ]
+
+
+class TestTournament:
+    def test_derive_seed_is_stable_and_distinct(self):
+        assert derive_seed(42, 7) == derive_seed(42, 7)
+        assert len({derive_seed(42, game_index) for game_index in range(100)}) == 100
+        assert derive_seed(42, 7) != derive_seed(43, 7)
+
+    @pytest.mark.parametrize("workers, batch_size", [(1, 100), (1, 7), (2, 5), (3, 11)])
+    def test_result_independent_of_workers(self, workers: int, batch_size: int):
+        result = run_tournament(make_strategies(), 40, seed=1234, workers=workers, batch_size=batch_size)
+
+        assert result == run_tournament(make_strategies(), 40, seed=1234, workers=1, batch_size=40)
+        assert result.games == 40
+        assert sum(result.winner_counts) >= 40
+
+    def test_matches_run_games(self):
+        result = run_tournament(make_strategies(), 20, seed=99, workers=2, batch_size=3)
+
+        assert [*result.winner_counts] == run_games(make_strategies(), 20, seed=99)
+
+    def test_random_seed_is_reported(self):
+        result = run_tournament(make_strategies(), 10, batch_size=4)
+
+        assert result == run_tournament(make_strategies(), 10, seed=result.seed)
+
+    def test_merge(self):
+        merged = TournamentResult(1, 3, (2, 1)).merge(TournamentResult(1, 2, (0, 2)))
+
+        assert merged == TournamentResult(1, 5, (2, 3))
+
+    def test_merge_rejects_different_seeds(self):
+        with pytest.raises(ValueError):
+            TournamentResult(1, 3, (2, 1)).merge(TournamentResult(2, 2, (0, 2)))
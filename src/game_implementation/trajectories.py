@@ -0,0 +1,216 @@
+"""
+Compact binary logs of played games.
+
+A game record is a byte string: player count, start player, then a stream of tokens.
+
+- action: one byte, `target << 5 | disc << 2 | disc state code` (always below 0x80)
+- roll: `ROLL + player id`, then the dice as one byte `d0 * 36 + d1 * 6 + d2` in the order rolled; the initial
+  defence rolls, which are sets of 1 to 3 dice, are sorted and padded by repeating the highest die
+- round end: `ROUND_END`, then the round winner
+- game end: `GAME_END`, then a bitmask of the winners
+
+Marker bytes are 0xF8 and above and the byte after a marker never is, so a record can be split into tokens without
+decoding it. Records are appended to a file in chunks, each a header, an index of record offsets and the records.
+"""
+import os
+from typing import BinaryIO, Collection, Iterator, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from game_implementation.action import Action
+from game_implementation.action_table import ACTIONS
+from game_implementation.disc_state import DISC_CODES, DISC_STATES
+from game_implementation.game import Game
+from game_implementation.game_events import GameEventSink
+from game_implementation.types import DiscId, PlayerCount, PlayerId
+
+ROLL = 0xF8
+ROUND_END = 0xFE
+GAME_END = 0xFF
+
+FILE_MAGIC = b"PRKT\x01\x00\x00\x00"
+"""File header: magic and format version, padded to keep the chunks 4 byte aligned"""
+CHUNK_MAGIC = b"PRKC"
+_CHUNK_HEADER = np.dtype([("magic", "S4"), ("game_count", "<u4"), ("payload_size", "<u4")])
+
+
+def encode_action(action: Action) -> int:
+    return (action.target_id << 5) | (action.disc_id << 2) | DISC_CODES[action.new_state]
+
+
+def decode_action(token: int) -> Action:
+    return ACTIONS[(token >> 5, (token >> 2) & 7, DISC_STATES[token & 3])]
+
+
+def encode_dice(dice: Collection[DiscId]) -> int:
+    dice = [*dice]
+    if len(dice) < 3:
+        dice = sorted(dice)
+        dice += [dice[-1]] * (3 - len(dice))
+    return dice[0] * 36 + dice[1] * 6 + dice[2]
+
+
+def decode_dice(token: int) -> Tuple[DiscId, DiscId, DiscId]:
+    return token // 36, (token // 6) % 6, token % 6
+
+
+def action_tokens(record: np.ndarray) -> np.ndarray:
+    """Action bytes of a record, in the order played; decode with `decode_action` or with shifts and masks."""
+    tokens = record[2:]
+    marker = tokens >= ROLL
+    after_marker = np.zeros_like(marker)
+    after_marker[1:] = marker[:-1]
+    return tokens[~(marker | after_marker)]
+
+
+class Turn(NamedTuple):
+    player_id: PlayerId
+    dice: Tuple[DiscId, ...]
+    actions: List[Action]
+
+
+class GameTrajectory(NamedTuple):
+    player_count: PlayerCount
+    start_player: PlayerId
+    turns: List[Turn]
+    """Every roll and the actions that followed it; the first `player_count` are the initial defence"""
+    round_winners: List[PlayerId]
+    winners: List[PlayerId]
+
+
+def decode_game(record: Sequence[int]) -> GameTrajectory:
+    record = bytes(record)
+    trajectory = GameTrajectory(record[0], record[1], [], [], [])
+    position = 2
+    while position < len(record):
+        token = record[position]
+        if token < ROLL:
+            trajectory.turns[-1].actions.append(decode_action(token))
+            position += 1
+            continue
+        value = record[position + 1]
+        position += 2
+        if token == ROUND_END:
+            trajectory.round_winners.append(value)
+        elif token == GAME_END:
+            trajectory.winners.extend(
+                player_id for player_id in range(trajectory.player_count) if value >> player_id & 1
+            )
+        else:
+            trajectory.turns.append(Turn(token - ROLL, decode_dice(value), []))
+    return trajectory
+
+
+class TrajectoryWriter:
+    """Append game records to a file, a chunk at a time."""
+
+    def __init__(self, path: str, chunk_games: int = 4096):
+        self.chunk_games = chunk_games
+        self._file: BinaryIO = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(FILE_MAGIC)
+        else:
+            with open(path, "rb") as existing:
+                if existing.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                    self._file.close()
+                    raise ValueError(f"{path} is not a trajectory file")
+        self._records: List[bytes] = []
+
+    def write_game(self, record: bytes) -> None:
+        self._records.append(record)
+        if len(self._records) >= self.chunk_games:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._records:
+            return
+        offsets = np.zeros(len(self._records) + 1, dtype="<u4")
+        np.cumsum([len(record) for record in self._records], out=offsets[1:])
+        payload = b"".join(self._records)
+        header = np.array([(CHUNK_MAGIC, len(self._records), len(payload))], dtype=_CHUNK_HEADER)
+        self._file.write(header.tobytes())
+        self._file.write(offsets.tobytes())
+        self._file.write(payload)
+        self._file.write(bytes(-len(payload) % 4))
+        self._file.flush()
+        self._records = []
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class TrajectoryRecorder(GameEventSink):
+    """Record each game played with this sink as a game record, written when the game ends."""
+
+    def __init__(self, writer: TrajectoryWriter):
+        self.writer = writer
+        self._record = bytearray()
+
+    def game_started(self, game: Game) -> None:
+        self._record = bytearray((game.player_count, game.start_player))
+
+    def dice_rolled(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> None:
+        self._record += bytes((ROLL + player_id, encode_dice(dice)))
+
+    def action_played(self, game: Game, player_id: PlayerId, action: Action) -> None:
+        self._record.append(encode_action(action))
+
+    def round_ended(self, game: Game, round_winner_id: PlayerId, round_scores: Sequence[int]) -> None:
+        self._record += bytes((ROUND_END, round_winner_id))
+
+    def game_ended(self, game: Game, winners: Collection[PlayerId]) -> None:
+        self._record += bytes((GAME_END, sum(1 << player_id for player_id in winners)))
+        self.writer.write_game(bytes(self._record))
+
+
+class TrajectoryReader:
+    """
+    Memory-mapped reader of a trajectory file.
+
+    Only the chunk headers and indexes are read when opening; games are returned as read-only NumPy views of the
+    mapped file, so streaming or randomly accessing them copies nothing.
+    """
+
+    def __init__(self, path: str):
+        self.data = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else np.zeros(0, np.uint8)
+        if self.data[: len(FILE_MAGIC)].tobytes() != FILE_MAGIC:
+            raise ValueError(f"{path} is not a trajectory file")
+        starts = []
+        ends = []
+        position = len(FILE_MAGIC)
+        while position < len(self.data):
+            index_start = position + _CHUNK_HEADER.itemsize
+            header = self.data[position:index_start].view(_CHUNK_HEADER)[0]
+            if header["magic"] != CHUNK_MAGIC:
+                raise ValueError(f"{path}: bad chunk header at byte {position}")
+            game_count = int(header["game_count"])
+            payload_start = index_start + 4 * (game_count + 1)
+            offsets = self.data[index_start:payload_start].view("<u4").astype(np.int64) + payload_start
+            starts.append(offsets[:-1])
+            ends.append(offsets[1:])
+            payload_size = int(header["payload_size"])
+            position = payload_start + payload_size + (-payload_size % 4)
+        self.starts = np.concatenate(starts) if starts else np.zeros(0, dtype=np.int64)
+        self.ends = np.concatenate(ends) if ends else np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def game(self, index: int) -> np.ndarray:
+        """Record of a game, as a view of the file."""
+        start, end = self.starts[index], self.ends[index]
+        return self.data[start:end]
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self.game(index)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+            yield self.data[start:end]
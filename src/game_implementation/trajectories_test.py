@@ -0,0 +1,128 @@
+import random
+
+import numpy as np
+import pytest
+
+from game_implementation.action import Action
+from game_implementation.disc_state import DiscState
+from game_implementation.game import Game
+from game_implementation.game_events import GameEventSink, MultiEventSink
+from game_implementation.strategy import RandomStrategy
+from game_implementation.trajectories import (
+    action_tokens,
+    decode_action,
+    decode_dice,
+    decode_game,
+    encode_action,
+    encode_dice,
+    GAME_END,
+    TrajectoryReader,
+    TrajectoryRecorder,
+    TrajectoryWriter,
+    Turn,
+)
+
+
+class TurnSink(GameEventSink):
+    """Collect the same information as a game record, from the events."""
+
+    def __init__(self):
+        self.turns = []
+        self.round_winners = []
+        self.winners = []
+
+    def dice_rolled(self, game, player_id, dice):
+        self.turns.append(Turn(player_id, tuple(dice), []))
+
+    def action_played(self, game, player_id, action):
+        self.turns[-1].actions.append(action)
+
+    def round_ended(self, game, round_winner_id, round_scores):
+        self.round_winners.append(round_winner_id)
+
+    def game_ended(self, game, winners):
+        self.winners = [*winners]
+
+
+def record_games(path, game_count, player_count=3, chunk_games=4096):
+    sinks = []
+    with TrajectoryWriter(str(path), chunk_games=chunk_games) as writer:
+        recorder = TrajectoryRecorder(writer)
+        for game_index in range(game_count):
+            sink = TurnSink()
+            game = Game(player_count, start_player=game_index % player_count, events=MultiEventSink(recorder, sink))
+            game.play([RandomStrategy()] * player_count)
+            sinks.append(sink)
+    return sinks
+
+
+class TestTrajectories:
+    def test_every_action_fits_a_byte_below_markers(self):
+        actions = [
+            Action(target_id, disc_id, new_state)
+            for target_id in range(4)
+            for disc_id in range(6)
+            for new_state in DiscState
+        ]
+        tokens = [encode_action(action) for action in actions]
+
+        assert len(set(tokens)) == len(actions)
+        assert max(tokens) < 0x80
+        assert [decode_action(token) for token in tokens] == actions
+
+    def test_dice(self):
+        assert decode_dice(encode_dice([5, 0, 3])) == (5, 0, 3)
+        assert decode_dice(encode_dice({4, 1})) == (1, 4, 4)
+
+    @pytest.mark.parametrize("player_count", [2, 3, 4])
+    def test_round_trip(self, tmp_path, player_count):
+        random.seed(player_count)
+        path = tmp_path / "games.prk"
+        sinks = record_games(path, 10, player_count)
+
+        reader = TrajectoryReader(str(path))
+
+        assert len(reader) == 10
+        for game_index, (record, sink) in enumerate(zip(reader, sinks)):
+            trajectory = decode_game(record)
+            assert (trajectory.player_count, trajectory.start_player) == (player_count, game_index % player_count)
+            assert trajectory.round_winners == sink.round_winners
+            assert trajectory.winners == sink.winners
+            # Initial defence rolls are recorded as sorted, padded sets
+            assert [turn.dice for turn in trajectory.turns[player_count:]] == [
+                turn.dice for turn in sink.turns[player_count:]
+            ]
+            assert [turn.actions for turn in trajectory.turns] == [turn.actions for turn in sink.turns]
+            actions = [action for turn in sink.turns for action in turn.actions]
+            assert [decode_action(token) for token in action_tokens(record)] == actions
+
+    def test_chunks_and_appends(self, tmp_path):
+        random.seed(1)
+        path = tmp_path / "games.prk"
+        first = record_games(path, 7, chunk_games=3)
+        second = record_games(path, 2)
+
+        reader = TrajectoryReader(str(path))
+
+        assert len(reader) == 9
+        assert [decode_game(reader[index]).winners for index in range(9)] == [sink.winners for sink in first + second]
+
+    def test_games_are_views_of_the_file(self, tmp_path):
+        random.seed(2)
+        path = tmp_path / "games.prk"
+        record_games(path, 3)
+
+        reader = TrajectoryReader(str(path))
+        record = reader[1]
+
+        assert np.shares_memory(record, reader.data)
+        assert record[-2] == GAME_END
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"not a trajectory file")
+
+        with pytest.raises(ValueError):
+            TrajectoryReader(str(path))
+        with pytest.raises(ValueError):
+            TrajectoryWriter(str(path))
@@ -0,0 +1,183 @@
+import itertools
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from game_implementation.benchmark import play_seated, WinStats
+from game_implementation.disc_state import DiscState
+from game_implementation.game_runner import derive_seed
+from game_implementation.strategy import PreferTakeOnDoubleSafeDie, TallestDaisyStrategy
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.tournament import batches
+
+Preferences = Tuple[int, ...]
+"""Values of a preference table, in the order of its space's keys"""
+
+
+def canonical(preferences: Preferences) -> Preferences:
+    """
+    Dense ranks of the preferences, e.g. (3, 1, 1) -> (1, 0, 0).
+
+    Strategies only compare preferences, so tables with the same canonical form play identically.
+    """
+    ranks = {value: rank for rank, value in enumerate(sorted({*preferences}))}
+    return tuple(ranks[value] for value in preferences)
+
+
+class PreferenceSpace(NamedTuple):
+    strategy_class: Callable[[Dict[Any, int]], Strategy]
+    """Strategy taking an action preference dict, e.g. TallestDaisyStrategy"""
+    keys: Tuple[Any, ...]
+    """Keys of the preference dict"""
+    levels: int
+    """Preferences range over 0 .. levels - 1"""
+
+    def strategy(self, preferences: Preferences) -> Strategy:
+        return self.strategy_class(dict(zip(self.keys, preferences)))
+
+    def candidates(self) -> List[Preferences]:
+        """Every distinct table, in canonical form."""
+        return sorted({canonical(values) for values in itertools.product(range(self.levels), repeat=len(self.keys))})
+
+    def describe(self, preferences: Preferences) -> str:
+        return ", ".join(f"{_key_name(key)}: {value}" for key, value in zip(self.keys, preferences))
+
+
+def _key_name(key: Any) -> str:
+    if isinstance(key, tuple):
+        return "/".join(_key_name(part) for part in key)
+    return key.name if isinstance(key, DiscState) else str(key)
+
+
+_STATES = (DiscState.Gone, DiscState.Safe, DiscState.Vulnerable)
+TALLEST_DAISY_SPACE = PreferenceSpace(TallestDaisyStrategy, _STATES, 3)
+DOUBLE_TAKE_SPACE = PreferenceSpace(PreferTakeOnDoubleSafeDie, tuple(itertools.product(_STATES, (True, False))), 4)
+
+
+def play_candidate(
+    space: PreferenceSpace,
+    preferences: Preferences,
+    opponents: Sequence[Strategy],
+    seed: int,
+    first_game: int,
+    last_game: int,
+) -> List[int]:
+    """
+    Play games [first_game, last_game) of a candidate against the opponents.
+
+    Game i puts the candidate in seat i % n and starts with player (i // n) % n, and is seeded from the master seed
+    and i alone, so every candidate faces the same dice.
+
+    Returns:
+        number of joint winners of each game if the candidate won it, else 0, as `WinStats.add`
+    """
+    candidate = space.strategy(preferences)
+    player_count = len(opponents) + 1
+    results = []
+    for game_index in range(first_game, last_game):
+        seat = game_index % player_count
+        lineup = [*opponents[:seat], candidate, *opponents[seat:]]
+        game = play_seated(lineup, (game_index // player_count) % player_count, derive_seed(seed, game_index))
+        winners = game.winners()
+        results.append(len(winners) if seat in winners else 0)
+    return results
+
+
+class Round(NamedTuple):
+    games: int
+    """Games per candidate by the end of the round"""
+    ranking: List[Preferences]
+    """Candidates of the round, best first"""
+
+
+class PreferenceTuner:
+    """
+    Search a preference space for the strongest table against a fixed set of opponents.
+
+    Fitness is the candidate's win rate, ties shared, over seeded games; results are cached per canonical table,
+    so asking for more games of a table only plays the extra games, and equivalent tables share results.
+    """
+
+    def __init__(
+        self,
+        space: PreferenceSpace,
+        opponents: Sequence[Strategy],
+        seed: Optional[int] = None,
+        workers: int = 1,
+        batch_size: int = 50,
+    ):
+        """
+        Args:
+            space: tables to search
+            opponents: strategies for the other seats, must be picklable if workers > 1
+            seed: master seed, chosen at random if not given
+            workers: number of processes; 1 plays all games in this process
+            batch_size: number of games sent to a worker at a time
+        """
+        self.space = space
+        self.opponents = [*opponents]
+        self.seed = seed if seed is not None else random.randrange(2 ** 63)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.cache: Dict[Preferences, WinStats] = {}
+        self.games_played = 0
+
+    def fitness(self, preferences: Preferences) -> WinStats:
+        return self.cache.setdefault(canonical(preferences), WinStats())
+
+    def evaluate(self, candidates: Sequence[Preferences], games: int) -> None:
+        """Play each candidate up to `games` games in total."""
+        jobs = []
+        for key in dict.fromkeys(canonical(preferences) for preferences in candidates):
+            played = self.fitness(key).games
+            for first_game, last_game in batches(games - played, self.batch_size):
+                jobs.append((key, played + first_game, played + last_game))
+        arguments = [(self.space, key, self.opponents, self.seed, first, last) for key, first, last in jobs]
+        if self.workers == 1:
+            results = [play_candidate(*job_arguments) for job_arguments in arguments]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = [*executor.map(play_candidate, *zip(*arguments))]
+        for (key, _, _), winner_counts in zip(jobs, results):
+            for winner_count in winner_counts:
+                self.fitness(key).add(winner_count)
+            self.games_played += len(winner_counts)
+
+    def rank(self, candidates: Sequence[Preferences]) -> List[Preferences]:
+        """Candidates, best first, by win rate so far."""
+        return sorted(candidates, key=lambda preferences: -self.fitness(preferences).win_rate)
+
+    def successive_halving(
+        self,
+        candidates: Optional[Sequence[Preferences]] = None,
+        initial_games: int = 32,
+        eta: int = 3,
+        on_round: Optional[Callable[[Round], None]] = None,
+    ) -> List[Round]:
+        """
+        Find the best candidate by successive halving: play every candidate a few games, keep the best 1 / eta, play
+        them eta times as many games, and so on until one is left.
+
+        Args:
+            candidates: tables to search, every distinct table in the space by default
+            initial_games: games per candidate in the first round
+            eta: fraction of candidates dropped, and growth of the games, each round
+            on_round: called after each round
+
+        Returns:
+            rounds played; the winner is first in the ranking of the last
+        """
+        survivors = [*dict.fromkeys(canonical(preferences) for preferences in candidates or self.space.candidates())]
+        games = initial_games
+        rounds = []
+        while True:
+            self.evaluate(survivors, games)
+            ranking = self.rank(survivors)
+            rounds.append(Round(games, ranking))
+            if on_round is not None:
+                on_round(rounds[-1])
+            if len(survivors) == 1:
+                return rounds
+            keep = max(1, len(survivors) // eta)
+            survivors = ranking[:keep]
+            games *= eta
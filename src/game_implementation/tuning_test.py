@@ -0,0 +1,79 @@
+import pytest
+
+from game_implementation.disc_state import DiscState
+from game_implementation.strategy import RandomStrategy, TallestDaisyStrategy
+from game_implementation.tuning import canonical, play_candidate, PreferenceTuner, TALLEST_DAISY_SPACE
+
+
+def make_opponents():
+    return [RandomStrategy(), RandomStrategy()]
+
+
+class TestTuning:
+    @pytest.mark.parametrize(
+        "preferences, expected",
+        [((3, 2, 2), (1, 0, 0)), ((0, 0, 0), (0, 0, 0)), ((5, 1, 3), (2, 0, 1)), ((2, 0, 1), (2, 0, 1))],
+    )
+    def test_canonical(self, preferences, expected):
+        assert canonical(preferences) == expected
+
+    def test_candidates_are_distinct_tables(self):
+        candidates = TALLEST_DAISY_SPACE.candidates()
+
+        # ordered partitions of 3 action types
+        assert len(candidates) == 13
+        assert all(canonical(candidate) == candidate for candidate in candidates)
+
+    def test_strategy(self):
+        strategy = TALLEST_DAISY_SPACE.strategy((2, 1, 0))
+
+        assert isinstance(strategy, TallestDaisyStrategy)
+        assert strategy.action_preference == {DiscState.Gone: 2, DiscState.Safe: 1, DiscState.Vulnerable: 0}
+        assert TALLEST_DAISY_SPACE.describe((2, 1, 0)) == "Gone: 2, Safe: 1, Vulnerable: 0"
+
+    def test_play_candidate_batches_are_independent(self):
+        whole = play_candidate(TALLEST_DAISY_SPACE, (2, 1, 1), make_opponents(), 5, 0, 12)
+        parts = [
+            *play_candidate(TALLEST_DAISY_SPACE, (2, 1, 1), make_opponents(), 5, 0, 5),
+            *play_candidate(TALLEST_DAISY_SPACE, (2, 1, 1), make_opponents(), 5, 5, 12),
+        ]
+
+        assert whole == parts
+        assert all(0 <= winner_count <= 3 for winner_count in whole)
+
+    def test_evaluate_caches_per_table(self):
+        tuner = PreferenceTuner(TALLEST_DAISY_SPACE, make_opponents(), seed=2, batch_size=4)
+        tuner.evaluate([(2, 1, 1), (4, 0, 0)], 6)
+
+        assert tuner.games_played == 6
+        assert tuner.fitness((1, 0, 0)).games == 6
+
+        tuner.evaluate([(2, 1, 1)], 10)
+        assert tuner.games_played == 10
+        assert tuner.fitness((2, 1, 1)).games == 10
+
+    def test_evaluate_matches_uninterrupted_games(self):
+        tuner = PreferenceTuner(TALLEST_DAISY_SPACE, make_opponents(), seed=2, batch_size=4)
+        tuner.evaluate([(2, 1, 0)], 3)
+        tuner.evaluate([(2, 1, 0)], 9)
+
+        whole = PreferenceTuner(TALLEST_DAISY_SPACE, make_opponents(), seed=2)
+        whole.evaluate([(2, 1, 0)], 9)
+        assert tuner.fitness((2, 1, 0)).shares == pytest.approx(whole.fitness((2, 1, 0)).shares)
+
+    def test_successive_halving(self):
+        rounds = []
+        tuner = PreferenceTuner(TALLEST_DAISY_SPACE, make_opponents(), seed=3)
+        result = tuner.successive_halving(initial_games=4, eta=3, on_round=rounds.append)
+
+        assert result == rounds
+        assert [(round.games, len(round.ranking)) for round in rounds] == [(4, 13), (12, 4), (36, 1)]
+        # survivors are the best of the previous round
+        assert set(rounds[1].ranking) == set(rounds[0].ranking[:4])
+        assert tuner.games_played == 13 * 4 + 4 * 8 + 1 * 24
+
+    def test_successive_halving_with_workers(self):
+        single = PreferenceTuner(TALLEST_DAISY_SPACE, make_opponents(), seed=3)
+        multiple = PreferenceTuner(TALLEST_DAISY_SPACE, make_opponents(), seed=3, workers=2, batch_size=3)
+
+        assert single.successive_halving(initial_games=4) == multiple.successive_halving(initial_games=4)
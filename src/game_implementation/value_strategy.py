@@ -0,0 +1,176 @@
+"""
+Strategies choosing the whole turn whose resulting position scores best under a value function of position features.
+
+Every distinct turn for the roll (see `compact_state.legal_turns`) is encoded as a row of one feature matrix, and
+the value function scores all rows at once: a linear function with one matrix product, a small MLP with one per
+layer. The Python work per decision is the turn enumeration and one pass over the candidate states, so decision time
+grows little with the number of candidates, which grows with the number of players.
+"""
+from typing import Collection, List, Protocol, Sequence
+
+import numpy as np
+
+from game_implementation.action import Action
+from game_implementation.compact_state import (
+    CompactState,
+    legal_turns,
+    PLAYER_BITS,
+    PLAYER_MASK,
+    safe_total,
+    taken_total,
+    vulnerable_total,
+)
+from game_implementation.disc_state import DISC_BITS, DISC_MASK, DISC_STATES
+from game_implementation.game import Game
+from game_implementation.strategy_protocol import Strategy
+from game_implementation.types import DiscId, PlayerCount, PlayerId
+
+SCORE_SCALE = 100.0
+"""Score margins are divided by this in features"""
+DISC_TOTAL = 21
+"""Total score of a player's six discs; vulnerable totals are divided by this in features"""
+
+_PACKED = range(1 << PLAYER_BITS)
+_DISC_COUNTS = np.array(
+    [
+        [sum((packed >> (DISC_BITS * disc_id)) & DISC_MASK == code for disc_id in range(6)) for code in range(3)]
+        for packed in _PACKED
+    ],
+    dtype=np.float64,
+)
+"""Count of discs in each state (in `DISC_STATES` order) for every packed value of one player's discs"""
+_SAFE_TOTALS = np.array([safe_total(packed) for packed in _PACKED], dtype=np.int64)
+_VULNERABLE_TOTALS = np.array([vulnerable_total(packed) for packed in _PACKED], dtype=np.int64)
+_TAKEN_TOTALS = np.array([taken_total(packed) for packed in _PACKED], dtype=np.int64)
+
+
+def feature_names(player_count: PlayerCount) -> List[str]:
+    """
+    Names of the features of `encode_positions`; players are numbered from the deciding player (0) in turn order.
+    """
+    names = [
+        f"player {offset} {disc_state.name.lower()} discs"
+        for offset in range(player_count)
+        for disc_state in DISC_STATES
+    ]
+    names.append("margin over best opponent")
+    names.extend(f"player {offset} margin" for offset in range(1, player_count))
+    names.extend(f"player {offset} vulnerable total" for offset in range(player_count))
+    names.extend(["round", "bias"])
+    return names
+
+
+def encode_positions(states: Sequence[CompactState], player_id: PlayerId) -> np.ndarray:
+    """
+    Features of many positions of the same game, from a player's point of view.
+
+    Args:
+        states: positions with the same player count
+        player_id: player the features are for
+
+    Returns:
+        (positions, features) matrix, with features as `feature_names`: for each player in turn order from
+        `player_id`, the fraction of their discs in each state; the player's margin in expected score over their
+        best opponent, and each opponent's margin over the player; each player's vulnerable total; the fraction of
+        rounds played; and a constant 1
+    """
+    count = len(states)
+    player_count = states[0].player_count
+    order = [(player_id + offset) % player_count for offset in range(player_count)]
+    shifts = np.array([PLAYER_BITS * other_id for other_id in order], dtype=np.int64)
+    discs = (np.array([state.discs for state in states], dtype=np.int64)[:, None] >> shifts) & PLAYER_MASK
+    taken = (np.array([state.taken for state in states], dtype=np.int64)[:, None] >> shifts) & PLAYER_MASK
+    scores = np.array([state.scores for state in states], dtype=np.int64)[:, order]
+    rounds = np.array([state.round for state in states], dtype=np.float64)
+
+    expected = scores + _TAKEN_TOTALS[taken] + _SAFE_TOTALS[discs]
+    opponents_margin = expected[:, 1:] - expected[:, :1]
+    return np.concatenate(
+        [
+            _DISC_COUNTS[discs].reshape(count, -1) / 6,
+            -opponents_margin.max(axis=1, keepdims=True) / SCORE_SCALE,
+            opponents_margin / SCORE_SCALE,
+            _VULNERABLE_TOTALS[discs] / DISC_TOTAL,
+            (rounds / player_count)[:, None],
+            np.ones((count, 1)),
+        ],
+        axis=1,
+    )
+
+
+class ValueFunction(Protocol):
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        """Values of the positions with the given (positions, features) matrix, higher is better."""
+        pass
+
+
+class LinearValue(ValueFunction):
+    def __init__(self, weights: np.ndarray):
+        self.weights = np.asarray(weights, dtype=np.float64)
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        return features @ self.weights
+
+    @classmethod
+    def default(cls, player_count: PlayerCount) -> "LinearValue":
+        """
+        Hand set weights: the margin over the best opponent, with vulnerable discs counted at half their score, as
+        `expectimax.horizon_score`, and opponents' vulnerable discs at half their score shared between them.
+        """
+        weights = dict.fromkeys(feature_names(player_count), 0.0)
+        weights["margin over best opponent"] = 1.0
+        weights["player 0 vulnerable total"] = 0.5 * DISC_TOTAL / SCORE_SCALE
+        for offset in range(1, player_count):
+            weights[f"player {offset} vulnerable total"] = -0.5 * DISC_TOTAL / SCORE_SCALE / (player_count - 1)
+        return cls(np.array([*weights.values()]))
+
+
+class MlpValue(ValueFunction):
+    """Multilayer perceptron with ReLU hidden layers and a single linear output."""
+
+    def __init__(self, weights: Sequence[np.ndarray], biases: Sequence[np.ndarray]):
+        """
+        Args:
+            weights: (inputs, outputs) matrix of each layer; the last has one output
+            biases: (outputs,) vector of each layer
+        """
+        if len(weights) != len(biases):
+            raise ValueError(f"{len(weights)} weight matrices but {len(biases)} bias vectors")
+        self.weights = [np.asarray(layer, dtype=np.float64) for layer in weights]
+        self.biases = [np.asarray(layer, dtype=np.float64) for layer in biases]
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        activations = features
+        for weights, biases in zip(self.weights[:-1], self.biases[:-1]):
+            activations = np.maximum(activations @ weights + biases, 0.0)
+        return (activations @ self.weights[-1] + self.biases[-1])[:, 0]
+
+    @classmethod
+    def random(cls, player_count: PlayerCount, hidden: Sequence[int] = (32,), seed: int = 0) -> "MlpValue":
+        """Untrained network with He initialisation, as a starting point for training."""
+        rng = np.random.default_rng(seed)
+        sizes = [len(feature_names(player_count)), *hidden, 1]
+        return cls(
+            [rng.normal(0, np.sqrt(2 / inputs), (inputs, outputs)) for inputs, outputs in zip(sizes, sizes[1:])],
+            [np.zeros(outputs) for outputs in sizes[1:]],
+        )
+
+
+class ValueStrategy(Strategy):
+    """
+    Play the distinct turn leading to the best valued position.
+
+    Positions are valued at the end of the turn, after the round ends if the turn ends it, so the round winner's
+    vulnerable discs are counted.
+    """
+
+    def __init__(self, value_function: ValueFunction):
+        self.value_function = value_function
+
+    def choose_actions(self, game: Game, player_id: PlayerId, dice: Collection[DiscId]) -> Collection[Action]:
+        outcomes = legal_turns(game, player_id, [*dice])
+        if len(outcomes) == 1:
+            return next(iter(outcomes.values()))
+        turns = [*outcomes.values()]
+        values = self.value_function(encode_positions([outcome.end_turn() for outcome in outcomes], player_id))
+        return turns[int(np.argmax(values))]
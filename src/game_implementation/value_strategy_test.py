@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from game_implementation.compact_state import CompactState, distinct_turns, VULNERABLE_TOTALS
+from game_implementation.game import Game
+from game_implementation.performance import sample_positions
+from game_implementation.strategy import RandomStrategy
+from game_implementation.value_strategy import (
+    encode_positions,
+    feature_names,
+    LinearValue,
+    MlpValue,
+    ValueStrategy,
+)
+
+
+def sample_states(count, seed):
+    return [
+        CompactState.from_game(game)._replace(player_id=player_id)
+        for game, player_id, _ in sample_positions(count, seed)
+    ]
+
+
+class TestValueStrategy:
+    @pytest.mark.parametrize("player_count", [2, 3, 4])
+    def test_fresh_game_features(self, player_count):
+        row = encode_positions([CompactState.from_game(Game(player_count))], 0)[0]
+        features = dict(zip(feature_names(player_count), row))
+
+        assert len(features) == len(feature_names(player_count))
+        assert features["player 0 vulnerable discs"] == 1
+        assert features[f"player {player_count - 1} gone discs"] == 0
+        assert features["margin over best opponent"] == 0
+        assert features["player 1 vulnerable total"] == 1
+        assert features["bias"] == 1
+
+    def test_features_match_states(self):
+        states = sample_states(50, 3)
+        player_id = 1
+        features = encode_positions(states, player_id)
+        names = feature_names(3)
+
+        for state, row in zip(states, features):
+            row = dict(zip(names, row))
+            expected = [state.expected_score((player_id + offset) % 3) for offset in range(3)]
+            assert row["margin over best opponent"] == pytest.approx((expected[0] - max(expected[1:])) / 100)
+            assert row["player 2 margin"] == pytest.approx((expected[2] - expected[0]) / 100)
+            assert row["player 1 vulnerable total"] == pytest.approx(VULNERABLE_TOTALS[state.player_discs(2)] / 21)
+            gone = sum(state.disc(player_id, disc_id).name == "Gone" for disc_id in range(6))
+            assert row["player 0 gone discs"] == pytest.approx(gone / 6)
+
+    def test_mlp_matches_layers(self):
+        features = encode_positions(sample_states(10, 4), 0)
+        mlp = MlpValue.random(3, hidden=(8, 4), seed=1)
+
+        hidden = np.maximum(features @ mlp.weights[0] + mlp.biases[0], 0)
+        hidden = np.maximum(hidden @ mlp.weights[1] + mlp.biases[1], 0)
+        assert mlp(features) == pytest.approx((hidden @ mlp.weights[2] + mlp.biases[2])[:, 0])
+
+    def test_mlp_layers_must_match(self):
+        with pytest.raises(ValueError):
+            MlpValue([np.zeros((3, 1))], [])
+
+    def test_chooses_best_valued_turn(self):
+        value = LinearValue.default(3)
+        strategy = ValueStrategy(value)
+        for game, player_id, dice in sample_positions(40, 5):
+            state = CompactState.from_game(game)._replace(player_id=player_id)
+            outcomes = distinct_turns(state, dice)
+            values = {outcome: value(encode_positions([outcome.end_turn()], player_id))[0] for outcome in outcomes}
+
+            chosen = state
+            for action in strategy.choose_actions(game, player_id, dice):
+                chosen = chosen.with_action(player_id, action)
+            assert values[chosen] == pytest.approx(max(values.values()))
+
+    @pytest.mark.parametrize("player_count", [2, 3, 4])
+    def test_plays_legal_games(self, player_count):
+        strategies = [ValueStrategy(LinearValue.default(player_count)), ValueStrategy(MlpValue.random(player_count))]
+        strategies.extend(RandomStrategy() for _ in range(player_count - 2))
+
+        assert Game(player_count).play(strategies)
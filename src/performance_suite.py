@@ -0,0 +1,32 @@
+import argparse
+import os
+import sys
+
+from game_implementation.performance import compare, load_baseline, report, run_suite, save_baseline
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "performance_baseline.json")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure engine and strategy performance against a baseline")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file to compare with, or to update")
+    parser.add_argument("--threshold", type=float, default=0.15, help="fraction a metric may worsen before failing")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the work done by every measurement")
+    parser.add_argument("--seed", type=int, default=0, help="seed of all games played")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    metrics = run_suite(scale=args.scale, seed=args.seed)
+    if args.update_baseline:
+        save_baseline(args.baseline, metrics)
+        print(report(metrics, {}))
+        print(f"\nBaseline written to {args.baseline}")
+        sys.exit(0)
+
+    baseline = load_baseline(args.baseline) if os.path.exists(args.baseline) else {}
+    print(report(metrics, baseline))
+    regressions = compare(metrics, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) of more than {args.threshold:.0%}:")
+        print("\n".join(regressions))
+        sys.exit(1)